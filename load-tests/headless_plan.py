@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Disable the result listeners of a JMeter plan for non-GUI runs
+
+View Results Tree, Summary Report, Aggregate Report and the jp@gc graphs keep
+every sample (with request and response data) in memory even with `jmeter -n`,
+which slows the generator down. This writes a copy of the plan with every
+ResultCollector disabled; results still go to the -l file, written as set in
+jmeter-tests/headless.properties.
+
+The plan is edited as text, only the `enabled` attribute of the listeners
+changes, so everything else (bodies with &#xd;, comments) stays byte for byte.
+
+Usage:
+    python headless_plan.py ../jmeter-tests/api_load_test.jmx -o /tmp/api_load_test.headless.jmx
+    jmeter -n -t /tmp/api_load_test.headless.jmx -q ../jmeter-tests/headless.properties -l results.jtl
+"""
+import re
+import argparse
+
+START_TAG = re.compile(r'<([\w.]+)\s[^>]*?testclass="([^"]+)"[^>]*>')
+TESTNAME = re.compile(r'testname="([^"]*)"')
+
+
+def disable_listeners(plan):
+    """
+    Disable every result collector of a plan
+
+    Args:
+        plan (str): .jmx file content
+
+    Returns:
+        tuple: (new content, names of the listeners that were disabled)
+    """
+    disabled = []
+
+    def replace(match):
+        tag = match.group(0)
+        if not match.group(2).endswith("ResultCollector") or 'enabled="true"' not in tag:
+            return tag
+        name = TESTNAME.search(tag)
+        disabled.append(name.group(1) if name else match.group(1))
+        return tag.replace('enabled="true"', 'enabled="false"')
+
+    return START_TAG.sub(replace, plan), disabled
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a copy of a JMeter plan with its listeners disabled')
+    parser.add_argument('plan', help='JMeter .jmx plan')
+    parser.add_argument('-o', '--output', required=True, help='Plan to write')
+    args = parser.parse_args()
+
+    with open(args.plan, 'r', encoding='utf-8', newline='') as f:
+        plan, disabled = disable_listeners(f.read())
+    with open(args.output, 'w', encoding='utf-8', newline='') as f:
+        f.write(plan)
+
+    if not disabled:
+        print(f"✅ {args.plan} has no enabled listeners, copied to {args.output}")
+        return
+    print(f"✅ Disabled {len(disabled)} listeners in {args.output}:")
+    for name in disabled:
+        print(f"   - {name}")
+
+
+if __name__ == "__main__":
+    main()
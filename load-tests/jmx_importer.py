@@ -0,0 +1,745 @@
+"""
+Import JMeter .jmx plans as Python scenarios for the load engine
+
+The plan's test tree is turned into a Scenario: thread groups (plain and jp@gc
+stepping) with their loop controllers and HTTP samplers. Elements that JMeter
+scopes over a subtree are resolved per sampler at import time:
+    HTTP Header Manager                 headers merged from the outermost to the sampler's own
+    HTTP Request Defaults               protocol, server and port for samplers that leave them empty
+    Constant/Uniform/Gaussian timers    pause before every sampler in scope
+    Response/Duration/JSON Path         assertions checked on every sampler in scope
+
+Listeners (View Results Tree, Summary Report, jp@gc graphs) are dropped: results are
+aggregated by the engine. Other elements are not run and are listed in Scenario.skipped.
+
+${VAR} references are resolved from the plan's User Defined Variables and
+${__P(name,default)} from properties; both can be overridden like `jmeter -Jname=value`.
+"""
+import re
+import json
+import random
+import itertools
+import xml.etree.ElementTree as ET
+from urllib.parse import urlencode
+
+from postman_loader import RequestTemplate
+
+REFERENCE = re.compile(r"\$\{([^${}]+)\}")
+PROPERTY_FUNCTION = re.compile(r"__(?:P|property)\(\s*([^,)]+?)\s*(?:,([^)]*))?\)")
+
+THREAD_GROUPS = {"ThreadGroup", "SteppingThreadGroup", "kg.apc.jmeter.threads.SteppingThreadGroup"}
+TIMERS = {"ConstantTimer", "UniformRandomTimer", "GaussianRandomTimer"}
+ASSERTIONS = {"ResponseAssertion", "DurationAssertion", "JSONPathAssertion"}
+# Elements that only collect or display results
+LISTENERS = {"ResultCollector", "kg.apc.jmeter.vizualizers.CorrectedResultCollector", "BackendListener"}
+# Elements that only hold variables, already read before the tree is walked
+VARIABLES = {"Arguments", "TestPlan"}
+
+# Response Assertion test types (bit flags, as stored in Assertion.test_type)
+MATCH, CONTAINS, NOT, EQUALS, SUBSTRING, OR = 1, 2, 4, 8, 16, 32
+
+
+class ResponseAssertion:
+    """Response Assertion on the response code or body"""
+
+    FIELDS = {"Assertion.response_code": "code", "Assertion.response_data": "body"}
+
+    def __init__(self, name, field, test_type, patterns, ignore_status=False, custom_message=""):
+        """
+        Args:
+            name (str): Assertion name
+            field (str): "code" or "body"
+            test_type (int): MATCH/CONTAINS/EQUALS/SUBSTRING, optionally with NOT and OR
+            patterns (list): Strings or regexes to test
+            ignore_status (bool): Don't fail 4xx/5xx responses on their status alone
+            custom_message (str): Failure message to report instead of the generated one
+        """
+        self.name = name
+        self.field = field
+        self.test_type = test_type
+        self.patterns = patterns
+        self.ignore_status = ignore_status
+        self.custom_message = custom_message
+        if test_type & (MATCH | CONTAINS):
+            self._regexes = [re.compile(pattern, re.DOTALL) for pattern in patterns]
+
+    def check(self, status, payload, elapsed):
+        """Failure message, or None when the assertion passes"""
+        value = str(status) if self.field == "code" else payload.decode("utf-8", errors="replace")
+        results = [self._test(value, i) != bool(self.test_type & NOT) for i in range(len(self.patterns))]
+        passed = any(results) if self.test_type & OR else all(results)
+        if passed:
+            return None
+        if self.custom_message:
+            return self.custom_message
+        kind = "not " if self.test_type & NOT else ""
+        return f"{self.name}: expected {self.field} {kind}to match {' / '.join(self.patterns)}"
+
+    def _test(self, value, index):
+        if self.test_type & MATCH:
+            return self._regexes[index].fullmatch(value) is not None
+        if self.test_type & CONTAINS:
+            return self._regexes[index].search(value) is not None
+        if self.test_type & EQUALS:
+            return value == self.patterns[index]
+        return self.patterns[index] in value
+
+
+class DurationAssertion:
+    """Duration Assertion: fail responses slower than a limit"""
+
+    def __init__(self, name, max_elapsed):
+        """
+        Args:
+            name (str): Assertion name
+            max_elapsed (int): Longest acceptable latency in milliseconds
+        """
+        self.name = name
+        self.max_elapsed = max_elapsed
+
+    def check(self, status, payload, elapsed):
+        """Failure message, or None when the assertion passes"""
+        if elapsed > self.max_elapsed:
+            return f"{self.name}: took {elapsed} ms, longer than {self.max_elapsed} ms"
+        return None
+
+
+class JsonPathAssertion:
+    """
+    JSON Path Assertion
+
+    The path supports the common subset of JSONPath: $, .name, ['name'], [n], [*],
+    .* and ..name (recursive descent). Filters and slices are not supported.
+    """
+
+    def __init__(self, name, path, expected="", validate=False, expect_null=False, invert=False, regex=True):
+        """
+        Args:
+            name (str): Assertion name
+            path (str): JSONPath expression
+            expected (str): Expected value (regex when regex=True)
+            validate (bool): Compare the value; otherwise only check that the path exists
+            expect_null (bool): Expect the value to be null
+            invert (bool): Fail when the assertion would pass
+            regex (bool): Match expected as a regex instead of comparing strings
+        """
+        self.name = name
+        self.path = path
+        self.expected = expected
+        self.validate = validate
+        self.expect_null = expect_null
+        self.invert = invert
+        self.regex = regex
+        self._steps, self._definite = _compile_json_path(path)
+        self._pattern = re.compile(expected, re.DOTALL) if regex else None
+
+    def check(self, status, payload, elapsed):
+        """Failure message, or None when the assertion passes"""
+        failure = self._failure(payload)
+        if self.invert:
+            return None if failure else f"{self.name}: {self.path} was not expected to match"
+        return failure
+
+    def _failure(self, payload):
+        try:
+            document = json.loads(payload)
+        except ValueError:
+            return f"{self.name}: response is not JSON"
+        values = _evaluate_json_path(document, self._steps)
+        if self._definite and not values:
+            return f"{self.name}: no results for path {self.path}"
+        if not self.validate:
+            return None if values else f"{self.name}: path {self.path} matched an empty list"
+        value = values[0] if self._definite else values
+        # An indefinite path passes when any of its values matches, like JMeter
+        candidates = values if not self._definite else [value]
+        if self.expect_null:
+            if any(candidate is None for candidate in candidates):
+                return None
+            return f"{self.name}: expected null at {self.path}, found {_json_text(value)}"
+        if any(self._matches(candidate) for candidate in candidates):
+            return None
+        return f"{self.name}: expected {self.path} to be '{self.expected}', found '{_json_text(value)}'"
+
+    def _matches(self, value):
+        text = _json_text(value)
+        if self._pattern is not None:
+            return self._pattern.fullmatch(text) is not None
+        return text == self.expected
+
+
+class Timer:
+    """Constant, uniform random or gaussian random timer"""
+
+    def __init__(self, kind, delay, spread=0.0):
+        """
+        Args:
+            kind (str): "ConstantTimer", "UniformRandomTimer" or "GaussianRandomTimer"
+            delay (float): Constant delay in milliseconds
+            spread (float): Random range (uniform) or deviation (gaussian) in milliseconds
+        """
+        self.kind = kind
+        self.delay = delay
+        self.spread = spread
+
+    def pause(self):
+        """One pause in milliseconds"""
+        if self.kind == "UniformRandomTimer":
+            return self.delay + random.random() * self.spread
+        if self.kind == "GaussianRandomTimer":
+            return max(0.0, self.delay + random.gauss(0, 1) * self.spread)
+        return self.delay
+
+
+class Sampler(RequestTemplate):
+    """HTTP sampler with the timers and assertions in its scope"""
+
+    def __init__(self, name, method, url, headers=None, body=None, assertions=None, timers=None):
+        """
+        Args:
+            name (str): Sampler name, used as the sample label
+            method (str): HTTP method
+            url (str): Full URL with variables resolved
+            headers (dict): Headers of every header manager in scope
+            body (bytes): Request body
+            assertions (list): ResponseAssertion, DurationAssertion and JsonPathAssertion objects
+            timers (list): Timer objects applied before the request
+        """
+        super().__init__(name, method, url, headers, body)
+        self.assertions = assertions or []
+        self.timers = timers or []
+        self.ignore_status = any(getattr(assertion, "ignore_status", False) for assertion in self.assertions)
+
+    def think_time(self):
+        """Pause before the request in seconds, the sum of every timer in scope"""
+        return sum(timer.pause() for timer in self.timers) / 1000
+
+    def check(self, status, payload, elapsed):
+        """Like JMeter: 4xx/5xx fail unless an assertion ignores the status, then every assertion must pass"""
+        if status >= 400 and not self.ignore_status:
+            return False, f"HTTP {status}"
+        for assertion in self.assertions:
+            failure = assertion.check(status, payload, elapsed)
+            if failure:
+                return False, failure
+        return True, ""
+
+
+class Loop:
+    """Loop Controller: run its children a number of times (None: forever)"""
+
+    def __init__(self, loops, children):
+        self.loops = loops
+        self.children = children
+
+    def samplers(self):
+        """Samplers in execution order, loops expanded lazily"""
+        for _ in (range(self.loops) if self.loops is not None else itertools.count()):
+            for child in self.children:
+                if isinstance(child, Loop):
+                    yield from child.samplers()
+                else:
+                    yield child
+
+
+class ThreadGroup:
+    """Thread group: users starting over a ramp-up and looping over the samplers"""
+
+    ON_ERROR = ("continue", "startnextloop", "stopthread", "stoptest", "stoptestnow")
+
+    def __init__(self, name, users, ramp_up=0.0, loops=1, duration=None, delay=0.0, on_error="continue",
+                 children=None):
+        """
+        Args:
+            name (str): Thread group name
+            users (int): Number of threads
+            ramp_up (float): Seconds over which the threads are started
+            loops (int): Iterations per thread (None: until the duration is over)
+            duration (float): Seconds after which threads stop (scheduler), or None
+            delay (float): Seconds before the first thread starts (scheduler)
+            on_error (str): Action after a failed sample, one of ON_ERROR
+            children (list): Samplers and Loop controllers run on every iteration
+        """
+        if on_error not in self.ON_ERROR:
+            raise ValueError(f"Sampler error action '{on_error}' not supported. Use one of: {', '.join(self.ON_ERROR)}.")
+        self.name = name
+        self.users = users
+        self.ramp_up = ramp_up
+        self.loops = loops
+        self.duration = duration
+        self.delay = delay
+        self.on_error = on_error
+        self.children = children or []
+
+    def iteration(self):
+        """Samplers of one iteration of the main loop"""
+        return Loop(1, self.children).samplers()
+
+    def user_schedule(self):
+        """(start, stop) offsets in seconds of every thread; stop is None when only loops end it"""
+        return [(self.delay + self.ramp_up * i / self.users, self.end) for i in range(self.users)]
+
+    @property
+    def end(self):
+        """Offset in seconds when the group is over, or None if it depends on how fast samplers run"""
+        return self.delay + self.duration if self.duration else None
+
+    @property
+    def unbounded(self):
+        """Whether the group only stops when the run's duration is over"""
+        if self.end is not None:
+            return False
+        pending = [Loop(self.loops, self.children)]
+        while pending:
+            loop = pending.pop()
+            if loop.loops is None:
+                return True
+            pending.extend(child for child in loop.children if isinstance(child, Loop))
+        return False
+
+    def describe(self):
+        loops = "forever" if self.loops is None else f"{self.loops} loops"
+        text = f"{self.users} users over {self.ramp_up:g}s, {loops}"
+        return text + (f", stop after {self.duration:g}s" if self.duration else "")
+
+
+class SteppingThreadGroup(ThreadGroup):
+    """jp@gc Stepping Thread Group: start users in batches, hold, then stop them in batches"""
+
+    def __init__(self, name, users, initial_delay=0.0, start_count=1, start_burst=0, start_period=0.0,
+                 ramp_up=0.0, hold=0.0, stop_count=0, stop_period=0.0, loops=None, on_error="continue",
+                 children=None):
+        """
+        Args:
+            name (str): Thread group name
+            users (int): Total number of threads
+            initial_delay (float): Seconds before the first batch
+            start_count (int): Threads started every start_period
+            start_burst (int): Size of the first batch (start_count when 0)
+            start_period (float): Seconds between batches
+            ramp_up (float): Seconds over which each batch is started
+            hold (float): Seconds the full load is held once every thread runs
+            stop_count (int): Threads stopped every stop_period (all at once when 0)
+            stop_period (float): Seconds between stop batches
+            loops (int): Iterations per thread (None: until stopped)
+            on_error (str): Action after a failed sample
+            children (list): Samplers and Loop controllers
+        """
+        if start_count <= 0 and start_burst <= 0:
+            raise ValueError(f"Stepping thread group '{name}' starts no users")
+        super().__init__(name, users, ramp_up, loops, None, initial_delay, on_error, children)
+        self.start_count = start_count
+        self.start_burst = start_burst
+        self.start_period = start_period
+        self.hold = hold
+        self.stop_count = stop_count
+        self.stop_period = stop_period
+
+    def user_schedule(self):
+        starts = []
+        batch_start = self.delay
+        batch = self.start_burst or self.start_count
+        while len(starts) < self.users:
+            size = min(batch, self.users - len(starts))
+            starts.extend(batch_start + self.ramp_up * k / size for k in range(size))
+            batch_start += self.start_period
+            batch = self.start_count or batch
+
+        # The last started threads are the first to stop
+        stopping = starts[-1] + self.hold
+        stops = [0.0] * self.users
+        for rank, index in enumerate(range(self.users - 1, -1, -1)):
+            step = rank // self.stop_count if self.stop_count else 0
+            stops[index] = stopping + step * self.stop_period
+        return list(zip(starts, stops))
+
+    @property
+    def end(self):
+        return max(stop for _, stop in self.user_schedule())
+
+    def describe(self):
+        return (f"{self.users} users, +{self.start_count} every {self.start_period:g}s, hold {self.hold:g}s, "
+                f"-{self.stop_count or self.users} every {self.stop_period:g}s")
+
+
+class Scenario:
+    """An imported test plan: thread groups that run concurrently"""
+
+    def __init__(self, name, thread_groups, skipped=None, share=(0, 1)):
+        """
+        Args:
+            name (str): Test plan name
+            thread_groups (list): ThreadGroup objects
+            skipped (list): Names of plan elements that are not run
+            share (tuple): (index, count): run every count-th thread starting at index,
+                so worker processes can split a plan without changing its timing
+        """
+        self.name = name
+        self.thread_groups = thread_groups
+        self.skipped = skipped or []
+        self.share = share
+
+    def users(self):
+        """(thread group, start, stop) of every thread in this share of the plan"""
+        index, count = self.share
+        for group in self.thread_groups:
+            for number, (start, stop) in enumerate(group.user_schedule()):
+                if number % count == index:
+                    yield group, start, stop
+
+    def samplers(self):
+        """Every sampler of the plan once, in tree order"""
+        return [sampler for group in self.thread_groups for sampler in _flatten(group.children)]
+
+    def split(self, index, count):
+        """The index-th of count equal shares of the threads"""
+        return Scenario(self.name, self.thread_groups, self.skipped, (index, count))
+
+    @property
+    def unbounded(self):
+        """Whether some thread group loops until the run is stopped"""
+        return any(group.unbounded for group in self.thread_groups)
+
+
+def load_jmx(path, overrides=None, names=None):
+    """
+    Parse a .jmx plan into a Scenario
+
+    Args:
+        path (str): JMeter plan
+        overrides (dict): Values for user defined variables and ${__P()} properties, like -J
+        names (list): Only keep samplers whose name starts with one of these (default: all)
+
+    Returns:
+        Scenario: The plan's enabled thread groups that have samplers
+    """
+    root = ET.parse(path).getroot()
+    overrides = overrides or {}
+    variables = {}
+    for plan in root.iter("TestPlan"):
+        for arguments in plan.findall("elementProp[@name='TestPlan.user_defined_variables']"):
+            variables.update(_arguments(arguments, variables, overrides))
+    for arguments in root.iter("Arguments"):
+        if arguments.get("enabled", "true") == "true":
+            variables.update(_arguments(arguments, variables, overrides))
+    variables.update(overrides)
+
+    importer = _Importer(variables, overrides, names)
+    plan, plan_tree = _pairs(root.find("hashTree"))[0]
+    importer.walk(plan_tree, _Scope(), None)
+    if not importer.thread_groups:
+        raise ValueError(f"No thread group with samplers in {path}")
+    return Scenario(plan.get("testname", path), importer.thread_groups, importer.skipped)
+
+
+class _Scope:
+    """Headers, defaults, timers and assertions that apply to a subtree"""
+
+    def __init__(self, headers=None, defaults=None, timers=(), assertions=()):
+        self.headers = headers or {}
+        self.defaults = defaults or {}
+        self.timers = list(timers)
+        self.assertions = list(assertions)
+
+    def extend(self, elements, importer):
+        """Scope for the subtree whose level holds these (element, subtree) pairs"""
+        scope = _Scope(dict(self.headers), dict(self.defaults), self.timers, self.assertions)
+        for element, _ in elements:
+            tag = element.get("testclass", element.tag)
+            if tag == "HeaderManager":
+                for header in element.iter("elementProp"):
+                    props = _props(header)
+                    scope.headers[importer.resolve(props.get("Header.name", ""))] = importer.resolve(
+                        props.get("Header.value", ""))
+            elif tag == "ConfigTestElement":
+                scope.defaults.update(
+                    {key: importer.resolve(value) for key, value in _props(element).items() if value}
+                )
+            elif tag in TIMERS:
+                scope.timers.append(importer.timer(element))
+            elif tag in ASSERTIONS:
+                scope.assertions.append(importer.assertion(element))
+        return scope
+
+
+class _Importer:
+    def __init__(self, variables, overrides, names):
+        self.variables = variables
+        self.overrides = overrides
+        self.names = names
+        self.thread_groups = []
+        self.skipped = []
+
+    def walk(self, tree, scope, children):
+        """
+        Import the (element, subtree) pairs of a tree level
+
+        Args:
+            tree (Element): hashTree
+            scope (_Scope): What applies from the enclosing levels
+            children (list): Where samplers and loops go, or None outside thread groups
+        """
+        pairs = _pairs(tree)
+        scope = scope.extend(pairs, self)
+        for element, subtree in pairs:
+            tag = element.get("testclass", element.tag)
+            if tag in THREAD_GROUPS:
+                group = self.thread_group(element, tag)
+                self.walk(subtree, scope, group.children)
+                if group.children:
+                    self.thread_groups.append(group)
+                else:
+                    self.skipped.append(f"{tag} '{group.name}' (no samplers)")
+            elif children is None:
+                if tag not in LISTENERS | VARIABLES | TIMERS | ASSERTIONS | {"HeaderManager", "ConfigTestElement"}:
+                    self.skipped.append(f"{tag} '{element.get('testname', '')}'")
+            elif tag == "HTTPSamplerProxy":
+                sampler = self.sampler(element, scope.extend(_pairs(subtree), self))
+                if not self.names or any(sampler.name.startswith(name) for name in self.names):
+                    children.append(sampler)
+            elif tag in ("LoopController", "GenericController", "TransactionController"):
+                loop = Loop(self.loops(element) if tag == "LoopController" else 1, [])
+                self.walk(subtree, scope, loop.children)
+                if loop.children:
+                    children.append(loop)
+            elif tag not in LISTENERS | TIMERS | ASSERTIONS | {"HeaderManager", "ConfigTestElement", "Arguments"}:
+                self.skipped.append(f"{tag} '{element.get('testname', '')}'")
+
+    def thread_group(self, element, tag):
+        props = _props(element)
+        name = element.get("testname", tag)
+        on_error = props.get("ThreadGroup.on_sample_error", "continue") or "continue"
+        users = self.number(props.get("ThreadGroup.num_threads", "1"), int)
+        loops = None
+        controller = element.find("elementProp[@name='ThreadGroup.main_controller']")
+        if controller is not None:
+            loops = self.loops(controller)
+        if tag != "ThreadGroup":
+            return SteppingThreadGroup(
+                name, users,
+                initial_delay=self.number(props.get("Threads initial delay", "0")),
+                start_count=self.number(props.get("Start users count", "1"), int),
+                start_burst=self.number(props.get("Start users count burst", "0"), int),
+                start_period=self.number(props.get("Start users period", "0")),
+                ramp_up=self.number(props.get("rampUp", "0")),
+                hold=self.number(props.get("flighttime", "0")),
+                stop_count=self.number(props.get("Stop users count", "0"), int),
+                stop_period=self.number(props.get("Stop users period", "0")),
+                loops=loops, on_error=on_error,
+            )
+        scheduler = props.get("ThreadGroup.scheduler") == "true"
+        duration = self.number(props.get("ThreadGroup.duration", "")) if scheduler else None
+        delay = self.number(props.get("ThreadGroup.delay", "")) if scheduler else 0.0
+        return ThreadGroup(
+            name, users, ramp_up=self.number(props.get("ThreadGroup.ramp_time", "0")), loops=loops,
+            duration=duration or None, delay=delay, on_error=on_error,
+        )
+
+    def loops(self, element):
+        """Loop count of a LoopController, None for forever"""
+        loops = self.number(_props(element).get("LoopController.loops", "1"), int)
+        return None if loops < 0 else loops
+
+    def sampler(self, element, scope):
+        props = {key: self.resolve(value) for key, value in _props(element).items()}
+        name = element.get("testname", "HTTP Request")
+        method = props.get("HTTPSampler.method", "GET").upper()
+
+        def field(key):
+            return props.get(key) or scope.defaults.get(key, "")
+
+        path = props.get("HTTPSampler.path", "")
+        if re.match(r"https?://", path):
+            url = path
+        else:
+            port = field("HTTPSampler.port")
+            url = f"{field('HTTPSampler.protocol') or 'http'}://{field('HTTPSampler.domain')}"
+            url += (f":{port}" if port else "") + (path if path.startswith("/") else "/" + path)
+
+        headers = dict(scope.headers)
+        body = None
+        arguments = [
+            _props(argument) for argument in element.findall(
+                "elementProp[@name='HTTPsampler.Arguments']/collectionProp/elementProp")
+        ]
+        if props.get("HTTPSampler.postBodyRaw") == "true":
+            body = "".join(self.resolve(argument.get("Argument.value", "")) for argument in arguments)
+        elif arguments:
+            query = urlencode([
+                (self.resolve(argument.get("Argument.name", "")), self.resolve(argument.get("Argument.value", "")))
+                for argument in arguments
+            ])
+            if method in ("POST", "PUT", "PATCH"):
+                body = query
+                headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+            else:
+                url += ("&" if "?" in url else "?") + query
+
+        return Sampler(
+            name, method, url, headers, body.encode("utf-8") if body is not None else None,
+            assertions=scope.assertions, timers=scope.timers,
+        )
+
+    def timer(self, element):
+        props = {key: self.resolve(value) for key, value in _props(element).items()}
+        tag = element.get("testclass", element.tag)
+        if tag == "ConstantTimer":
+            return Timer(tag, self.number(props.get("ConstantTimer.delay", "0")))
+        return Timer(tag, self.number(props.get("ConstantTimer.delay", "0")),
+                     self.number(props.get("RandomTimer.range", "0")))
+
+    def assertion(self, element):
+        props = {key: self.resolve(value) for key, value in _props(element).items()}
+        tag = element.get("testclass", element.tag)
+        name = element.get("testname", tag)
+        if tag == "DurationAssertion":
+            return DurationAssertion(name, self.number(props.get("DurationAssertion.duration", "0"), int))
+        if tag == "JSONPathAssertion":
+            return JsonPathAssertion(
+                name, props.get("JSON_PATH", "$"), props.get("EXPECTED_VALUE", ""),
+                validate=props.get("JSONVALIDATION") == "true", expect_null=props.get("EXPECT_NULL") == "true",
+                invert=props.get("INVERT") == "true", regex=props.get("ISREGEX", "true") == "true",
+            )
+        field = props.get("Assertion.test_field", "Assertion.response_data")
+        if field not in ResponseAssertion.FIELDS:
+            raise ValueError(f"Response assertion '{name}' tests {field}, which is not supported. "
+                             f"Use one of: {', '.join(ResponseAssertion.FIELDS)}.")
+        # JMeter really stores the patterns under "Asserion.test_strings"
+        patterns = [self.resolve(prop.text or "") for prop in element.findall(
+            "collectionProp[@name='Asserion.test_strings']/stringProp")]
+        return ResponseAssertion(
+            name, ResponseAssertion.FIELDS[field], self.number(props.get("Assertion.test_type", "16"), int), patterns,
+            ignore_status=props.get("Assertion.assume_success") == "true",
+            custom_message=props.get("Assertion.custom_message", ""),
+        )
+
+    def resolve(self, text):
+        """Replace ${VAR} and ${__P(name,default)}; unknown references are left as they are"""
+        def replace(match):
+            reference = match.group(1)
+            function = PROPERTY_FUNCTION.fullmatch(reference)
+            if function:
+                return self.overrides.get(function.group(1), function.group(2) or "")
+            return str(self.variables.get(reference, match.group(0)))
+
+        return REFERENCE.sub(replace, text)
+
+    def number(self, text, kind=float):
+        """A numeric property, 0 when empty"""
+        text = self.resolve(text).strip()
+        if not text:
+            return kind(0)
+        try:
+            return kind(float(text))
+        except ValueError:
+            raise ValueError(f"Expected a number in the plan, got '{text}'") from None
+
+
+def _flatten(children):
+    for child in children:
+        if isinstance(child, Loop):
+            yield from _flatten(child.children)
+        else:
+            yield child
+
+
+def _pairs(tree):
+    """(element, subtree) pairs of a hashTree level, disabled elements left out"""
+    if tree is None:
+        return []
+    children = list(tree)
+    pairs = []
+    for index in range(0, len(children) - 1, 2):
+        element, subtree = children[index], children[index + 1]
+        if element.get("enabled", "true") == "true":
+            pairs.append((element, subtree))
+    return pairs
+
+
+def _props(element):
+    """Direct string/int/long/bool properties of an element"""
+    return {
+        prop.get("name"): prop.text or ""
+        for prop in element
+        if prop.tag in ("stringProp", "intProp", "longProp", "boolProp")
+    }
+
+
+def _arguments(element, variables, overrides):
+    """User defined variables of an Arguments element, each one able to use the previous ones"""
+    importer = _Importer(dict(variables), overrides, None)
+    values = {}
+    for argument in element.findall("collectionProp/elementProp"):
+        props = _props(argument)
+        name = props.get("Argument.name", argument.get("name", ""))
+        values[name] = importer.variables[name] = importer.resolve(props.get("Argument.value", ""))
+    return values
+
+
+JSON_PATH_TOKEN = re.compile(r"\.\.([\w$-]+|\*)|\.([\w$-]+|\*)|\[\s*(\*|-?\d+|'[^']*'|\"[^\"]*\")\s*\]")
+
+
+def _compile_json_path(path):
+    """
+    Steps of a JSONPath expression and whether it selects a single value
+
+    Returns:
+        tuple: (list of (kind, key) steps, definite)
+    """
+    path = path.strip()
+    if not path.startswith("$"):
+        path = "$." + path
+    steps, position, definite = [], 1, True
+    while position < len(path):
+        match = JSON_PATH_TOKEN.match(path, position)
+        if match is None:
+            raise ValueError(f"JSONPath '{path}' not supported at '{path[position:]}'")
+        descendant, child, bracket = match.groups()
+        key = descendant or child or bracket
+        if key.startswith(("'", '"')):
+            key = key[1:-1]
+        elif bracket and key != "*":
+            key = int(key)
+        if descendant or key == "*":
+            definite = False
+        steps.append(("descendant" if descendant else "child", key))
+        position = match.end()
+    return steps, definite
+
+
+def _evaluate_json_path(document, steps):
+    """Values selected by compiled JSONPath steps"""
+    values = [document]
+    for kind, key in steps:
+        selected = []
+        for value in values:
+            candidates = _descendants(value) if kind == "descendant" else [value]
+            for candidate in candidates:
+                selected.extend(_select(candidate, key))
+        values = selected
+    return values
+
+
+def _select(value, key):
+    if key == "*":
+        return list(value.values()) if isinstance(value, dict) else list(value) if isinstance(value, list) else []
+    if isinstance(key, int):
+        if isinstance(value, list) and -len(value) <= key < len(value):
+            return [value[key]]
+        return []
+    if isinstance(value, dict) and key in value:
+        return [value[key]]
+    return []
+
+
+def _descendants(value):
+    """The value and everything nested in it"""
+    yield value
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else ()
+    for child in children:
+        yield from _descendants(child)
+
+
+def _json_text(value):
+    """A JSON value as JMeter's assertion compares it"""
+    return value if isinstance(value, str) else json.dumps(value, separators=(",", ":"))
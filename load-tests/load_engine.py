@@ -0,0 +1,444 @@
+"""
+asyncio load engine replaying request templates over pooled keep-alive connections
+
+Workload models:
+    closed: a fixed number of virtual users, each sending its next request as
+            soon as the previous one finished (plus optional think time), like a
+            JMeter thread group
+    open:   requests start on the intended-start times of a Schedule (constant,
+            ramp, step, spike) regardless of how fast the server answers
+    scenario: a JMeter plan imported by jmx_importer, run with its own thread
+            groups, loops, timers and assertions
+
+A closed model hides slowdowns: when the server stalls, users stop sending and
+the stall shows up as one slow sample instead of many (coordinated omission).
+In the open model every request also gets a corrected latency, measured from
+its intended start, which includes any time it spent waiting to be sent.
+
+Results are aggregated per label with the same stats and histograms as the JMeter
+tooling in reports/, so summaries, histogram files and baselines work unchanged.
+"""
+import os
+import csv
+import time
+import json
+import asyncio
+import itertools
+from collections import deque
+
+import aiohttp
+
+# The result model (LabelStats, LatencyHistogram) lives with the report scripts in reports/,
+# which the entry point (run_load_test.py, or pytest.ini for tests) puts on sys.path
+from jtl_analyzer import JtlAnalyzer, LabelStats, DEFAULT_CSV_FIELDS
+from sample_stream import SampleStreamWriter
+from metrics_exporter import DEFAULT_BUCKETS
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+class FailureBuffer:
+    """The most recent failed samples with their response bodies, in a ring of fixed size"""
+
+    def __init__(self, capacity=50, max_body=64 * 1024):
+        """
+        Args:
+            capacity (int): Failed samples kept; older ones are overwritten
+            max_body (int): Bytes of each response body kept
+        """
+        self.capacity = capacity
+        self.max_body = max_body
+        self.entries = deque(maxlen=capacity)
+        self.overwritten = 0
+
+    def add(self, label, timestamp, status, message, url=None, body=None):
+        """Keep one failed sample, dropping the oldest when the ring is full"""
+        if not self.capacity:
+            self.overwritten += 1
+            return
+        if len(self.entries) == self.capacity:
+            self.overwritten += 1
+        body = body[:self.max_body].decode("utf-8", errors="replace") if body else ""
+        self.entries.append({
+            "label": label, "timestamp": timestamp, "status": status, "message": message, "url": url, "body": body,
+        })
+
+    def save(self, path):
+        """Write the kept failures as JSON, oldest first"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({"overwritten": self.overwritten, "failures": list(self.entries)}, f, indent=2)
+
+
+class LoadMetrics:
+    """Live per-label request, error and latency metrics of a load run, for a MetricsServer"""
+
+    def __init__(self, registry, buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            registry (MetricsRegistry): Where the metrics are registered
+            buckets (tuple): Latency histogram bounds in seconds
+        """
+        self.requests = registry.counter("load_requests_total", "Requests sent", ["label"])
+        self.errors = registry.counter("load_errors_total", "Failed requests", ["label"])
+        self.latency = registry.histogram(
+            "load_latency_seconds", "Response time from when the request was sent", ["label"], buckets
+        )
+        self._bounds_ms = [bound * 1000 for bound in self.latency.bounds]
+        self._series = {}
+
+    def record(self, label, elapsed, success):
+        """Count one sample (elapsed in milliseconds)"""
+        series = self._series.get(label) or self._add_label(label)
+        series[0].inc()
+        if not success:
+            series[1].inc()
+        series[2].observe(elapsed / 1000)
+
+    def merge(self, stats):
+        """Count the samples of a LabelStats handed over by a worker process"""
+        requests, errors, latency = self._series.get(stats.label) or self._add_label(stats.label)
+        requests.inc(stats.count)
+        errors.inc(stats.errors)
+        cumulative = [stats.histogram.count_at_or_below(bound) for bound in self._bounds_ms] + [stats.count]
+        latency.add([count - previous for count, previous in zip(cumulative, [0] + cumulative)],
+                    stats.elapsed_sum / 1000)
+
+    def _add_label(self, label):
+        series = self._series[label] = (
+            self.requests.labels(label), self.errors.labels(label), self.latency.labels(label)
+        )
+        return series
+
+
+class LoadResults:
+    """
+    Per-label results of a load run, optionally streamed to a CSV JTL file or a
+    binary sample stream
+
+    `analyzer` holds the uncorrected latency (from when the request was actually
+    sent, what JMeter reports); `corrected` holds the latency from the intended
+    start and is only filled by open-model runs. Response bodies are only kept
+    for the last failed samples, in `failures`.
+    """
+
+    # Distinct error messages kept for the summary
+    MAX_ERROR_KINDS = 20
+
+    def __init__(self, jtl_path=None, samples_path=None, keep_failures=50, metrics=None):
+        """
+        Args:
+            jtl_path (str): Write every sample to this JMeter-compatible CSV file (optional)
+            samples_path (str): Write every sample to this binary sample stream (optional)
+            keep_failures (int): Failed samples whose response body is kept
+            metrics (LoadMetrics): Live metrics updated with every sample (optional)
+        """
+        self.metrics = metrics
+        self.analyzer = JtlAnalyzer()
+        self.corrected = JtlAnalyzer()
+        self.errors = {}
+        self.failures = FailureBuffer(keep_failures)
+        self._jtl_file = None
+        self._jtl = None
+        self._samples = None
+        if jtl_path:
+            os.makedirs(os.path.dirname(os.path.abspath(jtl_path)), exist_ok=True)
+            self._jtl_file = open(jtl_path, 'w', newline='', buffering=1024 * 1024)
+            self._jtl = csv.writer(self._jtl_file)
+            self._jtl.writerow(DEFAULT_CSV_FIELDS)
+        if samples_path:
+            os.makedirs(os.path.dirname(os.path.abspath(samples_path)), exist_ok=True)
+            self._samples = SampleStreamWriter(samples_path)
+
+    def record(self, label, timestamp, elapsed, success, size=0, status="", message="", intended=None,
+               url=None, body=None):
+        """
+        Record one sample
+
+        Args:
+            label (str): Request name
+            timestamp (int): Start time in epoch milliseconds
+            elapsed (int): Latency in milliseconds
+            success (bool): Whether the response was the expected one
+            size (int): Response body size in bytes
+            status (str): HTTP status code, or the exception name for transport errors
+            message (str): Failure description
+            intended (int): Intended start time in epoch milliseconds (open model only)
+            url (str): Request URL, kept with failed samples
+            body (bytes): Response body, kept with failed samples
+        """
+        self.analyzer.add(label, elapsed, success, timestamp, size)
+        if self.metrics:
+            self.metrics.record(label, elapsed, success)
+        if intended is not None:
+            self.corrected.add(label, timestamp + elapsed - intended, success, intended, size)
+        if not success:
+            key = f"{label}: {message or status}"
+            if key in self.errors or len(self.errors) < self.MAX_ERROR_KINDS:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            self.failures.add(label, timestamp, status, message, url, body)
+        if self._samples:
+            self._samples.write(label, timestamp, elapsed, success, size, int(status) if status.isdigit() else 0)
+        if self._jtl:
+            self._jtl.writerow([
+                timestamp, elapsed, label, status, "", "", "text", "true" if success else "false",
+                message, size, 0, "", "", "", elapsed, 0, 0
+            ])
+
+    def take(self):
+        """
+        Hand over the samples recorded since the last call and start counting afresh
+
+        Returns:
+            dict: Serialized per-label stats ("samples", "corrected"), "errors" and kept "failures"
+        """
+        delta = {
+            "samples": {label: stats.to_dict() for label, stats in self.analyzer.labels.items()},
+            "corrected": {label: stats.to_dict() for label, stats in self.corrected.labels.items()},
+            "errors": self.errors,
+            "failures": list(self.failures.entries),
+            "overwritten": self.failures.overwritten,
+        }
+        self.analyzer = JtlAnalyzer()
+        self.corrected = JtlAnalyzer()
+        self.errors = {}
+        self.failures = FailureBuffer(self.failures.capacity, self.failures.max_body)
+        return delta
+
+    def merge(self, delta):
+        """Add samples handed over by another LoadResults.take()"""
+        for key, analyzer in (("samples", self.analyzer), ("corrected", self.corrected)):
+            for label, data in delta[key].items():
+                stats = LabelStats.from_dict(label, data)
+                if self.metrics and analyzer is self.analyzer:
+                    self.metrics.merge(stats)
+                if label in analyzer.labels:
+                    analyzer.labels[label].merge(stats)
+                else:
+                    analyzer.labels[label] = stats
+        for key, count in delta["errors"].items():
+            if key in self.errors or len(self.errors) < self.MAX_ERROR_KINDS:
+                self.errors[key] = self.errors.get(key, 0) + count
+        # Failures arrive oldest first, so the ring ends up with the most recent ones
+        self.failures.overwritten += delta["overwritten"]
+        for failure in delta["failures"]:
+            if len(self.failures.entries) == self.failures.capacity:
+                self.failures.overwritten += 1
+            self.failures.entries.append(failure)
+
+    def close(self):
+        if self._jtl_file:
+            self._jtl_file.close()
+            self._jtl_file = self._jtl = None
+        if self._samples:
+            self._samples.close()
+            self._samples = None
+
+
+class LoadEngine:
+    """Send request templates at high concurrency from a single event loop"""
+
+    def __init__(self, templates, max_connections=1000, timeout=30, keep_alive=True, results=None):
+        """
+        Args:
+            templates (list): RequestTemplate objects, sent in round-robin order
+            max_connections (int): Size of the connection pool shared by all requests
+            timeout (float): Total timeout of one request in seconds
+            keep_alive (bool): Reuse connections between requests
+            results (LoadResults): Where samples are recorded (a new one by default)
+        """
+        self.templates = templates
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.results = results or LoadResults()
+
+    def run(self, model="closed", on_tick=None, tick_interval=0.5, **kwargs):
+        """
+        Run a workload to completion
+
+        Args:
+            model (str): "closed" (see run_closed), "open" (see run_open) or "scenario" (see run_scenario)
+            on_tick (callable): Called with the LoadResults every tick_interval seconds
+                from inside the event loop, and once more at the end
+            tick_interval (float): Seconds between on_tick calls
+            **kwargs: Arguments of the chosen model
+
+        Returns:
+            LoadResults: The recorded samples
+        """
+        runner = {"closed": self.run_closed, "open": self.run_open, "scenario": self.run_scenario}.get(model)
+        if runner is None:
+            raise ValueError(f"Workload model '{model}' not supported. Use 'closed', 'open' or 'scenario'.")
+        if uvloop is not None:
+            uvloop.install()
+        try:
+            asyncio.run(self._run_with_ticks(runner(**kwargs), on_tick, tick_interval))
+        finally:
+            self.results.close()
+        return self.results
+
+    async def _run_with_ticks(self, workload, on_tick, tick_interval):
+        if on_tick is None:
+            await workload
+            return
+
+        async def ticker():
+            while True:
+                await asyncio.sleep(tick_interval)
+                on_tick(self.results)
+
+        ticks = asyncio.ensure_future(ticker())
+        try:
+            await workload
+        finally:
+            ticks.cancel()
+        on_tick(self.results)
+
+    async def run_closed(self, users, duration, think_time=0.0, ramp_up=0.0):
+        """
+        Virtual users loop over the templates until the duration is over
+
+        Args:
+            users (int): Number of concurrent virtual users
+            duration (float): Length of the run in seconds, ramp-up included
+            think_time (float): Pause in seconds after each response
+            ramp_up (float): Seconds over which users are started evenly
+        """
+        async with self._session() as session:
+            deadline = time.monotonic() + duration
+
+            async def user(index):
+                if ramp_up:
+                    await asyncio.sleep(ramp_up * index / users)
+                # Stagger users over the templates so every label gets traffic from the start
+                templates = itertools.islice(itertools.cycle(self.templates), index % len(self.templates), None)
+                for template in templates:
+                    if time.monotonic() >= deadline:
+                        return
+                    await self._send(session, template)
+                    if think_time:
+                        await asyncio.sleep(think_time)
+
+            await asyncio.gather(*(user(i) for i in range(users)))
+
+    async def run_open(self, schedule, max_in_flight=None):
+        """
+        Start requests on the schedule's intended-start times
+
+        Requests are never held back by slow responses. If the generator falls
+        behind (or max_in_flight is reached), late requests are sent as soon as
+        possible and their corrected latency includes the delay.
+
+        Args:
+            schedule (Schedule): Arrival rate over time
+            max_in_flight (int): Cap on concurrent requests (defaults to the connection pool size)
+        """
+        limit = asyncio.Semaphore(max_in_flight or self.max_connections)
+        tasks = set()
+
+        async def send(session, template, intended):
+            await limit.acquire()
+            try:
+                await self._send(session, template, intended)
+            finally:
+                limit.release()
+
+        async with self._session() as session:
+            start = time.monotonic()
+            # Wall-clock time matching `start`, to turn offsets into sample timestamps
+            epoch = time.time()
+            templates = itertools.cycle(self.templates)
+            for offset in schedule.intended_starts():
+                delay = start + offset - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.ensure_future(send(session, next(templates), int((epoch + offset) * 1000)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+
+    async def run_scenario(self, scenario, duration=None):
+        """
+        Run an imported JMeter plan: every thread of every thread group on its own schedule
+
+        Args:
+            scenario (Scenario): Plan from jmx_importer.load_jmx
+            duration (float): Stop every thread after this many seconds (required if the plan loops forever)
+        """
+        if duration is None and scenario.unbounded:
+            raise ValueError(f"Plan '{scenario.name}' loops until it is stopped; give it a duration")
+        stop_test = asyncio.Event()
+
+        async with self._session() as session:
+            start = time.monotonic()
+
+            async def user(group, begin, end):
+                limits = [value for value in (end, duration) if value is not None]
+                stop_at = start + min(limits) if limits else None
+                if stop_at is not None and start + begin >= stop_at:
+                    return
+                await asyncio.sleep(begin)
+                loop = 0
+                while group.loops is None or loop < group.loops:
+                    loop += 1
+                    for sampler in group.iteration():
+                        think_time = sampler.think_time()
+                        if stop_test.is_set() or (stop_at is not None and time.monotonic() + think_time >= stop_at):
+                            return
+                        if think_time:
+                            await asyncio.sleep(think_time)
+                        if await self._send(session, sampler) or group.on_error == "continue":
+                            continue
+                        if group.on_error == "startnextloop":
+                            break
+                        if group.on_error in ("stoptest", "stoptestnow"):
+                            stop_test.set()
+                        return
+
+            await asyncio.gather(*(user(group, begin, end) for group, begin, end in scenario.users()))
+
+    def _session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections, limit_per_host=0, ttl_dns_cache=300, force_close=not self.keep_alive
+        )
+        return aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout), cookie_jar=aiohttp.DummyCookieJar()
+        )
+
+    async def _send(self, session, template, intended=None):
+        """
+        Send one request and record its sample
+
+        Args:
+            session (aiohttp.ClientSession): Pooled session
+            template (RequestTemplate): Request to send; its check() judges the response
+            intended (int): Planned start in epoch milliseconds (open model)
+
+        Returns:
+            bool: Whether the sample succeeded
+        """
+        url, headers, body = template.render()
+        timestamp = int(time.time() * 1000)
+        started = time.perf_counter()
+        try:
+            async with session.request(template.method, url, headers=headers, data=body) as response:
+                payload = await response.read()
+            elapsed = int((time.perf_counter() - started) * 1000)
+            success, message = template.check(response.status, payload, elapsed)
+            self.results.record(
+                template.name, timestamp, elapsed, success, len(payload), str(response.status), message, intended,
+                url, None if success else payload
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            elapsed = int((time.perf_counter() - started) * 1000)
+            success = False
+            self.results.record(
+                template.name, timestamp, elapsed, False, 0, type(e).__name__, str(e) or type(e).__name__, intended,
+                url
+            )
+        return success
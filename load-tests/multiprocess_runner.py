@@ -0,0 +1,149 @@
+"""
+Spread a load run over several worker processes
+
+Each worker runs its own LoadEngine (event loop and connection pool) with an equal
+share of the load: users are divided for the closed model and JMeter plans, and the
+schedule's rates are scaled for the open model. Every tick a worker hands its new
+samples (per-label counters and HDR histograms, a few KB) to the parent over a pipe.
+The parent merges them into a global view and prints RPS, error rate and percentiles
+as the run goes.
+"""
+import os
+import sys
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+
+from load_engine import LoadEngine, LoadResults
+
+
+def _worker_main(conn, templates, model, workload, engine_options, result_options, tick_interval):
+    """Entry point of a worker process: run the engine and stream deltas to the parent"""
+    engine = LoadEngine(templates, results=LoadResults(**result_options), **engine_options)
+    try:
+        engine.run(model, on_tick=lambda results: conn.send(("delta", results.take())),
+                   tick_interval=tick_interval, **workload)
+        conn.send(("done", None))
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+class MultiProcessRunner:
+    """Run a load test on N worker processes and aggregate their results live"""
+
+    def __init__(self, templates, workers=None, tick_interval=0.5, jtl_path=None, samples_path=None, keep_failures=50,
+                 metrics=None, output=sys.stdout, **engine_options):
+        """
+        Args:
+            templates (list): RequestTemplate objects
+            workers (int): Number of processes (defaults to the number of CPUs)
+            tick_interval (float): Seconds between result hand-overs and live status lines
+            jtl_path (str): Per-sample CSV output; each worker writes <path>.<index>
+            samples_path (str): Binary sample stream; each worker writes <path>.<index>
+            keep_failures (int): Failed samples whose response body is kept, across all workers
+            metrics (LoadMetrics): Live metrics, updated as worker results arrive
+            output (file): Where live status lines are printed (None to stay quiet)
+            **engine_options: LoadEngine options (max_connections is per worker)
+        """
+        self.templates = templates
+        self.workers = workers or os.cpu_count() or 1
+        self.tick_interval = tick_interval
+        self.jtl_path = jtl_path
+        self.samples_path = samples_path
+        self.keep_failures = keep_failures
+        self.output = output
+        self.engine_options = engine_options
+        self.results = LoadResults(keep_failures=keep_failures, metrics=metrics)
+
+    def run(self, model="closed", **workload):
+        """
+        Run the workload split across the workers
+
+        Args:
+            model (str): "closed", "open" or "scenario"
+            **workload: The model's arguments for the whole run (users, schedule, ...)
+
+        Returns:
+            LoadResults: Merged samples of every worker
+        """
+        context = multiprocessing.get_context("spawn")
+        connections, processes = [], []
+        for index in range(self.workers):
+            share = self._share(model, workload, index)
+            if share is None:
+                continue
+            parent_end, child_end = context.Pipe(duplex=False)
+            result_options = {
+                "jtl_path": f"{self.jtl_path}.{index}" if self.jtl_path else None,
+                "samples_path": f"{self.samples_path}.{index}" if self.samples_path else None,
+                "keep_failures": self.keep_failures,
+            }
+            process = context.Process(
+                target=_worker_main, name=f"load-worker-{index}",
+                args=(child_end, self.templates, model, share, self.engine_options, result_options, self.tick_interval)
+            )
+            process.start()
+            child_end.close()
+            connections.append(parent_end)
+            processes.append(process)
+
+        failures = []
+        started = time.monotonic()
+        window_start, window_count = started, 0
+        pending = set(connections)
+        while pending:
+            for conn in wait(list(pending), timeout=self.tick_interval):
+                try:
+                    kind, payload = conn.recv()
+                except EOFError:
+                    kind, payload = "failed", "worker exited without reporting"
+                if kind == "delta":
+                    window_count += sum(stats["count"] for stats in payload["samples"].values())
+                    self.results.merge(payload)
+                    continue
+                if kind == "failed":
+                    failures.append(payload)
+                pending.discard(conn)
+
+            now = time.monotonic()
+            if now - window_start >= self.tick_interval:
+                self._print_status(now - started, window_count / (now - window_start))
+                window_start, window_count = now, 0
+
+        for process in processes:
+            process.join()
+        if failures:
+            raise RuntimeError("Load workers failed: " + "; ".join(failures))
+        return self.results
+
+    def _share(self, model, workload, index):
+        """One worker's part of the workload, or None when there is nothing left for it"""
+        share = dict(workload)
+        if model == "closed":
+            users = workload["users"] // self.workers + (1 if index < workload["users"] % self.workers else 0)
+            if not users:
+                return None
+            # Every worker ramps its own users over the same ramp-up, so the combined ramp stays even
+            share["users"] = users
+        elif model == "scenario":
+            share["scenario"] = workload["scenario"].split(index, self.workers)
+            if not any(True for _ in share["scenario"].users()):
+                return None
+        else:
+            share["schedule"] = workload["schedule"].scaled(1.0 / self.workers)
+            if share.get("max_in_flight"):
+                share["max_in_flight"] = max(1, share["max_in_flight"] // self.workers)
+        return share
+
+    def _print_status(self, elapsed, rps):
+        if self.output is None:
+            return
+        total = self.results.analyzer.total()
+        percentiles = total.histogram.percentiles([50, 95, 99])
+        print(
+            f"[{elapsed:6.1f}s] {rps:8.0f} req/s  {total.count:>9} samples  {total.error_rate:6.2f}% errors  "
+            f"p50 {percentiles[50]} ms  p95 {percentiles[95]} ms  p99 {percentiles[99]} ms",
+            file=self.output, flush=True
+        )
@@ -0,0 +1,164 @@
+"""
+Load a Postman collection and environment as request templates for the load engine
+
+Only what matters for generating load is taken from the collection: method,
+URL, headers and body, with {{variables}} resolved from the environment and the
+collection. Test scripts are JavaScript and are not executed; the expected status
+code is read from `pm.response.to.have.status(...)` so responses can still be checked.
+"""
+import re
+import json
+import time
+import uuid
+import random
+
+VARIABLE = re.compile(r"\{\{\s*([^{}]+?)\s*\}\}")
+EXPECTED_STATUS = re.compile(r"pm\.response\.to\.have\.status\(\s*(\d{3})\s*\)")
+
+# Postman dynamic variables the collection may use
+DYNAMIC_VARIABLES = {
+    "$guid": lambda: str(uuid.uuid4()),
+    "$timestamp": lambda: str(int(time.time())),
+    "$isoTimestamp": lambda: time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+    "$randomInt": lambda: str(random.randint(0, 1000)),
+    "$randomUUID": lambda: str(uuid.uuid4()),
+}
+
+
+class RequestTemplate:
+    """One request of the collection, ready to be sent repeatedly"""
+
+    def __init__(self, name, method, url, headers=None, body=None, expected_status=None, dynamic=False):
+        """
+        Args:
+            name (str): Request name, used as the sample label
+            method (str): HTTP method
+            url (str): URL with collection and environment variables resolved
+            headers (dict): Request headers
+            body (bytes): Raw request body
+            expected_status (int): Status code the collection's tests expect, if any
+            dynamic (bool): Whether the request uses dynamic variables and must be rendered per request
+        """
+        self.name = name
+        self.method = method
+        self.url = url
+        self.headers = headers or {}
+        self.body = body
+        self.expected_status = expected_status
+        self.dynamic = dynamic
+
+    def render(self):
+        """URL, headers and body for one request, with dynamic variables filled in"""
+        if not self.dynamic:
+            return self.url, self.headers, self.body
+        body = _substitute(self.body.decode("utf-8"), {}).encode("utf-8") if self.body else None
+        headers = {key: _substitute(value, {}) for key, value in self.headers.items()}
+        return _substitute(self.url, {}), headers, body
+
+    def check(self, status, payload, elapsed):
+        """
+        Judge a response
+
+        Args:
+            status (int): HTTP status code
+            payload (bytes): Response body
+            elapsed (int): Latency in milliseconds
+
+        Returns:
+            tuple: (success, failure message)
+        """
+        if self.expected_status is not None:
+            success = status == self.expected_status
+        else:
+            success = status < 400
+        return success, "" if success else f"HTTP {status}"
+
+
+def load_environment(path):
+    """Enabled variables of a Postman environment export"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return {entry["key"]: entry.get("value", "") for entry in data.get("values", []) if entry.get("enabled", True)}
+
+
+def load_collection(path, environment=None, names=None):
+    """
+    Flatten a Postman v2.1 collection into request templates
+
+    Args:
+        path (str): Collection JSON file
+        environment (dict): Variables from load_environment; they override collection variables
+        names (list): Only keep requests whose name starts with one of these (default: all)
+
+    Returns:
+        list: RequestTemplate per request, in collection order
+    """
+    with open(path, 'r') as f:
+        collection = json.load(f)
+
+    variables = {entry["key"]: entry.get("value", "") for entry in collection.get("variable", [])}
+    variables.update(environment or {})
+
+    templates = []
+    for item in _walk(collection.get("item", [])):
+        if names and not any(item["name"].startswith(name) for name in names):
+            continue
+        templates.append(_template(item, variables))
+    if not templates:
+        raise ValueError(f"No requests selected from {path}")
+    return templates
+
+
+def _walk(items):
+    """Requests of the collection, descending into folders"""
+    for item in items:
+        if "item" in item:
+            yield from _walk(item["item"])
+        elif "request" in item:
+            yield item
+
+
+def _template(item, variables):
+    request = item["request"]
+    url = request["url"]["raw"] if isinstance(request["url"], dict) else request["url"]
+    headers = {
+        header["key"]: header["value"] for header in request.get("header", []) if not header.get("disabled")
+    }
+    body = None
+    if request.get("body", {}).get("mode") == "raw":
+        body = request["body"].get("raw", "")
+
+    expected_status = None
+    for event in item.get("event", []):
+        if event.get("listen") == "test":
+            match = EXPECTED_STATUS.search("\n".join(event["script"].get("exec", [])))
+            if match:
+                expected_status = int(match.group(1))
+
+    url = _substitute(url, variables, keep_dynamic=True)
+    headers = {key: _substitute(value, variables, keep_dynamic=True) for key, value in headers.items()}
+    body = _substitute(body, variables, keep_dynamic=True) if body is not None else None
+    dynamic = any(VARIABLE.search(text or "") for text in [url, body, *headers.values()])
+
+    return RequestTemplate(
+        name=item["name"],
+        method=request.get("method", "GET").upper(),
+        url=url,
+        headers=headers,
+        body=body.encode("utf-8") if body is not None else None,
+        expected_status=expected_status,
+        dynamic=dynamic,
+    )
+
+
+def _substitute(text, variables, keep_dynamic=False):
+    """Replace {{name}} with its value; unknown names are left as they are"""
+    def replace(match):
+        name = match.group(1)
+        if name in variables:
+            return str(variables[name])
+        if name in DYNAMIC_VARIABLES and not keep_dynamic:
+            return DYNAMIC_VARIABLES[name]()
+        return match.group(0)
+
+    return VARIABLE.sub(replace, text)
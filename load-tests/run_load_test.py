@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Replay the Postman API collection, or run a JMeter plan, as a load test
+
+Examples:
+    # 200 virtual users for one minute (closed model, like a JMeter thread group)
+    python run_load_test.py --users 200 --duration 60
+
+    # 2000 requests per second for one minute (open model)
+    python run_load_test.py --model open --rate 2000 --duration 60
+
+    # Open model ramping from 100 to 3000 requests per second over two minutes
+    python run_load_test.py --model open --schedule ramp:100:3000:120
+
+    # Spread 4000 requests per second over 4 processes, with a live status line
+    python run_load_test.py --model open --rate 4000 --duration 60 --workers 4
+
+    # Only the "Get Users" and "Create User" requests, against a local server
+    python run_load_test.py --request "Get Users" --request "Create User" --base-url http://localhost:8080/api
+
+    # A JMeter plan with its own thread groups, timers and assertions, without the JVM
+    python run_load_test.py --jmx ../jmeter-tests/performance_test.jmx -J BASE_URL=http://localhost:8080
+"""
+import os
+import sys
+import time
+import argparse
+
+LOAD_TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORTS_DIR = os.path.join(os.path.dirname(LOAD_TESTS_DIR), "reports")
+# The result model and exporter live with the report scripts; spawned workers inherit this path
+if REPORTS_DIR not in sys.path:
+    sys.path.insert(0, REPORTS_DIR)
+
+from load_engine import LoadEngine, LoadResults, LoadMetrics  # noqa: E402
+from multiprocess_runner import MultiProcessRunner  # noqa: E402
+from schedules import Schedule  # noqa: E402
+from postman_loader import load_collection, load_environment  # noqa: E402
+from jmx_importer import load_jmx  # noqa: E402
+from jtl_analyzer import print_table  # noqa: E402
+from latency_histogram import save_histograms  # noqa: E402
+from metrics_exporter import MetricsRegistry, MetricsServer  # noqa: E402
+
+POSTMAN_DIR = os.path.join(os.path.dirname(LOAD_TESTS_DIR), "postman-tests")
+RESULTS_DIR = os.path.join(REPORTS_DIR, "load-results")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Replay the Postman collection, or run a JMeter plan, as a load test')
+    parser.add_argument('--collection', default=os.path.join(POSTMAN_DIR, "api_test_collection.json"),
+                        help='Postman collection to replay')
+    parser.add_argument('--environment', default=os.path.join(POSTMAN_DIR, "api_environment.json"),
+                        help='Postman environment with the variables')
+    parser.add_argument('--jmx', help='Run this JMeter plan (its thread groups replace --model and --users)')
+    parser.add_argument('-J', '--variable', action='append', dest='variables', default=[], metavar='NAME=VALUE',
+                        help='Override a user defined variable or ${__P()} property of the JMeter plan (repeatable)')
+    parser.add_argument('--request', action='append', dest='requests',
+                        help='Only replay requests (or JMeter samplers) whose name starts with this (repeatable)')
+    parser.add_argument('--base-url', help="Replace the environment's baseUrl in every request URL")
+    parser.add_argument('--model', choices=['closed', 'open'], default='closed',
+                        help='closed: virtual users loop; open: fixed arrival rate (default: closed)')
+    parser.add_argument('--users', type=int, default=100, help='Virtual users (closed model)')
+    parser.add_argument('--ramp-up', type=float, default=0, help='Seconds to start all users (closed model)')
+    parser.add_argument('--think-time', type=float, default=0, help='Pause after each response in seconds (closed model)')
+    parser.add_argument('--rate', type=float, default=100, help='Constant requests per second (open model)')
+    parser.add_argument('--schedule', help='Arrival schedule instead of --rate/--duration (open model), e.g. '
+                                           'constant:500:60, ramp:10:1000:120, step:100:100:5:30, spike:200:2000:120:60:10')
+    parser.add_argument('--max-in-flight', type=int, help='Cap on concurrent requests (open model)')
+    parser.add_argument('--duration', type=float,
+                        help='Length of the run in seconds (default: 60, or as long as the JMeter plan runs)')
+    parser.add_argument('--workers', default='1',
+                        help='Processes to spread the load over, or "auto" for one per CPU (default: 1)')
+    parser.add_argument('--max-connections', type=int, default=1000, help='Connection pool size (per worker)')
+    parser.add_argument('--timeout', type=float, default=30, help='Request timeout in seconds')
+    parser.add_argument('--no-keep-alive', action='store_true', help='Open a new connection for every request')
+    parser.add_argument('--jtl', help='Also write every sample to this CSV .jtl file (<file>.<n> per worker)')
+    parser.add_argument('--samples', help='Also write every sample to this compact binary stream (<file>.<n> per worker)')
+    parser.add_argument('--failures', default=os.path.join(RESULTS_DIR, "failures.json"),
+                        help='Where to save the last failed samples with their response bodies')
+    parser.add_argument('--keep-failures', type=int, default=50, help='Failed responses to keep (default: 50)')
+    parser.add_argument('--metrics-port', type=int, default=int(os.getenv("METRICS_PORT", "0")),
+                        help='Serve live Prometheus metrics on this local port during the run (default: off)')
+    parser.add_argument('--histograms', default=os.path.join(RESULTS_DIR, "results.hgrm.json"),
+                        help='Where to save the per-label latency histograms (open model runs also save '
+                             '<name>-corrected.hgrm.json with latency from the intended start)')
+    return parser.parse_args()
+
+
+def main():
+    """Run the load test and print a per-label summary"""
+    args = parse_args()
+
+    if args.jmx:
+        overrides = dict(variable.split("=", 1) for variable in args.variables)
+        scenario = load_jmx(args.jmx, overrides, args.requests)
+        templates = scenario.samplers()
+    else:
+        environment = load_environment(args.environment) if args.environment else {}
+        templates = load_collection(args.collection, environment, args.requests)
+        if args.base_url and environment.get("baseUrl"):
+            for template in templates:
+                if template.url.startswith(environment["baseUrl"]):
+                    template.url = args.base_url.rstrip("/") + template.url[len(environment["baseUrl"]):]
+
+    engine_options = {
+        "max_connections": args.max_connections, "timeout": args.timeout, "keep_alive": not args.no_keep_alive
+    }
+    metrics = server = None
+    if args.metrics_port:
+        registry = MetricsRegistry()
+        metrics = LoadMetrics(registry)
+        server = MetricsServer(registry, args.metrics_port).start()
+        print(f"📈 Live metrics at {server.url}")
+
+    workers = os.cpu_count() if args.workers == "auto" else int(args.workers)
+    if workers > 1:
+        engine = MultiProcessRunner(templates, workers, jtl_path=args.jtl, samples_path=args.samples,
+                                    keep_failures=args.keep_failures, metrics=metrics, **engine_options)
+    else:
+        results = LoadResults(args.jtl, args.samples, args.keep_failures, metrics)
+        engine = LoadEngine(templates, results=results, **engine_options)
+
+    model = "scenario" if args.jmx else args.model
+    duration = args.duration if args.duration is not None else 60
+    if model == "scenario":
+        workload = {"scenario": scenario, "duration": args.duration}
+        print(f"Running plan '{scenario.name}' ({len(templates)} samplers) on {workers} worker(s):")
+        for group in scenario.thread_groups:
+            print(f"  {group.name}: {group.describe()}")
+        for element in scenario.skipped:
+            print(f"  ⚠️ Not run: {element}")
+    elif model == "closed":
+        workload = {"users": args.users, "duration": duration, "think_time": args.think_time,
+                    "ramp_up": args.ramp_up}
+        print(f"Replaying {len(templates)} requests with {args.users} users for {duration:g}s "
+              f"on {workers} worker(s)...")
+    else:
+        schedule = Schedule.parse(args.schedule) if args.schedule else Schedule.constant(args.rate, duration)
+        workload = {"schedule": schedule, "max_in_flight": args.max_in_flight}
+        print(f"Replaying {len(templates)} requests, {schedule.description} ({schedule.total_requests} requests) "
+              f"on {workers} worker(s)...")
+    started = time.monotonic()
+    try:
+        results = engine.run(model, **workload)
+    finally:
+        if server:
+            server.stop()
+    elapsed = time.monotonic() - started
+
+    analyzer = results.analyzer
+    total = analyzer.total()
+    if results.corrected.labels:
+        print("\nService time (uncorrected, from when each request was sent):")
+    print_table(analyzer.summaries())
+    if results.corrected.labels:
+        print("\nResponse time (corrected, from each request's intended start):")
+        print_table(results.corrected.summaries())
+    print(f"\n{total.count} requests in {elapsed:.1f}s ({total.count / elapsed:.0f} req/s)")
+    for error, count in sorted(results.errors.items(), key=lambda item: -item[1]):
+        print(f"  ❌ {count:>7} x {error}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.histograms)), exist_ok=True)
+    save_histograms(args.histograms, analyzer)
+    print(f"Histograms saved to {args.histograms}")
+    if results.corrected.labels:
+        corrected_path = args.histograms.replace(".hgrm.json", "") + "-corrected.hgrm.json"
+        save_histograms(corrected_path, results.corrected)
+        print(f"Corrected histograms saved to {corrected_path}")
+    if results.failures.entries:
+        results.failures.save(args.failures)
+        print(f"Last {len(results.failures.entries)} failed responses saved to {args.failures}")
+    sys.exit(1 if total.errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Arrival-rate schedules for open-model load tests
+
+A schedule is a list of segments whose rate changes linearly from a start rate to
+an end rate. It yields the intended start time of every request, so the engine can
+fire requests on time whatever the server does, and measure latency from when a
+request should have started (coordinated-omission correction).
+
+Spec strings accepted by Schedule.parse (rates in requests/second, times in seconds):
+    constant:RATE:DURATION                      constant:500:60
+    ramp:FROM:TO:DURATION                       ramp:10:1000:120
+    step:START:INCREMENT:STEPS:STEP_DURATION    step:100:100:5:30
+    spike:BASE:PEAK:DURATION:AT:LENGTH          spike:200:2000:120:60:10
+"""
+import math
+
+
+class Schedule:
+    """Piecewise-linear arrival rate over time"""
+
+    def __init__(self, segments, description=""):
+        """
+        Args:
+            segments (list): (duration, start rate, end rate) tuples, run in order
+            description (str): Human-readable summary
+        """
+        for duration, start_rate, end_rate in segments:
+            if duration <= 0 or start_rate < 0 or end_rate < 0:
+                raise ValueError("Schedule segments need a positive duration and non-negative rates")
+        self.segments = segments
+        self.description = description
+
+    @property
+    def duration(self):
+        return sum(duration for duration, _, _ in self.segments)
+
+    @property
+    def total_requests(self):
+        """Number of requests the schedule starts"""
+        return int(sum(duration * (start + end) / 2 for duration, start, end in self.segments) + 1e-9)
+
+    def scaled(self, factor):
+        """Same shape with every rate multiplied by factor, e.g. one worker's share of the load"""
+        segments = [(duration, start * factor, end * factor) for duration, start, end in self.segments]
+        return Schedule(segments, f"{self.description} x {factor:g}")
+
+    @classmethod
+    def constant(cls, rate, duration):
+        return cls([(duration, rate, rate)], f"constant {rate:g} req/s for {duration:g}s")
+
+    @classmethod
+    def ramp(cls, start_rate, end_rate, duration):
+        return cls([(duration, start_rate, end_rate)], f"ramp {start_rate:g} -> {end_rate:g} req/s over {duration:g}s")
+
+    @classmethod
+    def step(cls, start_rate, increment, steps, step_duration):
+        segments = [(step_duration, start_rate + i * increment, start_rate + i * increment) for i in range(int(steps))]
+        return cls(segments, f"{int(steps)} steps of {step_duration:g}s from {start_rate:g} req/s, +{increment:g} each")
+
+    @classmethod
+    def spike(cls, base_rate, peak_rate, duration, at, length):
+        if at + length > duration:
+            raise ValueError("The spike must end before the schedule does")
+        segments = [(at, base_rate, base_rate), (length, peak_rate, peak_rate)]
+        if duration > at + length:
+            segments.append((duration - at - length, base_rate, base_rate))
+        segments = [segment for segment in segments if segment[0] > 0]
+        return cls(segments, f"{base_rate:g} req/s with a {peak_rate:g} req/s spike at {at:g}s for {length:g}s")
+
+    @classmethod
+    def parse(cls, spec):
+        """Build a schedule from a spec string such as "ramp:10:1000:120" (see module docstring)"""
+        kind, *values = spec.split(":")
+        builders = {"constant": (cls.constant, 2), "ramp": (cls.ramp, 3), "step": (cls.step, 4), "spike": (cls.spike, 5)}
+        if kind not in builders:
+            raise ValueError(f"Schedule '{kind}' not supported. Use one of: {', '.join(builders)}.")
+        builder, arity = builders[kind]
+        if len(values) != arity:
+            raise ValueError(f"Schedule '{kind}' takes {arity} values, got '{spec}'")
+        return builder(*(float(value) for value in values))
+
+    def intended_starts(self):
+        """
+        Offsets in seconds from the start of the run at which each request should start
+
+        Within a segment the n-th arrival is where the integral of the rate reaches n,
+        so ramps are followed exactly rather than approximated step by step.
+        """
+        offset = 0.0
+        carry = 0.0  # Fraction of a request left over from the previous segment
+        for duration, start_rate, end_rate in self.segments:
+            slope = (end_rate - start_rate) / duration
+            expected = duration * (start_rate + end_rate) / 2
+            n = 1.0 - carry
+            while n <= expected:
+                yield offset + self._time_of(n, start_rate, slope)
+                n += 1.0
+            carry = expected - (n - 1.0)
+            offset += duration
+
+    @staticmethod
+    def _time_of(n, start_rate, slope):
+        """Solve start_rate * t + slope * t^2 / 2 = n for t"""
+        if abs(slope) < 1e-12:
+            return n / start_rate
+        return (-start_rate + math.sqrt(max(0.0, start_rate * start_rate + 2 * slope * n))) / slope
@@ -0,0 +1,200 @@
+"""
+Tests for the JMeter plan importer
+
+Run from the repository root:
+    python -m pytest load-tests/test_jmx_importer.py
+"""
+import os
+import json
+
+import pytest
+
+from jmx_importer import (CONTAINS, EQUALS, NOT, OR, SUBSTRING, JsonPathAssertion, ResponseAssertion, Sampler,
+                          load_jmx)
+
+JMETER_TESTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "jmeter-tests")
+
+
+def props(**values):
+    return "".join(f'<stringProp name="{name.replace("_", ".", 1)}">{value}</stringProp>'
+                   for name, value in values.items())
+
+
+def arguments(name, pairs):
+    items = "".join(
+        f'<elementProp name="{key}" elementType="Argument">{props(Argument_name=key, Argument_value=value)}</elementProp>'
+        for key, value in pairs
+    )
+    return f'<elementProp name="{name}" elementType="Arguments"><collectionProp name="Arguments.arguments">{items}' \
+           f'</collectionProp></elementProp>'
+
+
+def headers(name, pairs):
+    items = "".join(f'<elementProp name="" elementType="Header">{props(Header_name=key, Header_value=value)}'
+                    f'</elementProp>' for key, value in pairs)
+    return (f'<HeaderManager testclass="HeaderManager" testname="{name}">'
+            f'<collectionProp name="HeaderManager.headers">{items}</collectionProp></HeaderManager>')
+
+
+def sampler(name, path, method="GET", args=(), raw=False, enabled="true"):
+    return (f'<HTTPSamplerProxy testclass="HTTPSamplerProxy" testname="{name}" enabled="{enabled}">'
+            + arguments("HTTPsampler.Arguments", args)
+            + props(HTTPSampler_path=path, HTTPSampler_method=method)
+            + ('<boolProp name="HTTPSampler.postBodyRaw">true</boolProp>' if raw else "")
+            + '</HTTPSamplerProxy>')
+
+
+def tree(*pairs):
+    """A hashTree level from (element, children) pairs"""
+    return "<hashTree>" + "".join(element + (children or "<hashTree/>") for element, children in pairs) + "</hashTree>"
+
+
+def thread_group(name, users=4, ramp_up=2, loops=3):
+    return (f'<ThreadGroup testclass="ThreadGroup" testname="{name}">'
+            f'<elementProp name="ThreadGroup.main_controller" elementType="LoopController">'
+            f'{props(LoopController_loops=loops)}</elementProp>'
+            + props(ThreadGroup_num_threads=users, ThreadGroup_ramp_time=ramp_up) + '</ThreadGroup>')
+
+
+PLAN = ('<?xml version="1.0" encoding="UTF-8"?><jmeterTestPlan version="1.2">' + tree((
+    '<TestPlan testclass="TestPlan" testname="Shop API">'
+    + arguments("TestPlan.user_defined_variables", [("HOST", "${__P(host,example.com)}"), ("BASE", "/api"),
+                                                     ("USERS_PATH", "${BASE}/users")])
+    + '</TestPlan>',
+    tree(
+        ('<ConfigTestElement testclass="ConfigTestElement" testname="Defaults">'
+         + props(HTTPSampler_domain="${HOST}", HTTPSampler_protocol="https") + '</ConfigTestElement>', None),
+        (headers("Plan headers", [("Accept", "application/json"), ("X-Level", "plan")]), None),
+        ('<ResultCollector testclass="ResultCollector" testname="View Results Tree"/>', None),
+        (thread_group("Browsers"), tree(
+            (headers("Group headers", [("X-Level", "group")]), None),
+            ('<ConstantTimer testclass="ConstantTimer" testname="Think">'
+             + props(ConstantTimer_delay=300) + '</ConstantTimer>', None),
+            (sampler("List users", "${USERS_PATH}"), tree(
+                (headers("Sampler headers", [("X-Sampler", "a")]), None),
+                ('<ResponseAssertion testclass="ResponseAssertion" testname="Has users">'
+                 '<collectionProp name="Asserion.test_strings"><stringProp name="1">users</stringProp></collectionProp>'
+                 + props(Assertion_test_field="Assertion.response_data")
+                 + f'<intProp name="Assertion.test_type">{SUBSTRING}</intProp></ResponseAssertion>', None),
+            )),
+            (sampler("Search users", "${BASE}/search", args=[("q", "a b"), ("page", "2")]), None),
+            ('<JSR223PreProcessor testclass="JSR223PreProcessor" testname="Script"/>', None),
+            ('<LoopController testclass="LoopController" testname="Twice">'
+             + props(LoopController_loops=2) + '</LoopController>', tree(
+                (sampler("Create user", "/api/users", "POST", args=[("", '{"name": "${HOST}"}')], raw=True), None),
+            )),
+            (sampler("Disabled", "/api/off", enabled="false"), None),
+        )),
+        (thread_group("Idle"), tree()),
+    ),
+)) + '</jmeterTestPlan>')
+
+
+@pytest.fixture
+def plan_path(tmp_path):
+    path = tmp_path / "plan.jmx"
+    path.write_text(PLAN, encoding="utf-8")
+    return str(path)
+
+
+def samplers_by_name(scenario):
+    return {sampler.name: sampler for sampler in scenario.samplers()}
+
+
+def test_plan_structure(plan_path):
+    scenario = load_jmx(plan_path)
+
+    assert scenario.name == "Shop API"
+    assert [group.name for group in scenario.thread_groups] == ["Browsers"]
+    group = scenario.thread_groups[0]
+    assert (group.users, group.ramp_up, group.loops) == (4, 2, 3)
+    assert [sampler.name for sampler in group.iteration()] == [
+        "List users", "Search users", "Create user", "Create user"]
+    assert [start for start, _ in group.user_schedule()] == [0, 0.5, 1, 1.5]
+    assert any("JSR223PreProcessor 'Script'" in entry for entry in scenario.skipped)
+    assert any("'Idle' (no samplers)" in entry for entry in scenario.skipped)
+    assert not any("View Results Tree" in entry for entry in scenario.skipped)
+
+
+def test_variables_defaults_and_overrides(plan_path):
+    samplers = samplers_by_name(load_jmx(plan_path))
+    assert samplers["List users"].url == "https://example.com/api/users"
+    assert samplers["Search users"].url == "https://example.com/api/search?q=a+b&page=2"
+    assert samplers["Create user"].body == b'{"name": "example.com"}'
+    assert "Content-Type" not in samplers["Create user"].headers
+
+    overridden = samplers_by_name(load_jmx(plan_path, overrides={"host": "staging.local"}))
+    assert overridden["List users"].url == "https://staging.local/api/users"
+
+
+def test_headers_timers_and_assertions_are_scoped(plan_path):
+    samplers = samplers_by_name(load_jmx(plan_path))
+    listing, search = samplers["List users"], samplers["Search users"]
+
+    # Inner header managers win over outer ones; a sampler's own only applies to it
+    assert listing.headers == {"Accept": "application/json", "X-Level": "group", "X-Sampler": "a"}
+    assert search.headers == {"Accept": "application/json", "X-Level": "group"}
+    # The group's timer applies to every sampler in the group, including the nested loop
+    assert [sampler.think_time() for sampler in samplers.values()] == [0.3, 0.3, 0.3]
+    # The assertion under "List users" applies to that sampler only
+    assert listing.check(200, b'{"users": []}', 5) == (True, "")
+    assert listing.check(200, b"{}", 5)[0] is False
+    assert search.check(200, b"{}", 5) == (True, "")
+    assert search.check(503, b"{}", 5) == (False, "HTTP 503")
+
+
+def test_sampler_name_filter_and_split(plan_path):
+    scenario = load_jmx(plan_path, names=["Create"])
+    assert [sampler.name for sampler in scenario.samplers()] == ["Create user"]
+
+    shares = [list(scenario.split(index, 3).users()) for index in range(3)]
+    assert sorted(start for share in shares for _, start, _ in share) == [0, 0.5, 1, 1.5]
+    assert [len(share) for share in shares] == [2, 1, 1]
+
+
+def test_plan_without_thread_groups_is_rejected(tmp_path):
+    path = tmp_path / "empty.jmx"
+    path.write_text('<jmeterTestPlan>' + tree(('<TestPlan testclass="TestPlan" testname="Empty"/>', tree()))
+                    + '</jmeterTestPlan>', encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_jmx(str(path))
+
+
+@pytest.mark.parametrize("test_type, patterns, body, passes", [
+    (SUBSTRING, ["ok"], "all ok", True),
+    (EQUALS, ["ok"], "all ok", False),
+    (CONTAINS, [r"id\":\s*\d+"], '{"id": 42}', True),
+    (CONTAINS | NOT, ["error"], "fine", True),
+    (SUBSTRING | OR, ["missing", "ok"], "ok", True),
+    (SUBSTRING, ["missing", "ok"], "ok", False),
+])
+def test_response_assertion_test_types(test_type, patterns, body, passes):
+    assertion = ResponseAssertion("check", "body", test_type, patterns)
+    assert (assertion.check(200, body.encode(), 1) is None) == passes
+
+
+@pytest.mark.parametrize("path, expected, kwargs, passes", [
+    ("$.user.name", "", {}, True),
+    ("$.user.missing", "", {}, False),
+    ("$.items[1].id", "2", {"validate": True}, True),
+    ("$.items[*].id", "3", {"validate": True}, True),
+    ("$..id", "9", {"validate": True}, False),
+    ("$.user.deleted", "", {"validate": True, "expect_null": True}, True),
+    ("$.user.missing", "", {"invert": True}, True),
+])
+def test_json_path_assertion(path, expected, kwargs, passes):
+    document = json.dumps({"user": {"name": "Ann", "deleted": None}, "items": [{"id": 1}, {"id": 2}, {"id": 3}]})
+    assertion = JsonPathAssertion("json", path, expected, **kwargs)
+    assert (assertion.check(200, document.encode(), 1) is None) == passes
+
+
+def test_sampler_ignores_status_when_an_assertion_says_so():
+    assertion = ResponseAssertion("not found is fine", "code", EQUALS, ["404"], ignore_status=True)
+    assert Sampler("Lookup", "GET", "http://x/", assertions=[assertion]).check(404, b"", 1) == (True, "")
+
+
+@pytest.mark.parametrize("name", ["api_load_test.jmx", "performance_test.jmx", "stress_test.jmx"])
+def test_repository_plans_import(name):
+    scenario = load_jmx(os.path.join(JMETER_TESTS_DIR, name))
+    assert scenario.thread_groups
+    assert all(sampler.url.startswith(("http://", "https://")) for sampler in scenario.samplers())
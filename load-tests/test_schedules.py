@@ -0,0 +1,126 @@
+"""
+Tests for arrival-rate schedules and coordinated-omission correction
+
+Run from the repository root:
+    python -m pytest load-tests/test_schedules.py
+"""
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from load_engine import LoadEngine
+from postman_loader import RequestTemplate
+from schedules import Schedule
+
+
+def test_constant_rate_is_evenly_spaced():
+    starts = list(Schedule.constant(10, 2).intended_starts())
+    assert len(starts) == Schedule.constant(10, 2).total_requests == 20
+    assert starts == pytest.approx([0.1 * (n + 1) for n in range(20)])
+
+
+def test_ramp_follows_the_integral_of_the_rate():
+    schedule = Schedule.ramp(0, 100, 10)
+    starts = list(schedule.intended_starts())
+    assert len(starts) == schedule.total_requests == 500
+    assert starts == sorted(starts)
+    # rate(t) = 10 t, so n requests have started at t = sqrt(n / 5)
+    assert starts[99] == pytest.approx((100 / 5) ** 0.5)
+    assert starts[-1] == pytest.approx(10)
+    # A quarter of the arrivals fall in the first half of the ramp
+    assert sum(1 for start in starts if start <= 5) == 125
+
+
+def test_fractions_carry_over_between_segments():
+    schedule = Schedule([(1.5, 1, 1), (1.5, 1, 1)])
+    starts = list(schedule.intended_starts())
+    assert len(starts) == schedule.total_requests == 3
+    assert starts == pytest.approx([1, 2, 3])
+
+
+def test_step_and_spike_shapes():
+    step = Schedule.step(10, 10, 3, 2)
+    assert [rate for _, rate, _ in step.segments] == [10, 20, 30]
+    assert step.duration == 6 and step.total_requests == 120
+
+    spike = Schedule.spike(10, 100, 10, 4, 1)
+    assert spike.segments == [(4, 10, 10), (1, 100, 100), (5, 10, 10)]
+    assert spike.total_requests == 190
+    assert sum(1 for start in spike.intended_starts() if 4 < start <= 5) == 100
+    with pytest.raises(ValueError):
+        Schedule.spike(10, 100, 10, 9, 2)
+
+
+def test_scaled_keeps_the_shape():
+    half = Schedule.ramp(10, 50, 20).scaled(0.5)
+    assert half.segments == [(20, 5, 25)]
+    assert half.total_requests == 300
+
+
+@pytest.mark.parametrize("spec, segments", [
+    ("constant:500:60", [(60, 500, 500)]),
+    ("ramp:10:1000:120", [(120, 10, 1000)]),
+    ("step:100:100:2:30", [(30, 100, 100), (30, 200, 200)]),
+])
+def test_parse(spec, segments):
+    assert Schedule.parse(spec).segments == segments
+
+
+@pytest.mark.parametrize("spec", ["burst:1:2", "constant:500", "ramp:a:b:c", "constant:10:0"])
+def test_parse_rejects_bad_specs(spec):
+    with pytest.raises(ValueError):
+        Schedule.parse(spec)
+
+
+class StallingHandler(BaseHTTPRequestHandler):
+    """Answers at once, except for one request that stalls the server for STALL seconds"""
+
+    STALL = 0.5
+    STALLED_REQUEST = 10
+    requests = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            type(self).requests += 1
+            number = self.requests
+        if number == self.STALLED_REQUEST:
+            time.sleep(self.STALL)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stalling_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StallingHandler)
+    StallingHandler.requests = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def test_corrected_latency_includes_a_stall(stalling_server):
+    # 100 req/s over one connection: while request 10 stalls for 500 ms, about 50
+    # later requests wait for it. Measured from when they were sent they look fast;
+    # measured from when they should have started they do not.
+    engine = LoadEngine([RequestTemplate("GET ok", "GET", stalling_server)], max_connections=1)
+    results = engine.run("open", schedule=Schedule.constant(100, 1), max_in_flight=1)
+
+    uncorrected = results.analyzer.labels["GET ok"]
+    corrected = results.corrected.labels["GET ok"]
+    assert uncorrected.count == corrected.count == 100
+    slow = StallingHandler.STALL * 1000 * 0.4
+
+    assert uncorrected.count - uncorrected.histogram.count_at_or_below(slow) == 1
+    assert uncorrected.max >= StallingHandler.STALL * 1000 * 0.9
+    assert corrected.count - corrected.histogram.count_at_or_below(slow) >= 20
+    assert corrected.histogram.percentile(75) > uncorrected.histogram.percentile(75) + slow / 2
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Incremental index of Allure results
+
+allure-results holds one <uuid>-result.json per executed test, thousands of
+them after a few runs with KEEP_HISTORY. Instead of reading all of them on every
+check, the index keeps one row per result file (modification time, size, status,
+duration, labels, failure message) in a SQLite file and only parses files that
+are new or changed since the last refresh. Summaries, failure lists and flaky
+test detection are then queries on the index.
+
+A test is identified by its Allure historyId, so a rerun replaces the earlier
+result of the same test in summaries while both stay available for flaky
+detection.
+
+Usage:
+    python allure_index.py summary
+    python allure_index.py failures
+    python allure_index.py flaky --window 10
+"""
+import os
+import sys
+import json
+import sqlite3
+import argparse
+
+REPORT_DIR = os.path.dirname(os.path.abspath(__file__))
+ALLURE_RESULTS_DIR = os.path.join(REPORT_DIR, "allure-results")
+# Kept outside allure-results so the Allure service never sees it
+DEFAULT_INDEX = os.getenv("ALLURE_INDEX_DB", os.path.join(REPORT_DIR, "allure-index.sqlite"))
+
+STATUSES = ("passed", "failed", "broken", "skipped", "unknown")
+FAILED_STATUSES = ("failed", "broken")
+MAX_MESSAGE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    file TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    test_id TEXT NOT NULL,
+    full_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    start INTEGER,
+    stop INTEGER,
+    duration INTEGER,
+    flaky INTEGER NOT NULL,
+    message TEXT,
+    labels TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_test ON results (test_id, start);
+"""
+
+# The most recent result of every test
+LATEST = """
+SELECT * FROM (
+    SELECT results.*, ROW_NUMBER() OVER (PARTITION BY test_id ORDER BY start DESC, file DESC) AS position
+    FROM results
+) WHERE position = 1
+"""
+
+
+class AllureIndex:
+    """Per-file summary of an allure-results directory in a SQLite file"""
+
+    def __init__(self, results_dir=ALLURE_RESULTS_DIR, path=DEFAULT_INDEX):
+        """
+        Args:
+            results_dir (str): Directory the Allure adapters write to
+            path (str): SQLite index file, created on first use
+        """
+        self.results_dir = results_dir
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def refresh(self):
+        """
+        Bring the index up to date with the results directory
+
+        Files that cannot be parsed (usually still being written) are left out
+        and retried on the next refresh.
+
+        Returns:
+            dict: Number of files added, updated, removed and unreadable
+        """
+        known = {file: (mtime_ns, size) for file, mtime_ns, size in
+                 self.db.execute("SELECT file, mtime_ns, size FROM results")}
+        counts = {"added": 0, "updated": 0, "removed": 0, "unreadable": 0}
+        rows = []
+        seen = set()
+        if os.path.isdir(self.results_dir):
+            with os.scandir(self.results_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith("-result.json"):
+                        continue
+                    seen.add(entry.name)
+                    stat = entry.stat()
+                    previous = known.get(entry.name)
+                    if previous == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    row = self._parse(entry.path, entry.name, stat)
+                    if row is None:
+                        counts["unreadable"] += 1
+                        continue
+                    rows.append(row)
+                    counts["updated" if previous else "added"] += 1
+        removed = [(file,) for file in known.keys() - seen]
+        counts["removed"] = len(removed)
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.db.executemany("DELETE FROM results WHERE file = ?", removed)
+        return counts
+
+    @staticmethod
+    def _parse(path, name, stat):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(result, dict):
+            return None
+        full_name = result.get("fullName") or result.get("name") or name
+        start, stop = result.get("start"), result.get("stop")
+        details = result.get("statusDetails") or {}
+        message = (details.get("message") or "").strip()
+        labels = {}
+        for label in result.get("labels") or []:
+            labels.setdefault(label.get("name"), []).append(label.get("value"))
+        return (
+            name, stat.st_mtime_ns, stat.st_size, result.get("historyId") or full_name, full_name,
+            result.get("status") or "unknown", start, stop,
+            stop - start if start is not None and stop is not None else None,
+            int(bool(details.get("flaky"))), message[:MAX_MESSAGE] or None, json.dumps(labels, sort_keys=True)
+        )
+
+    def summary(self):
+        """
+        Outcome of the latest result of every test
+
+        Returns:
+            dict: tests, one count per status, duration (sum of test durations in ms)
+                and span (first start to last stop in ms)
+        """
+        summary = dict.fromkeys(STATUSES, 0)
+        summary["tests"] = 0
+        summary["duration"] = 0
+        for status, count, duration in self.db.execute(
+            f"SELECT status, COUNT(*), COALESCE(SUM(duration), 0) FROM ({LATEST}) GROUP BY status"
+        ):
+            summary[status] = summary.get(status, 0) + count
+            summary["tests"] += count
+            summary["duration"] += duration
+        first, last = self.db.execute("SELECT MIN(start), MAX(stop) FROM results").fetchone()
+        summary["span"] = last - first if first is not None and last is not None else 0
+        return summary
+
+    def failures(self):
+        """
+        Tests whose latest result failed or broke
+
+        Returns:
+            list: (full name, status, message, result file) tuples
+        """
+        return self.db.execute(
+            f"SELECT full_name, status, message, file FROM ({LATEST}) "
+            f"WHERE status IN ({', '.join('?' * len(FAILED_STATUSES))}) ORDER BY full_name",
+            FAILED_STATUSES
+        ).fetchall()
+
+    def flaky(self, window=10):
+        """
+        Tests that both passed and failed among their last results, or that Allure marked flaky
+
+        Args:
+            window (int): Recent results of each test to look at
+
+        Returns:
+            list: (full name, passed, failed, latest status) tuples, most failures first
+        """
+        rows = self.db.execute(
+            """
+            SELECT full_name,
+                   SUM(status = 'passed'),
+                   SUM(status IN ('failed', 'broken')),
+                   MAX(CASE WHEN position = 1 THEN status END),
+                   MAX(flaky)
+            FROM (
+                SELECT results.*, ROW_NUMBER() OVER (PARTITION BY test_id ORDER BY start DESC, file DESC) AS position
+                FROM results
+            )
+            WHERE position <= ?
+            GROUP BY test_id
+            """,
+            (window,)
+        ).fetchall()
+        flaky = [(name, passed, failed, latest) for name, passed, failed, latest, marked in rows
+                 if (passed and failed) or marked]
+        flaky.sort(key=lambda row: (-row[2], row[0]))
+        return flaky
+
+    def labels(self, file):
+        """Labels of one indexed result as {name: [values]}"""
+        row = self.db.execute("SELECT labels FROM results WHERE file = ?", (file,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    """Print a summary, the failures or the flaky tests of an allure-results directory"""
+    parser = argparse.ArgumentParser(description='Query an incremental index of Allure results')
+    parser.add_argument('--results', default=ALLURE_RESULTS_DIR, help='allure-results directory')
+    parser.add_argument('--db', default=DEFAULT_INDEX, help='Index SQLite file (default: $ALLURE_INDEX_DB)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('summary', help='Count tests by status (latest result of each test)')
+    commands.add_parser('failures', help='List tests whose latest result failed or broke')
+    flaky = commands.add_parser('flaky', help='List tests that both passed and failed recently')
+    flaky.add_argument('--window', type=int, default=10, help='Recent results of each test to look at (default: 10)')
+    args = parser.parse_args()
+
+    index = AllureIndex(args.results, args.db)
+    try:
+        counts = index.refresh()
+        print(f"Indexed {counts['added']} new, {counts['updated']} changed, {counts['removed']} removed result files"
+              + (f" ({counts['unreadable']} unreadable, retried next time)" if counts['unreadable'] else ""))
+
+        if args.command == 'summary':
+            summary = index.summary()
+            print(f"{summary['tests']} tests: " + ", ".join(f"{summary[status]} {status}" for status in STATUSES))
+            print(f"Test time {summary['duration'] / 1000:.1f}s, wall time {summary['span'] / 1000:.1f}s")
+            failed = sum(summary[status] for status in FAILED_STATUSES)
+        elif args.command == 'failures':
+            failures = index.failures()
+            for name, status, message, _ in failures:
+                print(f"❌ [{status}] {name}" + (f"\n     {message.splitlines()[0]}" if message else ""))
+            if not failures:
+                print("✅ No failed or broken tests")
+            failed = len(failures)
+        else:
+            flaky = index.flaky(args.window)
+            for name, passed, failed_runs, latest in flaky:
+                print(f"⚠️  {name}: {passed} passed, {failed_runs} failed of the last {args.window}, latest {latest}")
+            if not flaky:
+                print("✅ No flaky tests")
+            failed = 0
+    finally:
+        index.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
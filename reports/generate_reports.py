@@ -8,6 +8,12 @@ import subprocess
 import argparse
 from datetime import datetime
 
+from jtl_analyzer import JtlAnalyzer, print_table
+from latency_histogram import save_histograms
+from perf_baseline import DEFAULT_DB, check_regressions, jtl_fingerprint
+from allure_index import AllureIndex
+from report_builder import ReportBuilder
+
 # Define report directories
 REPORT_DIR = os.path.dirname(os.path.abspath(__file__))
 ALLURE_RESULTS_DIR = os.path.join(REPORT_DIR, "allure-results")
@@ -29,22 +35,14 @@ def create_directories():
         os.makedirs(directory, exist_ok=True)
 
 
-def generate_allure_report():
-    """Generate Allure report from test results"""
-    try:
-        print("Generating Allure report...")
-        subprocess.run(
-            ["allure", "generate", ALLURE_RESULTS_DIR, "-o", ALLURE_REPORT_DIR, "--clean"],
-            check=True
-        )
-        print(f"✅ Allure report generated successfully at {ALLURE_REPORT_DIR}")
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to generate Allure report: {e}")
-        return False
-    except FileNotFoundError:
-        print("❌ Allure command not found. Please install Allure command line tool.")
-        return False
+def generate_allure_report(force=False):
+    """
+    Generate the Allure report and the combined summary from test results
+    
+    Unchanged results, attachments and history are reused from the builder's cache
+    (see report_builder.py), and Allure does not run at all when nothing changed.
+    """
+    return ReportBuilder().build(force)
 
 
 def open_allure_report():
@@ -64,26 +62,49 @@ def open_allure_report():
         return False
 
 
-def check_test_failures():
-    """Check for test failures in the results"""
+def check_test_failures(max_error_rate=0.0, max_p95=None, min_throughput=None, baseline_plan=None,
+                        baseline_db=DEFAULT_DB):
+    """
+    Check for test failures in the results
+    
+    Args:
+        max_error_rate (float): Highest acceptable JMeter error rate in percent, per label
+        max_p95 (float): Highest acceptable JMeter 95th percentile in milliseconds, per label
+        min_throughput (float): Lowest acceptable total JMeter throughput in requests/second
+        baseline_plan (str): Compare JMeter results with this plan's stored baseline (None to skip)
+        baseline_db (str): SQLite file holding the baselines
+    
+    Returns:
+        tuple: (failures, performance regressions)
+    """
     failures = []
+    regressions = []
     
-    # Check Allure results
+    # Check Allure results (failed and broken); only files changed since the last check are read
     if os.path.exists(ALLURE_RESULTS_DIR):
-        for file in os.listdir(ALLURE_RESULTS_DIR):
-            if file.endswith("-result.json"):
-                with open(os.path.join(ALLURE_RESULTS_DIR, file), 'r') as f:
-                    content = f.read()
-                    if '"status":"failed"' in content:
-                        failures.append(f"Allure: {file}")
+        index = AllureIndex(ALLURE_RESULTS_DIR)
+        try:
+            index.refresh()
+            for name, status, _, _ in index.failures():
+                failures.append(f"Allure: {name} ({status})")
+        finally:
+            index.close()
     
     # Check JMeter results
     jmeter_results_file = os.path.join(JMETER_RESULTS_DIR, "results.jtl")
     if os.path.exists(jmeter_results_file):
-        with open(jmeter_results_file, 'r') as f:
-            content = f.read()
-            if 'success="false"' in content:
-                failures.append("JMeter: Performance test failures")
+        # Result files from long load tests can be several GB, so they are streamed
+        analyzer = JtlAnalyzer().analyze(jmeter_results_file)
+        print("\nJMeter results:")
+        print_table(analyzer.summaries())
+        # Keep the per-label histograms so runs and load generators can be merged later
+        save_histograms(os.path.join(JMETER_RESULTS_DIR, "results.hgrm.json"), analyzer)
+        for violation in analyzer.evaluate(max_error_rate, max_p95, min_throughput):
+            failures.append(f"JMeter: {violation}")
+        if baseline_plan:
+            # An old results.jtl left from an earlier pipeline is compared but not stored again
+            regressions = check_regressions(analyzer, baseline_plan, baseline_db,
+                                            source=jtl_fingerprint(jmeter_results_file))
     
     # Check Postman results
     postman_junit_file = os.path.join(POSTMAN_REPORTS_DIR, "junit", "report.xml")
@@ -93,23 +114,36 @@ def check_test_failures():
             if 'failures="' in content and not 'failures="0"' in content:
                 failures.append("Postman: API test failures")
     
-    return failures
+    return failures, regressions
 
 
 def main():
     """Main function to generate reports"""
     parser = argparse.ArgumentParser(description='Generate test reports')
     parser.add_argument('--open', action='store_true', help='Open Allure report after generation')
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help='Run Allure even when the results did not change since the last report')
+    parser.add_argument('--max-error-rate', type=float, default=0.0,
+                        help='Highest acceptable JMeter error rate in percent, per label (default: 0)')
+    parser.add_argument('--max-p95', type=float, help='Highest acceptable JMeter p95 latency in milliseconds, per label')
+    parser.add_argument('--min-throughput', type=float, help='Lowest acceptable JMeter throughput in requests/second')
+    parser.add_argument('--baseline-plan', default='api_load_test',
+                        help='Test plan whose stored baseline JMeter results are compared with (default: api_load_test)')
+    parser.add_argument('--baseline-db', default=DEFAULT_DB, help='Baseline SQLite file (default: $PERF_BASELINE_DB)')
+    parser.add_argument('--no-baseline', action='store_true', help='Skip the performance regression check')
     args = parser.parse_args()
     
     create_directories()
     
     # Generate Allure report
-    if not generate_allure_report():
+    if not generate_allure_report(args.full_rebuild):
         sys.exit(1)
     
     # Check for test failures
-    failures = check_test_failures()
+    failures, regressions = check_test_failures(
+        args.max_error_rate, args.max_p95, args.min_throughput,
+        baseline_plan=None if args.no_baseline else args.baseline_plan, baseline_db=args.baseline_db
+    )
     if failures:
         print("\n❌ Test failures detected:")
         for failure in failures:
@@ -118,9 +152,18 @@ def main():
     else:
         print("\n✅ All tests passed successfully!")
     
+    if regressions:
+        print("\n❌ Performance regressions against the stored baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+    
     # Open Allure report if requested
     if args.open:
         open_allure_report()
+    
+    # Slowdowns fail the build; exit code 1 stays reserved for report generation errors
+    if regressions:
+        sys.exit(2)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Streaming analyzer for JMeter result files (.jtl)
+
+Reads CSV and XML JTLs (and the binary sample streams of headless load runs)
+one sample at a time, so memory use depends on the number of labels, not on
+the size of the file.
+"""
+import sys
+import csv
+import json
+import argparse
+import xml.etree.ElementTree as ET
+
+from latency_histogram import LatencyHistogram
+from sample_stream import is_sample_stream, read_samples
+
+# Column order JMeter writes when jmeter.save.saveservice.print_field_names=false
+DEFAULT_CSV_FIELDS = [
+    "timeStamp", "elapsed", "label", "responseCode", "responseMessage", "threadName", "dataType",
+    "success", "failureMessage", "bytes", "sentBytes", "grpThreads", "allThreads", "URL",
+    "Latency", "IdleTime", "Connect"
+]
+XML_SAMPLE_TAGS = {"httpSample", "sample"}
+TOTAL_LABEL = "TOTAL"
+
+
+class LabelStats:
+    """Running totals for one sampler label"""
+
+    def __init__(self, label, significant_digits=3, highest=3_600_000):
+        self.label = label
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.elapsed_sum = 0
+        self.min = None
+        self.max = None
+        self.first_start = None
+        self.last_end = None
+        self.histogram = LatencyHistogram(highest=highest, significant_digits=significant_digits)
+
+    def add(self, elapsed, success, timestamp=None, size=0):
+        self.count += 1
+        self.errors += 0 if success else 1
+        self.bytes += size
+        self.elapsed_sum += elapsed
+        self.min = elapsed if self.min is None else min(self.min, elapsed)
+        self.max = elapsed if self.max is None else max(self.max, elapsed)
+        self.histogram.record(elapsed)
+        if timestamp is not None:
+            end = timestamp + elapsed
+            self.first_start = timestamp if self.first_start is None else min(self.first_start, timestamp)
+            self.last_end = end if self.last_end is None else max(self.last_end, end)
+
+    def merge(self, other):
+        self.count += other.count
+        self.errors += other.errors
+        self.bytes += other.bytes
+        self.elapsed_sum += other.elapsed_sum
+        for name, pick in (("min", min), ("max", max), ("first_start", min), ("last_end", max)):
+            values = [v for v in (getattr(self, name), getattr(other, name)) if v is not None]
+            setattr(self, name, pick(values) if values else None)
+        self.histogram.merge(other.histogram)
+
+    def to_dict(self):
+        """Serializable form, see latency_histogram.save_histograms"""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "elapsed_sum": self.elapsed_sum,
+            "min": self.min,
+            "max": self.max,
+            "first_start": self.first_start,
+            "last_end": self.last_end,
+            "histogram": self.histogram.encode(),
+        }
+
+    @classmethod
+    def from_dict(cls, label, data):
+        stats = cls(label)
+        for name in ("count", "errors", "bytes", "elapsed_sum", "min", "max", "first_start", "last_end"):
+            setattr(stats, name, data[name])
+        stats.histogram = LatencyHistogram.decode(data["histogram"])
+        return stats
+
+    @property
+    def error_rate(self):
+        """Percentage of failed samples"""
+        return 100.0 * self.errors / self.count if self.count else 0.0
+
+    @property
+    def throughput(self):
+        """Samples per second over the label's active period, or None without timestamps"""
+        if self.first_start is None or self.last_end <= self.first_start:
+            return None
+        return self.count / ((self.last_end - self.first_start) / 1000.0)
+
+    def summary(self):
+        """Numbers shown in reports and used for pass/fail decisions"""
+        throughput = self.throughput
+        return {
+            "label": self.label,
+            "samples": self.count,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 3),
+            "throughput": round(throughput, 3) if throughput is not None else None,
+            "avg": round(self.elapsed_sum / self.count, 1) if self.count else 0,
+            "min": self.min or 0,
+            "max": self.max or 0,
+            **{f"p{p:g}": value for p, value in self.histogram.percentiles([50, 90, 95, 99]).items()},
+            "bytes": self.bytes,
+        }
+
+
+class JtlAnalyzer:
+    """Aggregate a JTL file per label in a single streaming pass"""
+
+    def __init__(self, significant_digits=3, highest=3_600_000):
+        """
+        Args:
+            significant_digits (int): Precision of the latency histograms in decimal digits
+            highest (int): Largest latency in ms tracked with full precision
+        """
+        self.significant_digits = significant_digits
+        self.highest = highest
+        self.labels = {}
+
+    def analyze(self, path):
+        """
+        Read a CSV or XML JTL file, or a binary sample stream
+
+        Args:
+            path (str): Path to the .jtl file
+
+        Returns:
+            JtlAnalyzer: self, for chaining
+        """
+        if is_sample_stream(path):
+            for timestamp, label, elapsed, size, _, success in read_samples(path):
+                self.add(label, elapsed, success, timestamp, size)
+            return self
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            head = f.read(512).lstrip()
+        if head.startswith("<"):
+            self._read_xml(path)
+        else:
+            self._read_csv(path)
+        return self
+
+    def add(self, label, elapsed, success, timestamp=None, size=0):
+        """Record one sample"""
+        stats = self.labels.get(label)
+        if stats is None:
+            stats = self.labels[label] = LabelStats(label, self.significant_digits, self.highest)
+        stats.add(elapsed, success, timestamp, size)
+
+    def total(self):
+        """Stats across all labels"""
+        total = LabelStats(TOTAL_LABEL, self.significant_digits, self.highest)
+        for stats in self.labels.values():
+            total.merge(stats)
+        return total
+
+    def summaries(self):
+        """Per-label summaries sorted by label, followed by the total"""
+        rows = [self.labels[label].summary() for label in sorted(self.labels)]
+        return rows + [self.total().summary()]
+
+    def evaluate(self, max_error_rate=0.0, max_p95=None, min_throughput=None):
+        """
+        Check every label and the total against thresholds
+
+        Args:
+            max_error_rate (float): Highest acceptable error percentage
+            max_p95 (float): Highest acceptable 95th percentile in milliseconds
+            min_throughput (float): Lowest acceptable total throughput in samples per second
+
+        Returns:
+            list: Human-readable threshold violations (empty when the run passes)
+        """
+        violations = []
+        for row in self.summaries():
+            if row["error_rate"] > max_error_rate:
+                violations.append(
+                    f"{row['label']}: error rate {row['error_rate']:.2f}% > {max_error_rate:.2f}% "
+                    f"({row['errors']}/{row['samples']} samples)"
+                )
+            if max_p95 is not None and row["p95"] > max_p95:
+                violations.append(f"{row['label']}: p95 {row['p95']} ms > {max_p95:g} ms")
+
+        total = self.total().summary()
+        if min_throughput is not None and (total["throughput"] or 0) < min_throughput:
+            violations.append(f"{TOTAL_LABEL}: throughput {total['throughput']} req/s < {min_throughput:g} req/s")
+        return violations
+
+    def _read_csv(self, path):
+        csv.field_size_limit(sys.maxsize)
+        with open(path, 'r', newline='', encoding='utf-8', errors='replace') as f:
+            reader = csv.reader(f)
+            first = next(reader, None)
+            if first is None:
+                return
+            header = "elapsed" in first and "label" in first
+            columns = self._columns(first if header else DEFAULT_CSV_FIELDS)
+            if not header:
+                self._add_csv_row(columns, first)
+            for row in reader:
+                self._add_csv_row(columns, row)
+
+    @staticmethod
+    def _columns(fields):
+        return {name: fields.index(name) for name in ("timeStamp", "elapsed", "label", "success", "bytes")
+                if name in fields}
+
+    def _add_csv_row(self, columns, row):
+        if len(row) <= max(columns.values()):
+            return
+        self.add(
+            row[columns["label"]],
+            _to_int(row[columns["elapsed"]]) or 0,
+            row[columns["success"]].strip().lower() == "true",
+            _to_int(row[columns["timeStamp"]]) if "timeStamp" in columns else None,
+            _to_int(row[columns["bytes"]]) or 0 if "bytes" in columns else 0,
+        )
+
+    def _read_xml(self, path):
+        depth = 0
+        root = None
+        for event, element in ET.iterparse(path, events=("start", "end")):
+            if root is None:
+                root = element
+            if element.tag not in XML_SAMPLE_TAGS:
+                continue
+            if event == "start":
+                depth += 1
+                continue
+            depth -= 1
+            # Sub-samples are already included in their parent (e.g. Transaction Controller)
+            if depth == 0:
+                self.add(
+                    element.get("lb", ""),
+                    _to_int(element.get("t")) or 0,
+                    element.get("s", "true") == "true",
+                    _to_int(element.get("ts")),
+                    _to_int(element.get("by")) or 0,
+                )
+                # Drop parsed samples so the tree never grows
+                root.clear()
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def print_table(rows):
+    """Print per-label summaries as a fixed-width table"""
+    header = f"{'Label':<40} {'Samples':>8} {'Err%':>7} {'Req/s':>9} {'Avg':>8} {'p50':>7} {'p90':>7} {'p95':>7} {'p99':>7}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        throughput = f"{row['throughput']:.2f}" if row["throughput"] is not None else "-"
+        print(
+            f"{row['label'][:40]:<40} {row['samples']:>8} {row['error_rate']:>7.2f} {throughput:>9} "
+            f"{row['avg']:>8} {row['p50']:>7} {row['p90']:>7} {row['p95']:>7} {row['p99']:>7}"
+        )
+
+
+def main():
+    """Summarize a JTL file from the command line"""
+    parser = argparse.ArgumentParser(description='Summarize a JMeter .jtl file (CSV or XML)')
+    parser.add_argument('jtl', help='Path to the .jtl file')
+    parser.add_argument('--json', action='store_true', help='Print the summaries as JSON')
+    parser.add_argument('--max-error-rate', type=float, default=0.0, help='Highest acceptable error rate in percent')
+    parser.add_argument('--max-p95', type=float, help='Highest acceptable 95th percentile in milliseconds')
+    parser.add_argument('--min-throughput', type=float, help='Lowest acceptable total throughput in requests/second')
+    args = parser.parse_args()
+
+    analyzer = JtlAnalyzer().analyze(args.jtl)
+    if args.json:
+        print(json.dumps(analyzer.summaries(), indent=2))
+    else:
+        print_table(analyzer.summaries())
+
+    violations = analyzer.evaluate(args.max_error_rate, args.max_p95, args.min_throughput)
+    for violation in violations:
+        print(f"❌ {violation}")
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
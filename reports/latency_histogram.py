@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Mergeable latency histograms (HDR-style) for JMeter results
+
+A histogram keeps a fixed array of counters whose bucket width grows with the
+value, so every recorded value is stored with a bounded relative error set by
+`significant_digits`. Memory does not depend on the number of samples, and two
+histograms with the same settings merge by adding their counters, which makes
+results from several load generators (or several runs) combinable.
+
+Usage:
+    python latency_histogram.py build jmeter-results/results.jtl -o shard1.hgrm.json
+    python latency_histogram.py merge shard1.hgrm.json shard2.hgrm.json -o all.hgrm.json
+    python latency_histogram.py query all.hgrm.json --label "GET Users" --label "POST Create User"
+"""
+import sys
+import json
+import zlib
+import base64
+import argparse
+
+FORMAT_VERSION = 1
+
+
+def _encode_varint(value, out):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _decode_varints(data):
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            yield value
+            value = shift = 0
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory histogram of non-negative integer values
+
+    Values are recorded in whatever unit the caller uses (milliseconds for JTL
+    files). Values above `highest` are clamped to it, so percentiles beyond the
+    trackable range report `highest`; the exact maximum is tracked separately.
+    """
+
+    def __init__(self, lowest=1, highest=3_600_000, significant_digits=3):
+        """
+        Args:
+            lowest (int): Smallest value that must be distinguished from 0
+            highest (int): Largest value tracked with full precision
+            significant_digits (int): Decimal digits of precision, 1 to 5
+        """
+        if not 1 <= significant_digits <= 5:
+            raise ValueError("significant_digits must be between 1 and 5")
+        if lowest < 1 or highest < 2 * lowest:
+            raise ValueError("highest must be at least twice lowest, and lowest at least 1")
+        self.lowest = lowest
+        self.highest = highest
+        self.significant_digits = significant_digits
+
+        largest_single_unit = 2 * 10 ** significant_digits
+        self._unit_magnitude = (lowest).bit_length() - 1
+        self._sub_bucket_count_magnitude = (largest_single_unit - 1).bit_length()
+        self._sub_bucket_half_count_magnitude = self._sub_bucket_count_magnitude - 1
+        self._sub_bucket_count = 1 << self._sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        buckets = 1
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        while smallest_untrackable <= highest:
+            smallest_untrackable <<= 1
+            buckets += 1
+        self._bucket_count = buckets
+        self.counts = [0] * ((buckets + 1) * self._sub_bucket_half_count)
+
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+
+    def settings(self):
+        """Settings that must match for two histograms to merge"""
+        return (self.lowest, self.highest, self.significant_digits)
+
+    def record(self, value, count=1):
+        """Record a value `count` times"""
+        value = int(value)
+        if value < 0:
+            value = 0
+        self.total += count
+        self.sum += value * count
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+        self.counts[self._index(min(value, self.highest))] += count
+
+    def merge(self, other):
+        """Add another histogram's counts to this one"""
+        if other.settings() != self.settings():
+            raise ValueError(f"Cannot merge histograms with settings {other.settings()} into {self.settings()}")
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total += other.total
+        self.sum += other.sum
+        for name, pick in (("min", min), ("max", max)):
+            values = [v for v in (getattr(self, name), getattr(other, name)) if v is not None]
+            setattr(self, name, pick(values) if values else None)
+        return self
+
+    def percentile(self, percent):
+        """
+        Value at or below which the given percentage of samples fall
+
+        Returns the highest value equivalent to the bucket that contains the
+        percentile, capped at the recorded maximum, like HdrHistogram.
+        """
+        return self.percentiles([min(max(percent, 0.0), 100.0)]).popitem()[1]
+
+    def percentiles(self, percents):
+        """Several percentiles in one pass over the counters"""
+        if not self.total:
+            return {percent: 0 for percent in percents}
+        ranks = sorted(
+            (max(1, int(self.total * p / 100.0 + 0.5)) if p < 100 else self.total, p) for p in percents
+        )
+        results = {}
+        seen = 0
+        position = 0
+        for index, count in enumerate(self.counts):
+            if not count:
+                continue
+            seen += count
+            while position < len(ranks) and seen >= ranks[position][0]:
+                results[ranks[position][1]] = min(self._highest_equivalent(self._value_at(index)), self.max)
+                position += 1
+            if position == len(ranks):
+                break
+        for _, percent in ranks[position:]:
+            results[percent] = self.max
+        return results
+
+    def count_at_or_below(self, value):
+        """Number of recorded values that fall in buckets at or below the given value"""
+        count = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count:
+                if self._value_at(index) > value:
+                    break
+                count += bucket_count
+        return count
+
+    @property
+    def mean(self):
+        return self.sum / self.total if self.total else 0.0
+
+    def encode(self):
+        """
+        Serialize to a compact ASCII string
+
+        Only non-zero counters are stored, as (gap, count) varint pairs,
+        then zlib-compressed and base64-encoded.
+        """
+        payload = bytearray()
+        for value in (FORMAT_VERSION, self.lowest, self.highest, self.significant_digits,
+                      self.min or 0, self.max or 0, self.sum):
+            _encode_varint(value, payload)
+        previous = -1
+        for index, count in enumerate(self.counts):
+            if count:
+                _encode_varint(index - previous - 1, payload)
+                _encode_varint(count, payload)
+                previous = index
+        return base64.b64encode(zlib.compress(bytes(payload), 9)).decode("ascii")
+
+    @classmethod
+    def decode(cls, text):
+        """Rebuild a histogram produced by encode()"""
+        values = _decode_varints(zlib.decompress(base64.b64decode(text)))
+        version = next(values)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported histogram format version {version}")
+        lowest, highest, significant_digits = next(values), next(values), next(values)
+        histogram = cls(lowest, highest, significant_digits)
+        minimum, maximum, histogram.sum = next(values), next(values), next(values)
+        index = -1
+        for gap in values:
+            count = next(values)
+            index += gap + 1
+            histogram.counts[index] = count
+            histogram.total += count
+        if histogram.total:
+            histogram.min, histogram.max = minimum, maximum
+        return histogram
+
+    def _index(self, value):
+        bucket = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude - self._sub_bucket_count_magnitude
+        sub_bucket = value >> (bucket + self._unit_magnitude)
+        return ((bucket + 1) << self._sub_bucket_half_count_magnitude) + sub_bucket - self._sub_bucket_half_count
+
+    def _value_at(self, index):
+        bucket = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        if bucket < 0:
+            sub_bucket -= self._sub_bucket_half_count
+            bucket = 0
+        return sub_bucket << (bucket + self._unit_magnitude)
+
+    def _highest_equivalent(self, value):
+        bucket = (value | self._sub_bucket_mask).bit_length() - self._unit_magnitude - self._sub_bucket_count_magnitude
+        size = 1 << (self._unit_magnitude + max(bucket, 0))
+        return value + size - 1
+
+
+def save_histograms(path, analyzer):
+    """Write a JtlAnalyzer's per-label stats and histograms to a .hgrm.json file"""
+    data = {
+        "version": FORMAT_VERSION,
+        "unit": "ms",
+        "labels": {label: stats.to_dict() for label, stats in sorted(analyzer.labels.items())},
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=1)
+
+
+def load_histograms(path, analyzer=None):
+    """Read a .hgrm.json file, merging its labels into an existing JtlAnalyzer if given"""
+    from jtl_analyzer import JtlAnalyzer, LabelStats
+
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported histogram file version {data.get('version')}")
+    for label, entry in data["labels"].items():
+        stats = LabelStats.from_dict(label, entry)
+        if analyzer is None:
+            # Totals are merged from the labels, so they need the same histogram settings
+            analyzer = JtlAnalyzer(stats.histogram.significant_digits, stats.histogram.highest)
+        elif (stats.histogram.significant_digits, stats.histogram.highest) != (analyzer.significant_digits, analyzer.highest):
+            raise ValueError(
+                f"label '{label}' was built with significant_digits={stats.histogram.significant_digits}, "
+                f"highest={stats.histogram.highest}; expected {analyzer.significant_digits}, {analyzer.highest}"
+            )
+        if label in analyzer.labels:
+            analyzer.labels[label].merge(stats)
+        else:
+            analyzer.labels[label] = stats
+    return analyzer or JtlAnalyzer()
+
+
+def main():
+    """Build, merge and query histogram files from the command line"""
+    from jtl_analyzer import JtlAnalyzer, TOTAL_LABEL
+
+    parser = argparse.ArgumentParser(description='Mergeable latency histograms for JMeter results')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Summarize a .jtl file (CSV or XML) into a histogram file')
+    build.add_argument('jtl', help='Path to the .jtl file')
+    build.add_argument('-o', '--output', required=True, help='Histogram file to write')
+    build.add_argument('--significant-digits', type=int, default=3, help='Precision in decimal digits (default: 3)')
+    build.add_argument('--highest', type=int, default=3_600_000, help='Largest tracked value in ms (default: 1 hour)')
+
+    merge = commands.add_parser('merge', help='Merge histogram files from several shards or runs')
+    merge.add_argument('inputs', nargs='+', help='Histogram files to merge')
+    merge.add_argument('-o', '--output', required=True, help='Merged histogram file to write')
+
+    query = commands.add_parser('query', help='Print percentiles per label')
+    query.add_argument('inputs', nargs='+', help='Histogram files (merged on the fly)')
+    query.add_argument('--label', action='append', help='Label to show (repeatable, default: all)')
+    query.add_argument('--percentiles', default='50,95,99,99.9', help='Comma-separated percentiles')
+    query.add_argument('--json', action='store_true', help='Print JSON instead of a table')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        analyzer = JtlAnalyzer(args.significant_digits, args.highest).analyze(args.jtl)
+        save_histograms(args.output, analyzer)
+        print(f"✅ {sum(s.count for s in analyzer.labels.values())} samples in {len(analyzer.labels)} labels "
+              f"written to {args.output}")
+        return
+
+    analyzer = None
+    for path in args.inputs:
+        try:
+            analyzer = load_histograms(path, analyzer)
+        except ValueError as e:
+            print(f"❌ {path}: {e}")
+            sys.exit(1)
+
+    if args.command == 'merge':
+        save_histograms(args.output, analyzer)
+        print(f"✅ Merged {len(args.inputs)} files into {args.output}")
+        return
+
+    percents = [float(p) for p in args.percentiles.split(',')]
+    stats = [analyzer.labels[label] for label in sorted(analyzer.labels)] + [analyzer.total()]
+    if args.label:
+        missing = [label for label in args.label if label not in analyzer.labels and label != TOTAL_LABEL]
+        if missing:
+            print(f"❌ Unknown labels: {', '.join(missing)}")
+            sys.exit(1)
+        stats = [s for s in stats if s.label in args.label]
+
+    rows = [
+        {"label": s.label, "samples": s.count,
+         "percentiles": {f"p{p:g}": value for p, value in s.histogram.percentiles(percents).items()}}
+        for s in stats
+    ]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    names = [f"p{p:g}" for p in percents]
+    print(f"{'Label':<40} {'Samples':>10} " + " ".join(f"{name:>8}" for name in names))
+    for row in rows:
+        print(f"{row['label'][:40]:<40} {row['samples']:>10} "
+              + " ".join(f"{row['percentiles'][name]:>8}" for name in names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Live metrics over HTTP in the Prometheus text format
+
+A MetricsRegistry holds counters, gauges and histograms; a MetricsServer serves
+them at http://<host>:<port>/metrics from a daemon thread while a load run or a
+test session is going on, so progress can be watched (or scraped) before any
+report exists.
+
+Recording is built for hot paths: a counter increment is one addition and a
+histogram observation is a bisect into fixed bucket bounds plus two additions,
+with no locks. Each metric is written by one thread (the event loop or the test
+thread) and only read by the server thread, which under the GIL sees whole
+values; a scrape may see a histogram mid-update, off by one sample at most.
+
+Usage:
+    registry = MetricsRegistry()
+    requests = registry.counter("load_requests_total", "Requests sent", ["label"])
+    server = MetricsServer(registry, port=9464).start()
+    requests.labels("GET Users").inc()
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from 5 ms to 1 minute
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _CounterValue:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+
+class _GaugeValue(_CounterValue):
+    __slots__ = ()
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        # One slot per bound plus the +Inf overflow
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def add(self, counts, total):
+        """Add pre-bucketed observations (one count per bound plus +Inf) and their sum"""
+        for index, count in enumerate(counts):
+            self.counts[index] += count
+        self.sum += total
+
+
+class Metric:
+    """A named metric with one value per combination of label values"""
+
+    TYPE = None
+    VALUE = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        """
+        The value for these label values (created on first use)
+
+        Hot paths should keep the returned object instead of calling labels() every time.
+        """
+        child = self._values.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            child = self._values[values] = self._new_value()
+        return child
+
+    def _new_value(self):
+        return self.VALUE()
+
+    def samples(self):
+        """(name suffix, labels dict, value) of every series"""
+        for values, child in list(self._values.items()):
+            yield "", dict(zip(self.labelnames, values)), child.value
+
+
+class Counter(Metric):
+    TYPE = "counter"
+    VALUE = _CounterValue
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class Gauge(Metric):
+    TYPE = "gauge"
+    VALUE = _GaugeValue
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+
+class Histogram(Metric):
+    TYPE = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_value(self):
+        return _HistogramValue(self.bounds)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def samples(self):
+        for values, child in list(self._values.items()):
+            labels = dict(zip(self.labelnames, values))
+            counts = list(child.counts)
+            cumulative = 0
+            for bound, count in zip(self.bounds, counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            cumulative += counts[-1]
+            yield "_bucket", {**labels, "le": "+Inf"}, cumulative
+            # _count matches the +Inf bucket even when read mid-update
+            yield "_count", labels, cumulative
+            yield "_sum", labels, child.sum
+
+
+class MetricsRegistry:
+    """The metrics one process exports"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def _register(self, kind, name, help_text, labelnames, **options):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = kind(name, help_text, labelnames, **options)
+        elif not isinstance(metric, kind) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} is already registered as a different {metric.TYPE}")
+        return metric
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.help, help_text=True)}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            for suffix, labels, value in metric.samples():
+                if labels:
+                    rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                    lines.append(f"{metric.name}{suffix}{{{rendered}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{metric.name}{suffix} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve a registry at /metrics from a background thread"""
+
+    def __init__(self, registry, port=9464, host="127.0.0.1"):
+        """
+        Args:
+            registry (MetricsRegistry): Metrics to serve
+            port (int): Port to listen on (0 picks a free one)
+            host (str): Interface to bind; the default keeps the endpoint local
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self):
+        """Start serving; returns self"""
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _escape(text, help_text=False):
+    text = text.replace("\\", "\\\\").replace("\n", "\\n")
+    return text if help_text else text.replace('"', '\\"')
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(value)
+    return str(value)
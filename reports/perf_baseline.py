@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Performance regression gate for JMeter runs
+
+Every run's per-label stats and latency histograms are stored in a SQLite file
+keyed by test plan and commit. A new run is compared against the merged
+histograms of the most recent accepted runs, and a label is flagged only when
+the slowdown is both statistically significant and larger than a minimum
+relative change:
+
+- latency: the share of current samples slower than the baseline percentile
+  (e.g. p95) is tested against the share expected if nothing changed
+- error rate: one-sided two-proportion z-test
+- throughput: z-score of the current run against the spread of baseline runs
+  (needs at least two baseline runs)
+
+Usage:
+    python perf_baseline.py check jmeter-results/results.jtl --plan api_load_test --record
+    python perf_baseline.py history --plan api_load_test
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+import subprocess
+from statistics import NormalDist, mean, stdev
+
+from jtl_analyzer import JtlAnalyzer, LabelStats
+
+REPORT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.getenv("PERF_BASELINE_DB", os.path.join(REPORT_DIR, "perf-baseline.sqlite"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    plan TEXT NOT NULL,
+    commit_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    accepted INTEGER NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_plan ON runs (plan, accepted, created);
+CREATE TABLE IF NOT EXISTS label_stats (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    label TEXT NOT NULL,
+    stats TEXT NOT NULL,
+    PRIMARY KEY (run_id, label)
+);
+"""
+
+# Bytes read from each end of a results file to fingerprint it
+FINGERPRINT_CHUNK = 1024 * 1024
+
+
+def jtl_fingerprint(path):
+    """
+    Identify a results file without reading all of it
+
+    Size plus the first and last MiB, which hold the first and last sample
+    timestamps, tell runs apart and survive copying the file around.
+    """
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        sha.update(f.read(FINGERPRINT_CHUNK))
+        if size > FINGERPRINT_CHUNK:
+            f.seek(max(FINGERPRINT_CHUNK, size - FINGERPRINT_CHUNK))
+            sha.update(f.read(FINGERPRINT_CHUNK))
+    return f"{size}:{sha.hexdigest()}"
+
+
+def current_commit():
+    """Commit being tested, from the CI environment or the local checkout"""
+    for name in ("GIT_COMMIT", "CI_COMMIT_SHA", "GITHUB_SHA"):
+        if os.getenv(name):
+            return os.getenv(name)
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPORT_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class BaselineStore:
+    """Per-label JMeter results of past runs in a single SQLite file"""
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.executescript(SCHEMA)
+        # Files created before results were fingerprinted
+        if "source" not in {row[1] for row in self.db.execute("PRAGMA table_info(runs)")}:
+            self.db.execute("ALTER TABLE runs ADD COLUMN source TEXT")
+        self.db.execute("CREATE INDEX IF NOT EXISTS runs_source ON runs (plan, source)")
+
+    def record(self, plan, analyzer, commit_id=None, accepted=True, source=None):
+        """
+        Store a run
+
+        Args:
+            plan (str): Test plan name, e.g. "api_load_test"
+            analyzer (JtlAnalyzer): Results of the run
+            commit_id (str): Commit under test (defaults to current_commit())
+            accepted (bool): Whether the run may serve as a baseline for later runs
+            source (str): jtl_fingerprint of the results file
+
+        Returns:
+            int: Id of the stored run
+        """
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT INTO runs (plan, commit_id, created, accepted, source) VALUES (?, ?, ?, ?, ?)",
+                (plan, commit_id or current_commit(), time.time(), int(accepted), source)
+            )
+            self.db.executemany(
+                "INSERT INTO label_stats (run_id, label, stats) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, label, json.dumps(stats.to_dict())) for label, stats in analyzer.labels.items()]
+            )
+        return cursor.lastrowid
+
+    def is_recorded(self, plan, source):
+        """Whether a results file with this fingerprint is already stored for the plan"""
+        return self.db.execute(
+            "SELECT 1 FROM runs WHERE plan = ? AND source = ? LIMIT 1", (plan, source)
+        ).fetchone() is not None
+
+    def baseline_runs(self, plan, limit=5, exclude_commit=None, exclude_source=None):
+        """
+        Most recent accepted runs of a plan, newest first
+
+        Returns:
+            list: (run id, commit id, {label: LabelStats}) tuples
+        """
+        rows = self.db.execute(
+            "SELECT id, commit_id FROM runs WHERE plan = ? AND accepted = 1 AND commit_id != ? "
+            "AND (? IS NULL OR source IS NOT ?) ORDER BY created DESC LIMIT ?",
+            (plan, exclude_commit or "", exclude_source, exclude_source, limit)
+        ).fetchall()
+        runs = []
+        for run_id, commit_id in rows:
+            labels = {
+                label: LabelStats.from_dict(label, json.loads(stats))
+                for label, stats in self.db.execute(
+                    "SELECT label, stats FROM label_stats WHERE run_id = ?", (run_id,)
+                )
+            }
+            runs.append((run_id, commit_id, labels))
+        return runs
+
+    def history(self, plan, limit=20):
+        """Recent runs of a plan as (created, commit id, accepted) tuples, newest first"""
+        return self.db.execute(
+            "SELECT created, commit_id, accepted FROM runs WHERE plan = ? ORDER BY created DESC LIMIT ?",
+            (plan, limit)
+        ).fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+class RegressionChecker:
+    """Compare a run against baseline runs and report significant slowdowns"""
+
+    def __init__(self, percentile=95, alpha=0.01, min_latency_change=0.10,
+                 min_error_rate_change=0.5, min_throughput_change=0.10, min_samples=100):
+        """
+        Args:
+            percentile (float): Latency percentile to compare
+            alpha (float): One-sided significance level of every test
+            min_latency_change (float): Smallest relative latency increase worth failing on
+            min_error_rate_change (float): Smallest error rate increase in percentage points
+            min_throughput_change (float): Smallest relative throughput drop worth failing on
+            min_samples (int): Labels with fewer samples in either run are not judged
+        """
+        self.percentile = percentile
+        self.alpha = alpha
+        self.critical_z = NormalDist().inv_cdf(1 - alpha)
+        self.min_latency_change = min_latency_change
+        self.min_error_rate_change = min_error_rate_change
+        self.min_throughput_change = min_throughput_change
+        self.min_samples = min_samples
+
+    def compare(self, analyzer, baseline_runs):
+        """
+        Args:
+            analyzer (JtlAnalyzer): Current run
+            baseline_runs (list): Output of BaselineStore.baseline_runs
+
+        Returns:
+            list: Regressions as human-readable strings (empty when the run passes)
+        """
+        regressions = []
+        for label, current in sorted(analyzer.labels.items()):
+            history = [labels[label] for _, _, labels in baseline_runs if label in labels]
+            if not history:
+                continue
+            baseline = LabelStats(label, history[0].histogram.significant_digits, history[0].histogram.highest)
+            for stats in history:
+                baseline.merge(stats)
+            if min(current.count, baseline.count) < self.min_samples:
+                continue
+            regressions += filter(None, [
+                self._latency(label, current, baseline),
+                self._error_rate(label, current, baseline),
+                self._throughput(label, current, history),
+            ])
+        return regressions
+
+    def _latency(self, label, current, baseline):
+        threshold = baseline.histogram.percentile(self.percentile)
+        now = current.histogram.percentile(self.percentile)
+        if threshold <= 0 or now < threshold * (1 + self.min_latency_change):
+            return None
+        # Under "no change", a share (100 - percentile)% of current samples is slower than the baseline value
+        expected = 1 - self.percentile / 100.0
+        slower = current.count - current.histogram.count_at_or_below(threshold)
+        z = (slower - current.count * expected) / (current.count * expected * (1 - expected)) ** 0.5
+        if z < self.critical_z:
+            return None
+        return (f"{label}: p{self.percentile:g} {threshold} ms -> {now} ms "
+                f"(+{(now / threshold - 1) * 100:.0f}%, z={z:.1f})")
+
+    def _error_rate(self, label, current, baseline):
+        p1, p2 = baseline.errors / baseline.count, current.errors / current.count
+        if (p2 - p1) * 100 < self.min_error_rate_change:
+            return None
+        pooled = (baseline.errors + current.errors) / (baseline.count + current.count)
+        se = (pooled * (1 - pooled) * (1 / baseline.count + 1 / current.count)) ** 0.5
+        z = (p2 - p1) / se if se else float("inf")
+        if z < self.critical_z:
+            return None
+        return f"{label}: error rate {p1 * 100:.2f}% -> {p2 * 100:.2f}% (z={z:.1f})"
+
+    def _throughput(self, label, current, history):
+        rates = [stats.throughput for stats in history if stats.throughput]
+        now = current.throughput
+        if len(rates) < 2 or not now:
+            return None
+        average, spread = mean(rates), stdev(rates)
+        if now > average * (1 - self.min_throughput_change):
+            return None
+        z = (average - now) / spread if spread else float("inf")
+        if z < self.critical_z:
+            return None
+        return f"{label}: throughput {average:.1f} -> {now:.1f} req/s (z={z:.1f})"
+
+
+def check_regressions(analyzer, plan, db_path=DEFAULT_DB, record=True, baseline_size=5, checker=None,
+                      source=None):
+    """
+    Compare a run with its baseline and optionally store it
+
+    Runs with regressions are stored as not accepted, so a slowdown never
+    becomes part of the baseline it is judged against. A results file that is
+    already stored (the same .jtl checked again by a later pipeline) is neither
+    recorded a second time nor part of its own baseline.
+
+    Args:
+        source (str): jtl_fingerprint of the results file, used to recognize it
+
+    Returns:
+        list: Regressions (empty when the run passes or there is no baseline yet)
+    """
+    store = BaselineStore(db_path)
+    try:
+        commit_id = current_commit()
+        if record and source and store.is_recorded(plan, source):
+            print(f"ℹ️  These results are already stored for '{plan}', not recording them again")
+            record = False
+        baseline = store.baseline_runs(plan, baseline_size, exclude_commit=commit_id, exclude_source=source)
+        if not baseline:
+            print(f"ℹ️  No baseline for '{plan}' yet" + (", this run becomes the first one" if record else ""))
+        regressions = (checker or RegressionChecker()).compare(analyzer, baseline)
+        if record:
+            store.record(plan, analyzer, commit_id, accepted=not regressions, source=source)
+        return regressions
+    finally:
+        store.close()
+
+
+def main():
+    """Check a run against the baseline or show the stored history"""
+    parser = argparse.ArgumentParser(description='Detect JMeter performance regressions against a stored baseline')
+    parser.add_argument('--db', default=DEFAULT_DB, help='Baseline SQLite file (default: $PERF_BASELINE_DB)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check = commands.add_parser('check', help='Compare a run with the baseline')
+    check.add_argument('jtl', help='.jtl file of the run')
+    check.add_argument('--plan', required=True, help='Test plan name the baseline is kept for')
+    check.add_argument('--record', action='store_true', help='Store the run after the comparison')
+    check.add_argument('--baseline-size', type=int, default=5, help='Number of recent accepted runs to compare with')
+    check.add_argument('--percentile', type=float, default=95, help='Latency percentile to compare (default: 95)')
+    check.add_argument('--alpha', type=float, default=0.01, help='Significance level (default: 0.01)')
+    check.add_argument('--min-change', type=float, default=10,
+                       help='Smallest latency increase / throughput drop in percent to fail on (default: 10)')
+
+    history = commands.add_parser('history', help='List stored runs of a plan')
+    history.add_argument('--plan', required=True, help='Test plan name')
+
+    args = parser.parse_args()
+
+    if args.command == 'history':
+        store = BaselineStore(args.db)
+        for created, commit_id, accepted in store.history(args.plan):
+            print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(created))}  {commit_id[:12]:<12}  "
+                  f"{'accepted' if accepted else 'regressed'}")
+        store.close()
+        return
+
+    checker = RegressionChecker(
+        args.percentile, args.alpha, args.min_change / 100, min_throughput_change=args.min_change / 100
+    )
+    regressions = check_regressions(
+        JtlAnalyzer().analyze(args.jtl), args.plan, args.db, args.record, args.baseline_size, checker,
+        source=jtl_fingerprint(args.jtl)
+    )
+    for regression in regressions:
+        print(f"❌ {regression}")
+    if not regressions:
+        print("✅ No performance regressions")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
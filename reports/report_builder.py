@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+Incremental Allure report builder with a combined test summary
+
+`allure generate --clean` on allure-results rebuilds everything and copies every
+attachment on every run. The builder instead:
+
+- stages its inputs (allure-results, the history of the last final report and
+  the Newman JUnit files, which Allure reads as well) in a cache where every file is
+  stored once per content hash and linked into place; unchanged files are
+  recognized by size and modification time and neither hashed nor copied again
+- skips Allure entirely when the staged results are the same as for the last
+  report
+- renders summary.html / summary.json next to the report (UI results from the
+  Allure index, Newman JUnit totals, JMeter per-label stats) while Allure runs,
+  with the JMeter stats cached until the .jtl changes
+- in watch mode, rebuilds as results arrive, so the report is mostly up to date
+  when the tests finish
+
+The report is generated next to the old one and swapped in when complete.
+Reports built in watch mode are intermediate: every build of a pipeline run
+starts from the history of the last final (`build`) report, so a run adds one
+point to the Allure trends however often it was rebuilt.
+
+Usage:
+    python report_builder.py build
+    python report_builder.py watch --interval 10     # alongside the tests
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import hashlib
+import threading
+import argparse
+import subprocess
+import xml.etree.ElementTree as ET
+from html import escape
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from allure_index import DEFAULT_INDEX, AllureIndex
+from jtl_analyzer import JtlAnalyzer
+
+REPORT_DIR = os.path.dirname(os.path.abspath(__file__))
+ALLURE_RESULTS_DIR = os.path.join(REPORT_DIR, "allure-results")
+ALLURE_REPORT_DIR = os.path.join(REPORT_DIR, "allure-report")
+JUNIT_DIR = os.path.join(REPORT_DIR, "postman-reports", "junit")
+JTL_PATH = os.path.join(REPORT_DIR, "jmeter-results", "results.jtl")
+CACHE_DIR = os.getenv("ALLURE_CACHE_DIR", os.path.join(REPORT_DIR, ".allure-cache"))
+
+HASH_CHUNK = 1024 * 1024
+
+
+class ReportBuilder:
+    """Build the Allure report and the combined summary from cached, deduplicated inputs"""
+
+    def __init__(self, results_dir=ALLURE_RESULTS_DIR, report_dir=ALLURE_REPORT_DIR, junit_dir=JUNIT_DIR,
+                 jtl_path=JTL_PATH, cache_dir=CACHE_DIR, index_path=DEFAULT_INDEX, workers=4):
+        """
+        Args:
+            results_dir (str): allure-results directory
+            report_dir (str): Where the HTML report goes
+            junit_dir (str): Newman JUnit XML files included in the report and the summary
+            jtl_path (str): JMeter results summarized in summary.html
+            cache_dir (str): Content-addressed file store, staged inputs and build state
+            index_path (str): Allure result index (shared with generate_reports.py)
+            workers (int): Threads hashing new files
+        """
+        self.results_dir = results_dir
+        self.report_dir = report_dir
+        self.junit_dir = junit_dir
+        self.jtl_path = jtl_path
+        self.cache_dir = cache_dir
+        self.index_path = index_path
+        self.workers = workers
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.staged_dir = os.path.join(cache_dir, "staged")
+        self.history_dir = os.path.join(cache_dir, "history")
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.manifest = self._load_json(self.manifest_path) or {"files": {}, "built": None}
+        self._stop = threading.Event()
+        self._snapshot_history()
+
+    def _snapshot_history(self):
+        """
+        Keep the history of the last final report as the history of every build
+
+        Each report's history includes the results it was built from, so feeding an
+        intermediate report's history into the next build would add a trend point
+        per rebuild. The snapshot is only taken when the current report is final;
+        otherwise the one taken before the intermediate builds is kept.
+        """
+        if not self.manifest.get("final", True) and os.path.isdir(self.history_dir):
+            return
+        source = os.path.join(self.report_dir, "history")
+        snapshot = self.history_dir + ".tmp"
+        shutil.rmtree(snapshot, ignore_errors=True)
+        if os.path.isdir(source):
+            shutil.copytree(source, snapshot)
+        else:
+            os.makedirs(snapshot)
+        shutil.rmtree(self.history_dir, ignore_errors=True)
+        os.rename(snapshot, self.history_dir)
+
+    def _inputs(self):
+        """(staged name, path, counts towards the fingerprint) of every input file"""
+        sources = [(self.results_dir, "", None, True),
+                   # History is an output of the previous build, so it never triggers a new one
+                   (self.history_dir, "history/", None, False),
+                   (self.junit_dir, "newman-", ".xml", True)]
+        for directory, prefix, suffix, fingerprinted in sources:
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file() and (suffix is None or entry.name.endswith(suffix)):
+                        yield prefix + entry.name, entry.path, fingerprinted
+
+    def stage(self):
+        """
+        Bring the staged inputs up to date
+
+        Returns:
+            dict: Number of files, of files reused unchanged, of new contents stored,
+                and the fingerprint of the inputs that affect the report
+        """
+        previous = self.manifest["files"]
+        files = {}
+        pending = []
+        fingerprinted = set()
+        for name, path, counts in self._inputs():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if counts:
+                fingerprinted.add(name)
+            known = previous.get(name)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                files[name] = known
+            else:
+                pending.append((name, path, stat))
+
+        stored = 0
+        with ThreadPoolExecutor(self.workers) as pool:
+            for (name, path, stat), (digest, new) in zip(pending, pool.map(lambda item: self._store(item[1]),
+                                                                           pending)):
+                if digest is None:
+                    continue
+                files[name] = [stat.st_mtime_ns, stat.st_size, digest]
+                stored += new
+
+        for name, (_, _, digest) in files.items():
+            target = os.path.join(self.staged_dir, name)
+            if name in previous and previous[name][2] == digest and os.path.exists(target):
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.lexists(target):
+                os.remove(target)
+            source = self._object_path(digest)
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copyfile(source, target)
+        for name in previous.keys() - files.keys():
+            target = os.path.join(self.staged_dir, name)
+            if os.path.lexists(target):
+                os.remove(target)
+
+        fingerprint = hashlib.sha256(
+            "\n".join(f"{name}:{files[name][2]}" for name in sorted(fingerprinted & files.keys())).encode()
+        ).hexdigest()
+        self.manifest["files"] = files
+        self._save_manifest()
+        return {"files": len(files), "reused": len(files) - len(pending), "stored": stored,
+                "fingerprint": fingerprint}
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _store(self, path):
+        """Hash a file and add its content to the store; returns (digest, whether it was new)"""
+        sha = hashlib.sha256()
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            target = self._object_path(digest)
+            if os.path.exists(target):
+                return digest, False
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            tmp_path = f"{target}.{os.getpid()}.tmp"
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, target)
+            return digest, True
+        except OSError:
+            # Deleted while staging; picked up (or dropped) on the next pass
+            return None, False
+
+    def prune(self):
+        """Remove stored contents no staged file uses any more"""
+        used = {digest for _, _, digest in self.manifest["files"].values()}
+        removed = 0
+        if not os.path.isdir(self.objects_dir):
+            return removed
+        for prefix in os.listdir(self.objects_dir):
+            directory = os.path.join(self.objects_dir, prefix)
+            for digest in os.listdir(directory):
+                if digest not in used:
+                    os.remove(os.path.join(directory, digest))
+                    removed += 1
+        return removed
+
+    def build(self, force=False, final=True):
+        """
+        Stage the inputs and regenerate what changed
+
+        Args:
+            force (bool): Run Allure even when the results did not change
+            final (bool): False for the intermediate builds of watch mode, whose
+                history the next build does not start from
+
+        Returns:
+            bool: Whether the report is available
+        """
+        started = time.monotonic()
+        staged = self.stage()
+        print(f"Staged {staged['files']} files: {staged['reused']} unchanged, "
+              f"{staged['files'] - staged['reused']} new or changed ({staged['stored']} new contents)")
+
+        with ThreadPoolExecutor(1) as pool:
+            # The summary (possibly streaming a large .jtl) is computed while Allure runs
+            summary = pool.submit(self.summary)
+            if (not force and staged["fingerprint"] == self.manifest["built"]
+                    and os.path.exists(os.path.join(self.report_dir, "index.html"))):
+                print("♻️  Results unchanged since the last report, keeping it")
+                generated = True
+            else:
+                generated = self._generate()
+                if generated:
+                    self.manifest["built"] = staged["fingerprint"]
+            if generated:
+                self.manifest["final"] = final
+                self._save_manifest()
+            summary = summary.result()
+
+        os.makedirs(self.report_dir, exist_ok=True)
+        self.write_summary(summary)
+        self.prune()
+        if generated:
+            print(f"✅ Report ready at {self.report_dir} in {time.monotonic() - started:.1f}s")
+        return generated
+
+    def _generate(self):
+        building = self.report_dir + ".building"
+        shutil.rmtree(building, ignore_errors=True)
+        try:
+            print("Generating Allure report...")
+            subprocess.run(["allure", "generate", self.staged_dir, "-o", building, "--clean"],
+                           check=True, stdout=subprocess.DEVNULL)
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Failed to generate Allure report: {e}")
+            return False
+        except FileNotFoundError:
+            print("❌ Allure command not found. Please install Allure command line tool.")
+            return False
+
+        # Swap the finished report in, so readers never see a half-written one
+        old = self.report_dir + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(self.report_dir):
+            os.rename(self.report_dir, old)
+        os.rename(building, self.report_dir)
+        shutil.rmtree(old, ignore_errors=True)
+        return True
+
+    def watch(self, interval=10):
+        """
+        Rebuild whenever the results change, until interrupted or terminated
+
+        SIGTERM stops the watcher between builds: a running `allure generate` is
+        finished rather than orphaned, so it cannot race the final build.
+        """
+        print(f"👀 Watching {self.results_dir} every {interval:g}s (Ctrl+C to stop)")
+        signal.signal(signal.SIGTERM, lambda signum, frame: self._stop.set())
+        try:
+            while not self._stop.is_set():
+                if self.stage()["fingerprint"] != self.manifest["built"]:
+                    self.build(final=False)
+                self._stop.wait(interval)
+        except KeyboardInterrupt:
+            pass
+        print("Stopped watching")
+
+    def summary(self):
+        """UI, API and performance results in one dict"""
+        index = AllureIndex(self.results_dir, self.index_path)
+        try:
+            index.refresh()
+            ui = index.summary()
+            ui["failures"] = [{"test": name, "status": status, "message": message}
+                              for name, status, message, _ in index.failures()]
+        finally:
+            index.close()
+        return {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "ui": ui,
+            "api": self._junit_summary(),
+            "performance": self._jmeter_summary(),
+        }
+
+    def _junit_summary(self):
+        suites = []
+        if os.path.isdir(self.junit_dir):
+            for name in sorted(os.listdir(self.junit_dir)):
+                if not name.endswith(".xml"):
+                    continue
+                try:
+                    for _, element in ET.iterparse(os.path.join(self.junit_dir, name)):
+                        if element.tag == "testsuite":
+                            suites.append({
+                                "suite": element.get("name", name),
+                                "tests": int(element.get("tests", 0)),
+                                "failures": int(element.get("failures", 0)),
+                                "errors": int(element.get("errors", 0)),
+                                "time": float(element.get("time", 0) or 0),
+                            })
+                        element.clear()
+                except (ET.ParseError, ValueError) as e:
+                    print(f"⚠️  Skipping {name}: {e}")
+        return suites
+
+    def _jmeter_summary(self):
+        """Per-label JMeter stats, reused from the cache while the .jtl is unchanged"""
+        if not os.path.exists(self.jtl_path):
+            return []
+        stat = os.stat(self.jtl_path)
+        key = [self.jtl_path, stat.st_mtime_ns, stat.st_size]
+        cache_path = os.path.join(self.cache_dir, "jmeter-summary.json")
+        cached = self._load_json(cache_path)
+        if cached and cached["key"] == key:
+            return cached["rows"]
+        try:
+            rows = JtlAnalyzer().analyze(self.jtl_path).summaries()
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Skipping JMeter results: {e}")
+            return []
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump({"key": key, "rows": rows}, f)
+        return rows
+
+    def write_summary(self, summary):
+        """Write summary.json and summary.html into the report directory"""
+        with open(os.path.join(self.report_dir, "summary.json"), 'w') as f:
+            json.dump(summary, f, indent=2)
+        with open(os.path.join(self.report_dir, "summary.html"), 'w', encoding='utf-8') as f:
+            f.write(render_summary(summary))
+
+    def _save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _load_json(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+def _table(headers, rows):
+    head = "".join(f"<th>{escape(str(header))}</th>" for header in headers)
+    body = "".join("<tr>" + "".join(f"<td>{escape(str(cell))}</td>" for cell in row) + "</tr>" for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+
+def render_summary(summary):
+    """The combined summary as a standalone HTML page"""
+    ui = summary["ui"]
+    sections = [
+        "<h2>UI tests (Allure)</h2>",
+        _table(["Tests", "Passed", "Failed", "Broken", "Skipped", "Test time (s)"],
+               [[ui["tests"], ui["passed"], ui["failed"], ui["broken"], ui["skipped"],
+                 f"{ui['duration'] / 1000:.1f}"]]),
+    ]
+    if ui["failures"]:
+        sections.append(_table(["Failed test", "Status", "Message"],
+                               [[row["test"], row["status"], (row["message"] or "").split("\n")[0]]
+                                for row in ui["failures"]]))
+    sections.append("<h2>API tests (Newman)</h2>")
+    sections.append(_table(["Suite", "Tests", "Failures", "Errors", "Time (s)"],
+                           [[row["suite"], row["tests"], row["failures"], row["errors"], f"{row['time']:.1f}"]
+                            for row in summary["api"]]) if summary["api"] else "<p>No results</p>")
+    sections.append("<h2>Performance (JMeter)</h2>")
+    sections.append(_table(["Label", "Samples", "Err%", "Req/s", "Avg", "p50", "p90", "p95", "p99"],
+                           [[row["label"], row["samples"], f"{row['error_rate']:.2f}",
+                             "-" if row["throughput"] is None else f"{row['throughput']:.2f}",
+                             row["avg"], row["p50"], row["p90"], row["p95"], row["p99"]]
+                            for row in summary["performance"]]) if summary["performance"] else "<p>No results</p>")
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>Test summary</title>"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1em}"
+        "td,th{border:1px solid #ccc;padding:4px 8px;text-align:left}th{background:#f4f4f4}</style></head>"
+        f"<body><h1>Test summary</h1><p>Generated {escape(summary['generated'])} · "
+        "<a href=\"index.html\">Allure report</a></p>" + "".join(sections) + "</body></html>"
+    )
+
+
+def main():
+    """Build the report once or keep rebuilding it while tests run"""
+    parser = argparse.ArgumentParser(description='Build the Allure report and the combined summary incrementally')
+    parser.add_argument('--results', default=ALLURE_RESULTS_DIR, help='allure-results directory')
+    parser.add_argument('--report', default=ALLURE_REPORT_DIR, help='Report output directory')
+    parser.add_argument('--junit', default=JUNIT_DIR, help='Newman JUnit XML directory')
+    parser.add_argument('--jtl', default=JTL_PATH, help='JMeter results file')
+    parser.add_argument('--cache', default=CACHE_DIR, help='Cache directory (default: $ALLURE_CACHE_DIR)')
+    parser.add_argument('--index', default=DEFAULT_INDEX, help='Allure result index (default: $ALLURE_INDEX_DB)')
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='Build the report once')
+    build.add_argument('--force', action='store_true', help='Run Allure even if the results did not change')
+    watch = commands.add_parser('watch', help='Rebuild the report whenever the results change')
+    watch.add_argument('--interval', type=float, default=10, help='Seconds between checks (default: 10)')
+    args = parser.parse_args()
+
+    builder = ReportBuilder(args.results, args.report, args.junit, args.jtl, args.cache, args.index)
+    if args.command == 'watch':
+        builder.watch(args.interval)
+        return
+    if not builder.build(args.force):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Compact binary sample stream for headless load runs
+
+Each sample is a fixed 22-byte record (timestamp, label id, latency, bytes, status
+code, success) instead of a CSV line of 100+ bytes with thread names, URLs and
+messages. Labels are written once, the first time they appear. The stream can be
+read back one record at a time, converted to a CSV JTL for JMeter's dashboard, or
+passed to jtl_analyzer.py, which recognizes it.
+
+Usage:
+    python sample_stream.py summary load-results/results.samples
+    python sample_stream.py to-jtl load-results/results.samples -o results.jtl
+"""
+import csv
+import sys
+import struct
+import argparse
+
+MAGIC = b"LDSMPL\x01\n"
+
+LABEL_RECORD = b"L"
+SAMPLE_RECORD = b"S"
+# Label definition: id, length of the UTF-8 name that follows
+LABEL = struct.Struct("<HH")
+# Sample: timestamp (epoch ms), elapsed (ms), response bytes, label id, status code, success
+SAMPLE = struct.Struct("<qIIHH?")
+
+MAX_LABELS = 0xFFFF
+UINT32_MAX = 0xFFFFFFFF
+
+
+class SampleStreamWriter:
+    """Append samples to a binary stream file"""
+
+    def __init__(self, path, buffer_size=1024 * 1024):
+        """
+        Args:
+            path (str): File to create
+            buffer_size (int): Write buffer in bytes
+        """
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._file.write(MAGIC)
+        self._labels = {}
+
+    def write(self, label, timestamp, elapsed, success, size=0, status=0):
+        """
+        Write one sample
+
+        Args:
+            label (str): Sampler label
+            timestamp (int): Start time in epoch milliseconds
+            elapsed (int): Latency in milliseconds
+            success (bool): Whether the sample passed
+            size (int): Response bytes
+            status (int): HTTP status code, 0 for transport errors
+        """
+        label_id = self._labels.get(label)
+        if label_id is None:
+            if len(self._labels) >= MAX_LABELS:
+                raise ValueError(f"A sample stream holds at most {MAX_LABELS} labels")
+            label_id = self._labels[label] = len(self._labels)
+            name = label.encode("utf-8")[:0xFFFF]
+            self._file.write(LABEL_RECORD + LABEL.pack(label_id, len(name)) + name)
+        self._file.write(SAMPLE_RECORD + SAMPLE.pack(
+            timestamp, min(max(elapsed, 0), UINT32_MAX), min(size, UINT32_MAX), label_id, status, success
+        ))
+
+    def close(self):
+        self._file.close()
+
+
+def is_sample_stream(path):
+    """Whether the file starts like a sample stream"""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def read_samples(path):
+    """
+    Samples of a stream, in write order
+
+    A record cut short at the end (the writer was killed) is ignored.
+
+    Yields:
+        tuple: (timestamp, label, elapsed, size, status, success)
+    """
+    labels = {}
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a sample stream")
+        while True:
+            kind = f.read(1)
+            if kind == SAMPLE_RECORD:
+                record = f.read(SAMPLE.size)
+                if len(record) < SAMPLE.size:
+                    return
+                timestamp, elapsed, size, label_id, status, success = SAMPLE.unpack(record)
+                yield timestamp, labels[label_id], elapsed, size, status, success
+            elif kind == LABEL_RECORD:
+                header = f.read(LABEL.size)
+                if len(header) < LABEL.size:
+                    return
+                label_id, length = LABEL.unpack(header)
+                name = f.read(length)
+                if len(name) < length:
+                    return
+                labels[label_id] = name.decode("utf-8", errors="replace")
+            elif not kind:
+                return
+            else:
+                raise ValueError(f"{path}: unknown record type {kind!r} at byte {f.tell() - 1}")
+
+
+def to_jtl(path, output):
+    """
+    Convert a stream to a CSV JTL with a header row
+
+    Returns:
+        int: Number of samples written
+    """
+    count = 0
+    with open(output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["timeStamp", "elapsed", "label", "responseCode", "success", "bytes"])
+        for timestamp, label, elapsed, size, status, success in read_samples(path):
+            writer.writerow([timestamp, elapsed, label, status, "true" if success else "false", size])
+            count += 1
+    return count
+
+
+def main():
+    """Summarize or convert sample streams from the command line"""
+    from jtl_analyzer import JtlAnalyzer, print_table
+
+    parser = argparse.ArgumentParser(description='Read binary sample streams from headless load runs')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    summary = commands.add_parser('summary', help='Print per-label stats of one or more streams')
+    summary.add_argument('inputs', nargs='+', help='Sample stream files (e.g. one per worker)')
+
+    convert = commands.add_parser('to-jtl', help='Convert a stream to a CSV .jtl file')
+    convert.add_argument('input', help='Sample stream file')
+    convert.add_argument('-o', '--output', required=True, help='CSV .jtl file to write')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'to-jtl':
+            count = to_jtl(args.input, args.output)
+            print(f"✅ {count} samples written to {args.output}")
+            return
+        analyzer = JtlAnalyzer()
+        for path in args.inputs:
+            analyzer.analyze(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_table(analyzer.summaries())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Tests for the streaming JTL analyzer
+
+Run from the repository root:
+    python -m pytest reports/test_jtl_analyzer.py
+"""
+import pytest
+
+from jtl_analyzer import DEFAULT_CSV_FIELDS, TOTAL_LABEL, JtlAnalyzer
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_csv_with_header_and_quoted_commas(tmp_path):
+    path = write(tmp_path, "results.jtl", (
+        "timeStamp,elapsed,label,responseCode,responseMessage,success,failureMessage,bytes\n"
+        '1000,120,"GET Users, page 1",200,OK,true,,512\n'
+        '1100,80,"GET Users, page 1",200,OK,true,,512\n'
+        '1200,300,POST Create User,500,"Server Error, retry",false,"Expected 201, got 500",64\n'
+    ))
+    analyzer = JtlAnalyzer().analyze(path)
+
+    assert sorted(analyzer.labels) == ["GET Users, page 1", "POST Create User"]
+    users = analyzer.labels["GET Users, page 1"]
+    assert (users.count, users.errors, users.bytes, users.min, users.max) == (2, 0, 1024, 80, 120)
+    create = analyzer.labels["POST Create User"]
+    assert (create.count, create.errors, create.error_rate) == (1, 1, 100.0)
+
+
+def test_csv_without_header_uses_default_columns(tmp_path):
+    row = dict.fromkeys(DEFAULT_CSV_FIELDS, "")
+    row.update(timeStamp="1000", elapsed="250", label="GET Item", success="true", bytes="10")
+    path = write(tmp_path, "results.jtl", ",".join(row[name] for name in DEFAULT_CSV_FIELDS) + "\n")
+    analyzer = JtlAnalyzer().analyze(path)
+
+    stats = analyzer.labels["GET Item"]
+    assert (stats.count, stats.elapsed_sum, stats.bytes, stats.first_start, stats.last_end) == (1, 250, 10, 1000, 1250)
+
+
+def test_csv_skips_short_rows(tmp_path):
+    path = write(tmp_path, "results.jtl", "timeStamp,elapsed,label,success\n1000,10,GET,true\n1001,20\n")
+    assert JtlAnalyzer().analyze(path).labels["GET"].count == 1
+
+
+def test_xml_counts_parent_samples_only(tmp_path):
+    path = write(tmp_path, "results.xml", """<?xml version="1.0" encoding="UTF-8"?>
+<testResults version="1.2">
+  <sample t="500" ts="1000" s="true" lb="Checkout" by="300">
+    <httpSample t="200" ts="1000" s="true" lb="GET Cart" by="100"/>
+    <httpSample t="300" ts="1200" s="true" lb="POST Order" by="200">
+      <httpSample t="100" ts="1200" s="true" lb="Redirect" by="0"/>
+    </httpSample>
+  </sample>
+  <httpSample t="50" ts="2000" s="false" lb="GET Users" by="20"/>
+</testResults>
+""")
+    analyzer = JtlAnalyzer().analyze(path)
+
+    assert sorted(analyzer.labels) == ["Checkout", "GET Users"]
+    assert analyzer.labels["Checkout"].elapsed_sum == 500
+    assert analyzer.labels["GET Users"].errors == 1
+    assert analyzer.total().count == 2
+
+
+def test_throughput_and_percentiles_of_summary(tmp_path):
+    lines = ["timeStamp,elapsed,label,success"]
+    lines += [f"{1000 + i * 10},{i + 1},GET,true" for i in range(100)]
+    analyzer = JtlAnalyzer().analyze(write(tmp_path, "results.jtl", "\n".join(lines) + "\n"))
+
+    summary = analyzer.labels["GET"].summary()
+    # 100 samples from 1000 ms to the end of the last one at 1990 + 100 ms
+    assert summary["throughput"] == pytest.approx(100 / 1.09, rel=1e-3)
+    assert (summary["p50"], summary["p95"], summary["p99"]) == (50, 95, 99)
+    assert analyzer.summaries()[-1]["label"] == TOTAL_LABEL
+
+
+def test_evaluate_reports_every_threshold(tmp_path):
+    lines = ["timeStamp,elapsed,label,success"]
+    lines += [f"{1000 + i},{100 if i < 90 else 900},GET,{'false' if i == 0 else 'true'}" for i in range(100)]
+    analyzer = JtlAnalyzer().analyze(write(tmp_path, "results.jtl", "\n".join(lines) + "\n"))
+
+    violations = analyzer.evaluate(max_error_rate=0.5, max_p95=500, min_throughput=1000)
+    assert any(v.startswith("GET: error rate 1.00%") for v in violations)
+    assert any(v.startswith("GET: p95 900 ms") for v in violations)
+    assert any(v.startswith(f"{TOTAL_LABEL}: throughput") for v in violations)
+    assert analyzer.evaluate(max_error_rate=5, max_p95=1000) == []
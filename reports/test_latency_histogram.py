@@ -0,0 +1,123 @@
+"""
+Tests for the mergeable latency histograms
+
+Run from the repository root:
+    python -m pytest reports/test_latency_histogram.py
+"""
+import random
+
+import pytest
+
+from jtl_analyzer import JtlAnalyzer
+from latency_histogram import LatencyHistogram, load_histograms, save_histograms
+
+PERCENTS = [1, 10, 50, 75, 90, 95, 99, 99.9, 100]
+
+
+def latencies(count, seed=7):
+    generator = random.Random(seed)
+    return [int(generator.lognormvariate(5, 1.2)) for _ in range(count)]
+
+
+def exact_percentile(ordered, percent):
+    """Nearest-rank percentile, the rank definition the histogram uses"""
+    rank = len(ordered) if percent >= 100 else max(1, int(len(ordered) * percent / 100.0 + 0.5))
+    return ordered[rank - 1]
+
+
+@pytest.mark.parametrize("significant_digits", [2, 3, 4])
+def test_percentiles_within_configured_precision(significant_digits):
+    values = latencies(20_000)
+    histogram = LatencyHistogram(significant_digits=significant_digits)
+    for value in values:
+        histogram.record(value)
+    ordered = sorted(values)
+
+    for percent, value in histogram.percentiles(PERCENTS).items():
+        exact = exact_percentile(ordered, percent)
+        # The bucket's highest equivalent value: never below the exact value, at most one unit of precision above
+        assert exact <= value <= max(exact * (1 + 10 ** -significant_digits), exact + 1), percent
+    assert histogram.percentile(100) == max(values)
+    assert (histogram.total, histogram.min, histogram.max, histogram.sum) == (
+        len(values), min(values), max(values), sum(values))
+
+
+def test_values_below_sub_bucket_range_are_exact():
+    histogram = LatencyHistogram(significant_digits=3)
+    for value in range(1, 1001):
+        histogram.record(value)
+    assert [histogram.percentile(p) for p in (10, 50, 99)] == [100, 500, 990]
+    assert histogram.count_at_or_below(250) == 250
+
+
+def test_values_above_highest_are_clamped():
+    histogram = LatencyHistogram(highest=10_000)
+    histogram.record(50)
+    histogram.record(2_000_000)
+    assert histogram.max == 2_000_000
+    assert histogram.percentile(50) == 50
+    assert 10_000 <= histogram.percentile(100) <= 2_000_000
+
+
+def test_encode_decode_round_trip():
+    histogram = LatencyHistogram(significant_digits=2)
+    for value in latencies(5_000) + [0, 3_600_000]:
+        histogram.record(value)
+
+    decoded = LatencyHistogram.decode(histogram.encode())
+    assert decoded.settings() == histogram.settings()
+    assert decoded.counts == histogram.counts
+    assert (decoded.total, decoded.min, decoded.max, decoded.sum) == (
+        histogram.total, histogram.min, histogram.max, histogram.sum)
+    assert decoded.percentiles(PERCENTS) == histogram.percentiles(PERCENTS)
+
+
+def test_empty_histogram_round_trip():
+    decoded = LatencyHistogram.decode(LatencyHistogram().encode())
+    assert (decoded.total, decoded.min, decoded.max) == (0, None, None)
+    assert decoded.percentile(99) == 0
+
+
+def test_merge_equals_recording_everything():
+    first, second = latencies(3_000, seed=1), latencies(3_000, seed=2)
+    merged, combined = LatencyHistogram(), LatencyHistogram()
+    parts = [LatencyHistogram(), LatencyHistogram()]
+    for part, values in zip(parts, (first, second)):
+        for value in values:
+            part.record(value)
+            combined.record(value)
+    merged.merge(parts[0]).merge(parts[1])
+
+    assert merged.counts == combined.counts
+    assert (merged.total, merged.min, merged.max, merged.sum) == (
+        combined.total, combined.min, combined.max, combined.sum)
+
+
+def test_merge_rejects_different_settings():
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_digits=3).merge(LatencyHistogram(significant_digits=2))
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        LatencyHistogram(significant_digits=6)
+    with pytest.raises(ValueError):
+        LatencyHistogram(lowest=10, highest=15)
+
+
+def test_histogram_file_merges_generators(tmp_path):
+    generators = []
+    for seed in (1, 2):
+        analyzer = JtlAnalyzer()
+        for index, value in enumerate(latencies(1_000, seed)):
+            analyzer.add("GET Users", value, index % 100 != 0, 1_000 + index)
+        path = str(tmp_path / f"gen{seed}.hgrm.json")
+        save_histograms(path, analyzer)
+        generators.append((path, analyzer))
+
+    merged = load_histograms(generators[0][0])
+    load_histograms(generators[1][0], merged)
+    stats = merged.labels["GET Users"]
+    assert (stats.count, stats.errors) == (2_000, 20)
+    expected = generators[0][1].labels["GET Users"].histogram.merge(generators[1][1].labels["GET Users"].histogram)
+    assert stats.histogram.counts == expected.counts
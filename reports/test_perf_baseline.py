@@ -0,0 +1,139 @@
+"""
+Tests for the JMeter performance regression gate
+
+Run from the repository root:
+    python -m pytest reports/test_perf_baseline.py
+"""
+import random
+
+import pytest
+
+from jtl_analyzer import JtlAnalyzer
+from perf_baseline import BaselineStore, RegressionChecker, check_regressions, jtl_fingerprint
+
+LABEL = "GET Users"
+
+
+def run(seed, count=2_000, slowdown=1.0, error_rate=0.01, interval=10):
+    """A run of one label: lognormal latencies around 150 ms, one sample every `interval` ms"""
+    generator = random.Random(seed)
+    analyzer = JtlAnalyzer()
+    for index in range(count):
+        elapsed = int(generator.lognormvariate(5, 0.5) * slowdown)
+        analyzer.add(LABEL, elapsed, generator.random() >= error_rate, 1_000 + index * interval)
+    return analyzer
+
+
+def baseline(*analyzers):
+    """Runs in the shape BaselineStore.baseline_runs returns"""
+    return [(n, f"commit{n}", analyzer.labels) for n, analyzer in enumerate(analyzers)]
+
+
+BASELINE = baseline(run(1, interval=10), run(2, interval=11), run(3, interval=9))
+
+
+def test_unchanged_run_passes():
+    assert RegressionChecker().compare(run(4, interval=10), BASELINE) == []
+
+
+def test_latency_shift_is_flagged():
+    regressions = RegressionChecker().compare(run(4, slowdown=1.3), BASELINE)
+    assert len(regressions) == 1 and regressions[0].startswith(f"{LABEL}: p95")
+
+
+def test_small_latency_shift_is_below_min_change():
+    assert RegressionChecker(min_latency_change=0.10).compare(run(4, slowdown=1.05), BASELINE) == []
+
+
+def test_error_rate_shift_is_flagged():
+    regressions = RegressionChecker().compare(run(4, error_rate=0.05), BASELINE)
+    assert len(regressions) == 1 and regressions[0].startswith(f"{LABEL}: error rate")
+
+
+def test_throughput_drop_is_flagged():
+    regressions = RegressionChecker().compare(run(4, interval=20), BASELINE)
+    assert len(regressions) == 1 and regressions[0].startswith(f"{LABEL}: throughput")
+
+
+def test_throughput_needs_two_baseline_runs():
+    assert RegressionChecker().compare(run(4, interval=20), baseline(run(1))) == []
+
+
+def test_small_samples_are_not_judged():
+    slow = run(4, count=50, slowdown=3, error_rate=0.5, interval=40)
+    assert RegressionChecker(min_samples=100).compare(slow, BASELINE) == []
+    assert len(RegressionChecker(min_samples=10).compare(slow, BASELINE)) == 3
+
+
+def test_labels_without_history_are_skipped():
+    current = run(4)
+    current.add("POST New", 5_000, False, 1_000)
+    assert RegressionChecker().compare(current, BASELINE) == []
+
+
+def test_store_round_trip(tmp_path):
+    store = BaselineStore(str(tmp_path / "baseline.sqlite"))
+    original = run(1)
+    store.record("plan", original, "a", source="s1")
+    store.record("plan", run(2), "b", accepted=False, source="s2")
+
+    [(_, commit_id, labels)] = store.baseline_runs("plan")
+    assert commit_id == "a"
+    assert labels[LABEL].count == original.labels[LABEL].count
+    assert labels[LABEL].histogram.counts == original.labels[LABEL].histogram.counts
+    assert store.baseline_runs("plan", exclude_commit="a") == []
+    assert [accepted for _, _, accepted in store.history("plan")] == [0, 1]
+    store.close()
+
+
+def test_excluding_a_source_keeps_runs_without_one(tmp_path):
+    store = BaselineStore(str(tmp_path / "baseline.sqlite"))
+    store.record("plan", run(1), "a")
+    store.record("plan", run(2), "b", source="s2")
+    assert [commit_id for _, commit_id, _ in store.baseline_runs("plan", exclude_source="s2")] == ["a"]
+    store.close()
+
+
+def test_rechecked_results_are_not_recorded_again(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "baseline.sqlite")
+    current = run(1)
+
+    monkeypatch.setenv("GIT_COMMIT", "first")
+    assert check_regressions(current, "plan", db_path, source="s1") == []
+    # A later pipeline checks the same .jtl: no second row, and no baseline made of itself
+    monkeypatch.setenv("GIT_COMMIT", "second")
+    assert check_regressions(run(1, slowdown=2), "plan", db_path, source="s1") == []
+
+    store = BaselineStore(db_path)
+    assert len(store.history("plan")) == 1
+    store.close()
+
+
+def test_regressed_run_is_not_accepted(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "baseline.sqlite")
+    for n in range(3):
+        monkeypatch.setenv("GIT_COMMIT", f"good{n}")
+        assert check_regressions(run(n), "plan", db_path, source=f"s{n}") == []
+
+    monkeypatch.setenv("GIT_COMMIT", "slow")
+    assert check_regressions(run(9, slowdown=1.5), "plan", db_path, source="slow") != []
+    store = BaselineStore(db_path)
+    assert "slow" not in [commit_id for _, commit_id, _ in store.baseline_runs("plan")]
+    store.close()
+
+
+def test_fingerprint_follows_content(tmp_path):
+    first, copy, other = (tmp_path / name for name in ("a.jtl", "b.jtl", "c.jtl"))
+    first.write_text("timeStamp,elapsed\n1000,5\n")
+    copy.write_text("timeStamp,elapsed\n1000,5\n")
+    other.write_text("timeStamp,elapsed\n1000,6\n")
+    assert jtl_fingerprint(str(first)) == jtl_fingerprint(str(copy)) != jtl_fingerprint(str(other))
+
+
+@pytest.mark.parametrize("size", [10, 3 * 1024 * 1024])
+def test_fingerprint_sees_the_last_samples(tmp_path, size):
+    path = tmp_path / "results.jtl"
+    path.write_bytes(b"x" * size + b"1000,5\n")
+    before = jtl_fingerprint(str(path))
+    path.write_bytes(b"x" * size + b"1000,6\n")
+    assert jtl_fingerprint(str(path)) != before
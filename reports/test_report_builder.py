@@ -0,0 +1,161 @@
+"""
+Tests for the incremental report builder, with a stand-in `allure` command
+
+Run from the repository root:
+    python -m pytest reports/test_report_builder.py
+"""
+import os
+import sys
+import json
+
+import pytest
+
+from report_builder import ReportBuilder
+
+# Writes index.html and extends the trend it finds in the staged history by one
+# point, like `allure generate`; every call is appended to $ALLURE_CALLS
+FAKE_ALLURE = f"""#!{sys.executable}
+import os, sys, json
+_, _, staged, _, out, _ = sys.argv
+with open(os.environ["ALLURE_CALLS"], "a") as f:
+    f.write(staged + "\\n")
+if os.environ.get("ALLURE_FAIL"):
+    sys.exit(1)
+try:
+    with open(os.path.join(staged, "history", "history-trend.json")) as f:
+        trend = json.load(f)
+except OSError:
+    trend = []
+results = sorted(name for name in os.listdir(staged) if name.endswith("-result.json"))
+os.makedirs(os.path.join(out, "history"))
+with open(os.path.join(out, "history", "history-trend.json"), "w") as f:
+    json.dump([results] + trend, f)
+with open(os.path.join(out, "index.html"), "w") as f:
+    f.write("report of " + ",".join(results))
+"""
+
+
+@pytest.fixture
+def allure(tmp_path, monkeypatch):
+    """Put the stand-in `allure` on PATH and return a function counting its calls"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "allure"
+    script.write_text(FAKE_ALLURE)
+    script.chmod(0o755)
+    calls = tmp_path / "allure-calls.txt"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("ALLURE_CALLS", str(calls))
+    return lambda: len(calls.read_text().splitlines()) if calls.exists() else 0
+
+
+@pytest.fixture
+def paths(tmp_path):
+    results = tmp_path / "allure-results"
+    results.mkdir()
+    return {
+        "results_dir": str(results),
+        "report_dir": str(tmp_path / "allure-report"),
+        "junit_dir": str(tmp_path / "junit"),
+        "jtl_path": str(tmp_path / "results.jtl"),
+        "cache_dir": str(tmp_path / "cache"),
+        "index_path": str(tmp_path / "index.sqlite"),
+    }
+
+
+def add_result(paths, name):
+    result = {"uuid": name, "name": name, "fullName": f"tests.{name}", "status": "passed",
+              "start": 1_000, "stop": 2_000}
+    with open(os.path.join(paths["results_dir"], f"{name}-result.json"), "w") as f:
+        json.dump(result, f)
+
+
+def read(paths, *parts):
+    with open(os.path.join(paths["report_dir"], *parts)) as f:
+        return f.read()
+
+
+def trend(paths):
+    return json.loads(read(paths, "history", "history-trend.json"))
+
+
+def test_unchanged_results_skip_allure(allure, paths):
+    add_result(paths, "test_a")
+    assert ReportBuilder(**paths).build()
+    assert ReportBuilder(**paths).build()
+    assert allure() == 1
+
+    add_result(paths, "test_b")
+    assert ReportBuilder(**paths).build()
+    assert allure() == 2
+    assert read(paths, "index.html") == "report of test_a-result.json,test_b-result.json"
+    assert json.loads(read(paths, "summary.json"))["ui"]["tests"] == 2
+
+
+def test_force_runs_allure_anyway(allure, paths):
+    add_result(paths, "test_a")
+    ReportBuilder(**paths).build()
+    ReportBuilder(**paths).build(force=True)
+    assert allure() == 2
+
+
+def test_staged_files_are_stored_once_per_content(paths):
+    add_result(paths, "test_a")
+    builder = ReportBuilder(**paths)
+    first = builder.stage()
+    again = builder.stage()
+    assert (first["stored"], again["reused"], again["stored"]) == (1, 1, 0)
+    assert again["fingerprint"] == first["fingerprint"]
+
+
+def test_failed_generation_keeps_the_previous_report(allure, paths, monkeypatch):
+    add_result(paths, "test_a")
+    ReportBuilder(**paths).build()
+
+    add_result(paths, "test_b")
+    monkeypatch.setenv("ALLURE_FAIL", "1")
+    assert not ReportBuilder(**paths).build()
+    assert read(paths, "index.html") == "report of test_a-result.json"
+
+    # The results are still new to the builder, so the next build retries
+    monkeypatch.delenv("ALLURE_FAIL")
+    assert ReportBuilder(**paths).build()
+    assert read(paths, "index.html") == "report of test_a-result.json,test_b-result.json"
+
+
+def test_report_is_swapped_in_whole(allure, paths):
+    os.makedirs(paths["report_dir"])
+    with open(os.path.join(paths["report_dir"], "stale.html"), "w") as f:
+        f.write("from an older report")
+    add_result(paths, "test_a")
+    ReportBuilder(**paths).build()
+
+    assert sorted(os.listdir(paths["report_dir"])) == ["history", "index.html", "summary.html", "summary.json"]
+    leftovers = [name for name in os.listdir(os.path.dirname(paths["report_dir"]))
+                 if name.startswith("allure-report.")]
+    assert leftovers == []
+
+
+def test_intermediate_builds_add_one_trend_point(allure, paths):
+    add_result(paths, "test_a")
+    ReportBuilder(**paths).build()
+    assert len(trend(paths)) == 1
+
+    # Watch mode during the next pipeline run: rebuilt on every new result
+    watcher = ReportBuilder(**paths)
+    for name in ("test_b", "test_c"):
+        add_result(paths, name)
+        watcher.build(final=False)
+        assert len(trend(paths)) == 2
+
+    # A restarted watcher still starts from the last final report's history
+    add_result(paths, "test_d")
+    ReportBuilder(**paths).build(final=False)
+    assert len(trend(paths)) == 2
+
+    # The final build of the run adds the run's single point
+    ReportBuilder(**paths).build(force=True)
+    assert len(trend(paths)) == 2
+    add_result(paths, "test_e")
+    ReportBuilder(**paths).build()
+    assert len(trend(paths)) == 3
@@ -33,8 +33,18 @@ run_test() {
 # Track overall status
 OVERALL_STATUS=0
 
+# Parallel Selenium execution: set PARALLEL_WORKERS to a number of browser slots or "auto"
+SELENIUM_PARALLEL_ARGS=""
+if [ -n "$PARALLEL_WORKERS" ]; then
+    SELENIUM_PARALLEL_ARGS="-n $PARALLEL_WORKERS --dist load"
+fi
+
+# Build the Allure report while the tests run; the final build below only adds what is left
+(cd reports && exec python report_builder.py watch --interval 15 > /dev/null 2>&1) &
+REPORT_WATCH_PID=$!
+
 # Run Selenium tests
-run_test "Selenium UI" "cd selenium-tests && python -m pytest tests/ -v --alluredir=../reports/allure-results"
+run_test "Selenium UI" "cd selenium-tests && python -m pytest tests/ -v $SELENIUM_PARALLEL_ARGS --alluredir=../reports/allure-results"
 SELENIUM_STATUS=$?
 OVERALL_STATUS=$((OVERALL_STATUS + SELENIUM_STATUS))
 
@@ -49,7 +59,9 @@ OVERALL_STATUS=$((OVERALL_STATUS + POSTMAN_STATUS))
 # JMETER_STATUS=$?
 # OVERALL_STATUS=$((OVERALL_STATUS + JMETER_STATUS))
 
-# Generate reports
+# Generate reports; the watcher finishes a build in progress before it exits
+kill $REPORT_WATCH_PID 2>/dev/null
+wait $REPORT_WATCH_PID 2>/dev/null
 echo -e "${YELLOW}Generating test reports...${NC}"
 cd reports && python generate_reports.py
 if [ $? -eq 0 ]; then
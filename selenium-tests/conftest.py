@@ -2,16 +2,28 @@
 Global pytest fixtures for Selenium tests
 """
 import os
+import logging
 import pytest
 import allure
-from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
+import requests
+from selenium.common.exceptions import WebDriverException
 
 from utils.config import Config
+from utils.driver_pool import DriverPool
+from utils.grid_client import GridClient
+from utils.state_seeder import StateSeeder
+from utils.session_cache import SessionCache
+from utils.network_profile import NetworkProfile
+from utils.durations import DurationStore, DurationRecorder
+from utils.action_timings import ActionTimings
+from utils.screenshot_store import ScreenshotStore
+from utils.artifact_writer import ArtifactWriter
+
+logger = logging.getLogger(__name__)
+
+DURATION_STORE_KEY = pytest.StashKey[DurationStore]()
+SCREENSHOT_STORE_KEY = pytest.StashKey[ScreenshotStore]()
+ARTIFACT_WRITER_KEY = pytest.StashKey[ArtifactWriter]()
 
 
 def pytest_addoption(parser):
@@ -25,6 +37,161 @@ def pytest_addoption(parser):
     parser.addoption(
         "--base-url", action="store", default=Config.BASE_URL, help="Base URL for the application"
     )
+    parser.addoption(
+        "--isolation", action="store", default=Config.ISOLATION, choices=["pooled", "fresh"],
+        help="Reuse warm browsers between tests (pooled) or launch one per test (fresh)"
+    )
+    parser.addoption(
+        "--driver-backend", action="store", default=Config.DRIVER_BACKEND, choices=["local", "remote"],
+        help="Start browsers locally or on the Selenium Grid at --grid-url"
+    )
+    parser.addoption(
+        "--grid-url", action="store", default=Config.GRID_URL, help="Selenium Grid hub URL"
+    )
+    parser.addoption(
+        "--block-profile", action="store", default=Config.BLOCK_PROFILE, choices=list(NetworkProfile.PROFILES),
+        help="Resources browsers do not load: none, lean (images, fonts, media) or strict (lean + third-party hosts)"
+    )
+    parser.addoption(
+        "--page-load-strategy", action="store", default=Config.PAGE_LOAD_STRATEGY,
+        choices=["normal", "eager", "none"], help="When driver.get returns: all resources, DOM ready, or immediately"
+    )
+    parser.addoption(
+        "--order", action="store", default=Config.TEST_ORDER, choices=["auto", "longest-first", "fail-fast", "none"],
+        help="Test order from the recorded history: auto (longest first in parallel runs), longest-first, "
+             "fail-fast (recently failed and flaky tests first) or none (collection order)"
+    )
+    parser.addoption(
+        "--shard-count", action="store", type=int, default=Config.SHARD_COUNT,
+        help="Split the suite into this many shards (one per CI agent)"
+    )
+    parser.addoption(
+        "--shard-index", action="store", type=int, default=Config.SHARD_INDEX,
+        help="Shard to run, from 0 to --shard-count - 1"
+    )
+    parser.addoption(
+        "--shard-history", action="store", default=Config.SHARD_HISTORY,
+        help="History file shared by all agents; balances shards by recorded duration (default: split by node id)"
+    )
+    parser.addoption(
+        "--slowest-actions", action="store", type=int, default=10,
+        help="Page actions listed in the terminal summary, slowest first (0 = none)"
+    )
+    parser.addoption(
+        "--metrics-port", action="store", type=int, default=Config.METRICS_PORT,
+        help="Serve live Prometheus metrics on this port (0 = off); xdist worker N uses port + 1 + N"
+    )
+
+
+def is_xdist_worker(config):
+    """Check whether this process is a pytest-xdist worker rather than the controller"""
+    return hasattr(config, "workerinput")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    """
+    Load the test history recorded by earlier runs and record this run's on the controller
+    Time page actions per test, summarized for the suite on the controller
+    Start the background artifact writer and open the failure screenshot store
+    Start the live metrics endpoint when --metrics-port is set
+    """
+    # The artifact budget is per run, so xdist workers share it; runs after allure-pytest set up its listener
+    workers = config.workerinput["workercount"] if is_xdist_worker(config) else 1
+    allure_dir = getattr(config.option, "allure_report_dir", None)
+    writer = ArtifactWriter(
+        Config.ARTIFACT_QUEUE_SIZE,
+        Config.ARTIFACT_MAX_MB * 1024 * 1024 // workers if Config.ARTIFACT_MAX_MB else None,
+        allure_listener=config.pluginmanager.get_plugin("allure_listener"),
+        allure_dir=os.path.abspath(allure_dir) if allure_dir else None
+    )
+    config.stash[ARTIFACT_WRITER_KEY] = writer
+    config.stash[SCREENSHOT_STORE_KEY] = ScreenshotStore(Config.SCREENSHOT_DIR, writer, Config.SCREENSHOT_FORMAT)
+    
+    store = DurationStore(Config.DURATIONS_DB, config.getoption("--browser"), config.getoption("--base-url"))
+    config.stash[DURATION_STORE_KEY] = store
+    if not is_xdist_worker(config):
+        config.pluginmanager.register(DurationRecorder(store), "duration-recorder")
+    
+    config.pluginmanager.register(
+        ActionTimings(Config.ACTION_TIMINGS_FILE, slowest=config.getoption("--slowest-actions"),
+                      collect_suite=not is_xdist_worker(config)),
+        "action-timings"
+    )
+    
+    port = config.getoption("--metrics-port")
+    if port:
+        if is_xdist_worker(config):
+            # Worker ids are "gw0", "gw1", ...
+            port += 1 + int(config.workerinput["workerid"][2:])
+        # Imported only when needed: the exporter comes from reports/ (pytest.ini pythonpath)
+        from utils.live_metrics import SessionMetrics
+        config.pluginmanager.register(SessionMetrics(port, count_tests=not is_xdist_worker(config)), "live-metrics")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_sessionfinish(session):
+    """Wait until every queued artifact is on disk"""
+    writer = session.config.stash.get(ARTIFACT_WRITER_KEY, None)
+    if writer:
+        writer.close()
+
+
+@pytest.fixture(scope="session")
+def screenshot_store(request):
+    """Failure screenshots, captured once and stored once per content"""
+    return request.config.stash[SCREENSHOT_STORE_KEY]
+
+
+def pytest_xdist_auto_num_workers(config):
+    """Number of workers for "-n auto": PARALLEL_WORKERS, else one per Grid slot on the remote backend"""
+    if Config.PARALLEL_WORKERS.isdigit():
+        return int(Config.PARALLEL_WORKERS)
+    if config.getoption("--driver-backend") == "remote":
+        grid = GridClient.for_url(config.getoption("--grid-url"))
+        # On a cold "docker-compose up" the hub may still be starting
+        if not grid.wait_until_ready():
+            logger.warning("Selenium Grid at %s is not ready, using xdist's default worker count", grid.hub_url)
+            return None
+        try:
+            _, total = grid.slots(config.getoption("--browser"))
+        except (requests.RequestException, ValueError, KeyError) as e:
+            logger.warning("Could not read Grid slots from %s, using xdist's default worker count: %s",
+                           grid.hub_url, e)
+            return None
+        return total or None
+    return None
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Keep this agent's shard of the suite, then order the tests from their history
+    In parallel runs the slowest tests go first by default, so no worker is left with a long tail
+    """
+    store = config.stash[DURATION_STORE_KEY]
+    count = config.getoption("--shard-count")
+    if count > 1:
+        index = config.getoption("--shard-index")
+        # A local history differs between agents, and so would a split balanced on it
+        shared = config.getoption("--shard-history")
+        if shared:
+            history = DurationStore(shared, config.getoption("--browser"), config.getoption("--base-url"))
+            items[:], deselected, expected = history.shard(items, count, index)
+            method = f"balanced on history {history.fingerprint()}"
+        else:
+            items[:], deselected, expected = store.shard(items, count, index, balanced=False)
+            method = "split by node id"
+        config.hook.pytest_deselected(items=deselected)
+        reporter = config.pluginmanager.get_plugin("terminalreporter")
+        if reporter and not is_xdist_worker(config):
+            reporter.write_line(f"shard {index + 1}/{count} ({method}): {len(items)} tests, about {expected:.0f}s")
+    
+    order = config.getoption("--order")
+    if order == "fail-fast":
+        store.sort_fail_fast(items)
+    elif order == "longest-first" or (
+            order == "auto" and (is_xdist_worker(config) or config.getoption("numprocesses", None))):
+        store.sort_longest_first(items)
 
 
 @pytest.fixture(scope="session")
@@ -33,45 +200,87 @@ def base_url(request):
     return request.config.getoption("--base-url")
 
 
+@pytest.fixture(scope="session")
+def network_profile(request):
+    """Resources every browser in the session blocks"""
+    return NetworkProfile(request.config.getoption("--block-profile"))
+
+
+@pytest.fixture(scope="session")
+def driver_pool(request, network_profile):
+    """
+    Keep warm browsers for the whole session (one pool per xdist worker)
+    Quits every pooled browser at the end of the session
+    """
+    pool = DriverPool(
+        request.config.getoption("--browser"),
+        headless=request.config.getoption("--headless"),
+        backend=request.config.getoption("--driver-backend"),
+        grid_url=request.config.getoption("--grid-url"),
+        network_profile=network_profile,
+        page_load_strategy=request.config.getoption("--page-load-strategy")
+    )
+    yield pool
+    pool.close()
+
+
+def use_fresh_browser(request):
+    """Check whether the test opted out of browser reuse"""
+    return (request.config.getoption("--isolation") == "fresh"
+            or request.node.get_closest_marker("isolated") is not None)
+
+
 @pytest.fixture(scope="function")
-def driver(request):
+def driver(request, driver_pool, network_profile):
     """
-    Create and configure WebDriver instance
-    Returns the WebDriver instance
-    Quits the WebDriver instance after the test
+    Provide a clean WebDriver instance
+    Returns a pooled browser with cookies, storage and tabs cleared,
+    or a brand new browser in "fresh" isolation mode
+    Hands the browser back to the pool after the test
     """
-    browser_name = request.config.getoption("--browser").lower()
-    headless = request.config.getoption("--headless")
-    
-    # Setup WebDriver based on browser choice
-    if browser_name == "chrome":
-        options = webdriver.ChromeOptions()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--window-size=1920,1080")
-        driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-    
-    elif browser_name == "firefox":
-        options = webdriver.FirefoxOptions()
-        if headless:
-            options.add_argument("--headless")
-        driver = webdriver.Firefox(service=FirefoxService(GeckoDriverManager().install()), options=options)
-    
-    else:
-        raise ValueError(f"Unsupported browser: {browser_name}")
-    
-    # Set implicit wait time
-    driver.implicitly_wait(Config.IMPLICIT_WAIT)
-    driver.maximize_window()
+    driver = driver_pool.acquire(fresh=use_fresh_browser(request))
+    # Discard traffic from earlier tests and the pool reset
+    network_profile.collect(driver)
     
     # Return the driver instance
     yield driver
     
-    # Quit the driver after test
-    driver.quit()
+    # Record what this test loaded and what the block profile kept out
+    stats = network_profile.collect(driver)
+    if stats:
+        request.node.user_properties.append(("network", stats))
+    
+    # Reset and return the driver after test
+    driver_pool.release(driver)
+
+
+@pytest.fixture(scope="session")
+def state_seeder():
+    """Create users and sessions over HTTP instead of through the UI"""
+    return StateSeeder()
+
+
+@pytest.fixture(scope="session")
+def session_cache():
+    """Logged-in session cookies shared by all tests and xdist workers"""
+    return SessionCache()
+
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, state_seeder, session_cache):
+    """
+    Provide a browser already logged in as Config.DEFAULT_USERNAME
+    Reuses a cached session cookie when the shop still accepts it, otherwise logs in over HTTP
+    A session the shop has ended since it was last verified is dropped and replaced once
+    """
+    cookies = session_cache.get_cookies(state_seeder, Config.DEFAULT_USERNAME, Config.DEFAULT_PASSWORD)
+    state_seeder.inject_cookies(driver, cookies)
+    if not state_seeder.is_logged_in(driver):
+        logger.info("Injected session for %s is logged out, logging in again", Config.DEFAULT_USERNAME)
+        session_cache.invalidate(state_seeder.shop_url, Config.DEFAULT_USERNAME)
+        cookies = session_cache.get_cookies(state_seeder, Config.DEFAULT_USERNAME, Config.DEFAULT_PASSWORD)
+        state_seeder.inject_cookies(driver, cookies)
+    return driver
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -83,6 +292,9 @@ def pytest_runtest_makereport(item, call):
     outcome = yield
     report = outcome.get_result()
     
+    # Expose the phase result to fixtures (e.g. request.node.rep_call in teardown)
+    setattr(item, f"rep_{report.when}", report)
+    
     # Only capture screenshot for selenium tests that have the driver fixture
     if "driver" not in item.funcargs:
         return
@@ -90,24 +302,43 @@ def pytest_runtest_makereport(item, call):
     # Only capture screenshot on test failure during call phase
     if report.when == "call" and report.failed:
         driver = item.funcargs["driver"]
-        take_screenshot(driver, item.name)
+        item.config.stash[SCREENSHOT_STORE_KEY].capture(driver, item.name)
+        attach_page_state(driver, item.config.stash[ARTIFACT_WRITER_KEY])
 
 
-def take_screenshot(driver, test_name):
-    """Capture and attach screenshot to Allure report"""
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    screenshot_name = f"{test_name}_{timestamp}.png"
-    screenshot_path = os.path.join(Config.SCREENSHOT_DIR, screenshot_name)
-    
-    # Ensure directory exists
-    os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-    
-    # Take screenshot
-    driver.save_screenshot(screenshot_path)
+def attach_page_state(driver, writer):
+    """Attach the page source and the browser console log; written in the background"""
+    try:
+        writer.attach(driver.page_source, "page source", allure.attachment_type.HTML)
+    except WebDriverException as e:
+        logger.warning("Could not read the page source: %s", e.msg)
+    try:
+        # Only Chromium-based browsers expose the console log
+        entries = driver.get_log("browser")
+    except (AttributeError, WebDriverException):
+        return
+    if entries:
+        log = "\n".join(f"{entry['timestamp']} {entry['level']} {entry['message']}" for entry in entries)
+        writer.attach(log, "browser log", allure.attachment_type.TEXT)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Summarize the traffic recorded by the driver fixture when a block profile is active"""
+    totals = {"tests": 0, "requests": 0, "blocked": 0, "bytes": 0}
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            if getattr(report, "when", None) != "teardown":
+                continue
+            for name, stats in report.user_properties:
+                if name == "network":
+                    totals["tests"] += 1
+                    for key in ("requests", "blocked", "bytes"):
+                        totals[key] += stats[key]
     
-    # Attach to Allure report
-    allure.attach.file(
-        screenshot_path,
-        name=screenshot_name,
-        attachment_type=allure.attachment_type.PNG
-    )
+    if totals["tests"]:
+        terminalreporter.write_sep("-", f"network ({config.getoption('--block-profile')} profile)")
+        terminalreporter.write_line(
+            f"{totals['blocked']} of {totals['requests']} requests blocked, "
+            f"{totals['bytes'] / 1024 / 1024:.1f} MiB transferred across {totals['tests']} tests"
+        )
+
@@ -1,63 +1,336 @@
-from selenium.webdriver.support.ui import WebDriverWait
+import time
+import inspect
+from contextlib import contextmanager
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+from ..utils.config import Config
+from ..utils.instrumentation import timed_action, record_wait
+from .dom_snapshot import DomSnapshot
+
+
+# Reads properties of all elements matching a locator in a single WebDriver round trip.
+# arguments: locator strategy, locator value, list of property names
+EXTRACT_SCRIPT = """
+var by = arguments[0], value = arguments[1], properties = arguments[2];
+var nodes = [];
+function byXPath(expression) {
+    var result = document.evaluate(expression, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+}
+switch (by) {
+    case "css selector": nodes = Array.prototype.slice.call(document.querySelectorAll(value)); break;
+    case "id": nodes = Array.prototype.slice.call(document.querySelectorAll("#" + CSS.escape(value))); break;
+    case "class name": nodes = Array.prototype.slice.call(document.getElementsByClassName(value)); break;
+    case "name": nodes = Array.prototype.slice.call(document.getElementsByName(value)); break;
+    case "tag name": nodes = Array.prototype.slice.call(document.getElementsByTagName(value)); break;
+    case "xpath": byXPath(value); break;
+    case "link text":
+    case "partial link text":
+        nodes = Array.prototype.filter.call(document.getElementsByTagName("a"), function (a) {
+            var text = a.innerText.trim();
+            return by === "link text" ? text === value : text.indexOf(value) !== -1;
+        });
+        break;
+    default: throw new Error("Unsupported locator strategy: " + by);
+}
+return nodes.map(function (el) {
+    var style = window.getComputedStyle(el);
+    var visible = !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length)
+        && style.visibility !== "hidden" && style.display !== "none";
+    var row = {};
+    properties.forEach(function (name) {
+        if (name === "text") {
+            row.text = visible ? el.innerText.trim() : "";
+        } else if (name === "visible") {
+            row.visible = visible;
+        } else {
+            // Same precedence as WebElement.get_attribute: live property first, then attribute
+            var property = el[name];
+            row[name] = (property !== undefined && property !== null && typeof property !== "object"
+                && typeof property !== "function") ? property : el.getAttribute(name);
+        }
+    });
+    return row;
+});
+"""
+
+
+class Wait:
+    """
+    Explicit wait engine used by all page objects
+
+    Polls quickly at first and backs off towards max_poll, so conditions that are
+    already true return in milliseconds while long waits do not hammer the browser.
+    Relies on the driver's implicit wait being 0 (see Config.IMPLICIT_WAIT); otherwise
+    every failed lookup inside a poll blocks for the implicit timeout.
+    """
+    
+    def __init__(self, driver, timeout=None, poll=None, backoff=None, max_poll=None,
+                 ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)):
+        """
+        Args:
+            driver (WebDriver): The WebDriver instance
+            timeout (float): Default timeout in seconds for each call
+            poll (float): Delay before the first retry in seconds
+            backoff (float): Factor applied to the delay after each retry
+            max_poll (float): Upper bound for the delay between retries
+            ignored_exceptions (tuple): Exceptions treated as "condition not met yet"
+        """
+        self.driver = driver
+        self.timeout = Config.EXPLICIT_WAIT if timeout is None else timeout
+        self.poll = poll or Config.POLL_INTERVAL
+        self.backoff = backoff or Config.POLL_BACKOFF
+        self.max_poll = max_poll or Config.MAX_POLL_INTERVAL
+        self.ignored_exceptions = ignored_exceptions
+    
+    def until(self, condition, timeout=None, message=""):
+        """
+        Wait until condition(driver) returns a truthy value and return it
+
+        Args:
+            condition (callable): Called with the driver, e.g. an expected_conditions object
+            timeout (float): Budget for this call only, overrides the default timeout
+            message (str): Message for the TimeoutException
+
+        Raises:
+            TimeoutException: If the condition is still falsy when the budget runs out
+        """
+        return self._poll(condition, True, timeout, message)
+    
+    def until_not(self, condition, timeout=None, message=""):
+        """Wait until condition(driver) returns a falsy value"""
+        return self._poll(condition, False, timeout, message)
+    
+    def _poll(self, condition, expected, timeout, message):
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        interval = self.poll
+        retries = 0
+        try:
+            while True:
+                try:
+                    value = condition(self.driver)
+                    if bool(value) == expected:
+                        return value if expected else True
+                except self.ignored_exceptions:
+                    if not expected:
+                        return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutException(message)
+                time.sleep(min(interval, remaining))
+                interval = min(interval * self.backoff, self.max_poll)
+                retries += 1
+        finally:
+            record_wait(time.monotonic() - started, retries)
 
 
 class BasePage:
-    """Base page class that all page objects inherit from"""
+    """
+    Base page class that all page objects inherit from
+    
+    Every public method of a page object is timed as a page action (see
+    utils/instrumentation.py): wall time, time spent in explicit waits, wait
+    retries and WebDriver commands, reported per test by utils/action_timings.py.
+    """
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, attribute in list(vars(cls).items()):
+            # Plain functions only: staticmethods, classmethods and properties keep their binding
+            if not name.startswith("_") and inspect.isfunction(attribute) and not getattr(attribute, "timed", False):
+                setattr(cls, name, timed_action(attribute))
     
     def __init__(self, driver):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        self.wait = Wait(driver)
         self.actions = ActionChains(driver)
+        self._snapshot_mode = False
+        self._snapshot = None
+    
+    @contextmanager
+    def snapshot(self):
+        """
+        Answer read-only queries from a locally parsed copy of the DOM
+        
+        Inside the block, get_text, get_texts, extract, count_elements and
+        is_element_present parse page_source once and reuse it instead of
+        querying the browser. Clicks, typing and navigation discard the copy,
+        and the next read captures a new one.
+        
+        Usage:
+            with product_page.snapshot():
+                name = product_page.get_product_name()
+                price = product_page.get_product_price()
+        """
+        self._snapshot_mode = True
+        try:
+            yield self
+        finally:
+            self._snapshot_mode = False
+            self._snapshot = None
     
-    def find_element(self, locator):
+    def invalidate_snapshot(self):
+        """Drop the DOM snapshot after anything that may change the page"""
+        self._snapshot = None
+    
+    def _query_snapshot(self, query, timeout=None):
+        """Run a query against the snapshot, re-capturing it while the result is still empty"""
+        def attempt(driver):
+            if self._snapshot is None:
+                self._snapshot = DomSnapshot.capture(driver)
+            result = query(self._snapshot)
+            if not result:
+                # The page may still be rendering; take a fresh copy on the next poll
+                self._snapshot = None
+            return result
+        
+        return self.wait.until(attempt, timeout)
+    
+    @timed_action
+    def find_element(self, locator, timeout=None):
         """Find an element with explicit wait"""
-        return self.wait.until(EC.presence_of_element_located(locator))
+        # Callers get a live element to interact with, so the page may change
+        self.invalidate_snapshot()
+        return self.wait.until(EC.presence_of_element_located(locator), timeout)
     
-    def find_elements(self, locator):
+    @timed_action
+    def find_elements(self, locator, timeout=None):
         """Find elements with explicit wait"""
-        return self.wait.until(EC.presence_of_all_elements_located(locator))
+        self.invalidate_snapshot()
+        return self.wait.until(EC.presence_of_all_elements_located(locator), timeout)
     
-    def click_element(self, locator):
+    @timed_action
+    def click_element(self, locator, timeout=None):
         """Click on an element with explicit wait"""
-        element = self.wait.until(EC.element_to_be_clickable(locator))
+        element = self.wait.until(EC.element_to_be_clickable(locator), timeout)
+        self.invalidate_snapshot()
         element.click()
         return element
     
-    def input_text(self, locator, text):
+    @timed_action
+    def input_text(self, locator, text, timeout=None):
         """Input text into an element with explicit wait"""
-        element = self.wait.until(EC.visibility_of_element_located(locator))
+        element = self.wait.until(EC.visibility_of_element_located(locator), timeout)
+        self.invalidate_snapshot()
         element.clear()
         element.send_keys(text)
         return element
     
-    def get_text(self, locator):
+    @timed_action
+    def get_text(self, locator, timeout=None):
         """Get text from an element with explicit wait"""
-        element = self.wait.until(EC.visibility_of_element_located(locator))
+        if self._snapshot_mode:
+            rows = self._query_snapshot(
+                lambda dom: [row for row in dom.extract(locator, ("text", "visible")) if row["visible"]], timeout
+            )
+            return rows[0]["text"]
+        element = self.wait.until(EC.visibility_of_element_located(locator), timeout)
         return element.text
     
-    def is_element_visible(self, locator, timeout=10):
-        """Check if element is visible"""
+    @timed_action
+    def extract(self, locator, properties=("text",), timeout=None):
+        """
+        Read properties of every element matching a locator in one round trip
+        
+        Waits until at least one element matches, like find_elements.
+        
+        Args:
+            locator (tuple): (By strategy, value)
+            properties (iterable): "text" (visible text), "visible", or any attribute/property name
+            timeout (float): Budget for this call, overrides the default timeout
+        
+        Returns:
+            list: One dict per element, keyed by property name
+        """
+        by, value = locator
+        properties = list(properties)
+        if self._snapshot_mode:
+            return self._query_snapshot(lambda dom: dom.extract(locator, properties), timeout)
+        return self.wait.until(
+            lambda driver: driver.execute_script(EXTRACT_SCRIPT, by, value, properties), timeout
+        )
+    
+    @timed_action
+    def get_texts(self, locator, timeout=None):
+        """Get the visible text of every element matching a locator in one round trip"""
+        return [row["text"] for row in self.extract(locator, ("text",), timeout)]
+    
+    @timed_action
+    def is_element_visible(self, locator, timeout=None):
+        """
+        Check if element is visible, waiting up to the timeout (Config.EXPLICIT_WAIT by default)
+
+        A miss costs the whole timeout: to check that something is not shown use
+        absent(), and to tell apart outcomes of an action use wait_for_any().
+        """
         try:
-            WebDriverWait(self.driver, timeout).until(EC.visibility_of_element_located(locator))
+            self.wait.until(EC.visibility_of_element_located(locator), timeout)
             return True
         except TimeoutException:
             return False
     
-    def is_element_present(self, locator, timeout=10):
-        """Check if element is present in the DOM"""
+    @timed_action
+    def count_elements(self, locator, timeout=None):
+        """Count the elements matching a locator, waiting until there is at least one"""
+        if self._snapshot_mode:
+            return len(self._query_snapshot(lambda dom: dom.select(locator), timeout))
+        return len(self.find_elements(locator, timeout))
+    
+    @timed_action
+    def is_element_present(self, locator, timeout=None):
+        """Check if element is present in the DOM, waiting up to the timeout (see is_element_visible)"""
         try:
-            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located(locator))
+            if self._snapshot_mode:
+                self._query_snapshot(lambda dom: dom.select(locator), timeout)
+                return True
+            self.wait.until(EC.presence_of_element_located(locator), timeout)
             return True
         except TimeoutException:
             return False
     
-    def wait_for_element_to_disappear(self, locator, timeout=10):
+    @timed_action
+    def absent(self, locator, timeout=0):
+        """
+        Fast-fail check that no visible element matches the locator
+
+        Returns immediately when nothing matches; with a timeout it keeps polling
+        until matching elements disappear or the budget runs out.
+        """
+        def nothing_visible(driver):
+            return not any(element.is_displayed() for element in driver.find_elements(*locator))
+
+        try:
+            return self.wait.until(nothing_visible, timeout)
+        except TimeoutException:
+            return False
+    
+    @timed_action
+    def wait_for_any(self, *locators, timeout=None):
+        """
+        Wait until one of several elements is visible
+
+        Returns:
+            tuple: The first locator with a visible element, or None on timeout
+        """
+        def first_visible(driver):
+            for locator in locators:
+                if any(element.is_displayed() for element in driver.find_elements(*locator)):
+                    return locator
+            return None
+
+        try:
+            return self.wait.until(first_visible, timeout)
+        except TimeoutException:
+            return None
+    
+    @timed_action
+    def wait_for_element_to_disappear(self, locator, timeout=None):
         """Wait for an element to disappear"""
         try:
-            WebDriverWait(self.driver, timeout).until_not(EC.presence_of_element_located(locator))
+            self.wait.until_not(EC.presence_of_element_located(locator), timeout)
             return True
         except TimeoutException:
             return False
@@ -70,10 +343,14 @@ class BasePage:
         """Get the URL of the current page"""
         return self.driver.current_url
     
+    @timed_action
     def refresh_page(self):
         """Refresh the current page"""
+        self.invalidate_snapshot()
         self.driver.refresh()
     
+    @timed_action
     def navigate_to(self, url):
         """Navigate to a specific URL"""
+        self.invalidate_snapshot()
         self.driver.get(url)
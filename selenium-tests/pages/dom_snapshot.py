@@ -0,0 +1,90 @@
+from functools import lru_cache
+from lxml import html
+from cssselect import HTMLTranslator
+from selenium.webdriver.common.by import By
+
+
+@lru_cache(maxsize=256)
+def locator_to_xpath(by, value):
+    """Translate a Selenium locator into an XPath expression understood by lxml"""
+    if by == By.XPATH:
+        return value
+    if by == By.CSS_SELECTOR:
+        return HTMLTranslator().css_to_xpath(value)
+    if by == By.ID:
+        return f"//*[@id={_xpath_literal(value)}]"
+    if by == By.NAME:
+        return f"//*[@name={_xpath_literal(value)}]"
+    if by == By.CLASS_NAME:
+        return HTMLTranslator().css_to_xpath(f".{value}")
+    if by == By.TAG_NAME:
+        return f"//{value}"
+    if by == By.LINK_TEXT:
+        return f"//a[normalize-space(.)={_xpath_literal(value)}]"
+    if by == By.PARTIAL_LINK_TEXT:
+        return f"//a[contains(normalize-space(.), {_xpath_literal(value)})]"
+    raise ValueError(f"Unsupported locator strategy: {by}")
+
+
+def _xpath_literal(value):
+    """Quote a string for use inside an XPath expression"""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{part}'" for part in parts) + ")"
+
+
+class DomSnapshot:
+    """
+    Read-only copy of the current DOM, parsed locally with lxml
+
+    Answers locator queries without WebDriver round trips. Visibility is
+    approximated from the markup (hidden attribute, inline display:none and
+    non-rendered tags) because computed styles are not part of the snapshot.
+    """
+
+    HIDDEN_TAGS = {"script", "style", "template", "noscript", "head"}
+
+    def __init__(self, source):
+        self.root = html.document_fromstring(source)
+
+    @classmethod
+    def capture(cls, driver):
+        """Serialize the browser's current DOM and parse it"""
+        return cls(driver.page_source)
+
+    def select(self, locator):
+        """Get all elements matching a (By, value) locator"""
+        return self.root.xpath(locator_to_xpath(*locator))
+
+    def extract(self, locator, properties=("text",)):
+        """
+        Read properties of every element matching a locator
+
+        Same contract as BasePage.extract: "text", "visible", or any attribute name.
+        """
+        rows = []
+        for element in self.select(locator):
+            visible = self._is_visible(element)
+            row = {}
+            for name in properties:
+                if name == "text":
+                    row["text"] = " ".join(element.text_content().split()) if visible else ""
+                elif name == "visible":
+                    row["visible"] = visible
+                else:
+                    row[name] = element.get(name)
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def _is_visible(cls, element):
+        while element is not None:
+            style = (element.get("style") or "").replace(" ", "").lower()
+            if (element.tag in cls.HIDDEN_TAGS or element.get("hidden") is not None
+                    or "display:none" in style or "visibility:hidden" in style):
+                return False
+            element = element.getparent()
+        return True
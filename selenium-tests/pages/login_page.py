@@ -13,6 +13,9 @@ class LoginPage(BasePage):
     ERROR_MESSAGE = (By.CSS_SELECTOR, ".alert-danger")
     CREATE_ACCOUNT_EMAIL = (By.ID, "email_create")
     CREATE_ACCOUNT_BUTTON = (By.ID, "SubmitCreate")
+    LOGIN_FORM = (By.ID, "login_form")
+    SIGNED_IN = (By.CLASS_NAME, "logout")
+    REGISTRATION_FORM = (By.ID, "account-creation_form")
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -39,6 +42,18 @@ class LoginPage(BasePage):
         self.click_element(self.LOGIN_BUTTON)
         return self
     
+    def has_error(self):
+        """Check whether a login attempt was rejected; returns as soon as either outcome shows"""
+        return self.wait_for_any(self.ERROR_MESSAGE, self.SIGNED_IN) == self.ERROR_MESSAGE
+    
+    def has_create_account_error(self):
+        """Check whether starting an account was rejected rather than leading to the registration form"""
+        return self.wait_for_any(self.ERROR_MESSAGE, self.REGISTRATION_FORM) == self.ERROR_MESSAGE
+    
+    def is_signed_out(self):
+        """Check that no sign-out link is shown, without waiting for one"""
+        return self.absent(self.SIGNED_IN)
+    
     def get_error_message(self):
         """Get the error message text"""
         return self.get_text(self.ERROR_MESSAGE)
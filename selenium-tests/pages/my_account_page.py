@@ -1,5 +1,7 @@
 from selenium.webdriver.common.by import By
 from .base_page import BasePage
+from ..utils.config import Config
+from ..utils.state_seeder import StateSeeder
 
 
 class MyAccountPage(BasePage):
@@ -12,15 +14,23 @@ class MyAccountPage(BasePage):
     ORDER_HISTORY_LINK = (By.XPATH, "//a[@title='Orders']")
     MY_ADDRESSES_LINK = (By.XPATH, "//a[@title='Addresses']")
     PERSONAL_INFO_LINK = (By.XPATH, "//a[@title='Information']")
+    # Guests asking for My Account are sent to the login form instead
+    LOGIN_FORM = (By.ID, "login_form")
     
     def __init__(self, driver):
         super().__init__(driver)
+        # Same host as the sessions StateSeeder creates, so seeded cookies apply
+        self.url = Config.SHOP_URL.rstrip("/") + StateSeeder.ACCOUNT_PATH
+    
+    def open(self):
+        """Open the My Account page (requires a logged-in session)"""
+        self.driver.get(self.url)
+        return self
     
     def is_user_logged_in(self):
-        """Check if user is logged in by verifying page elements"""
-        return (self.is_element_visible(self.PAGE_HEADING) and 
-                self.get_text(self.PAGE_HEADING) == "MY ACCOUNT" and
-                self.is_element_visible(self.SIGN_OUT_LINK))
+        """Check if user is logged in by verifying page elements; a guest's login form answers at once"""
+        return (self.wait_for_any(self.SIGN_OUT_LINK, self.LOGIN_FORM) == self.SIGN_OUT_LINK and
+                self.get_text(self.PAGE_HEADING) == "MY ACCOUNT")
     
     def get_account_name(self):
         """Get the account name displayed on the page"""
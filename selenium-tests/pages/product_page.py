@@ -1,5 +1,6 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
+from selenium.webdriver.support import expected_conditions as EC
 from .base_page import BasePage
 
 
@@ -52,7 +53,7 @@ class ProductPage(BasePage):
         """Add the product to cart"""
         self.click_element(self.ADD_TO_CART_BUTTON)
         # Wait for the success message to appear
-        self.wait.until(lambda d: self.is_element_visible(self.SUCCESS_MESSAGE))
+        self.wait.until(EC.visibility_of_element_located(self.SUCCESS_MESSAGE))
         return self
     
     def proceed_to_checkout(self):
@@ -37,6 +37,8 @@ class RegistrationPage(BasePage):
     
     # Error Messages
     ERROR_MESSAGE = (By.CSS_SELECTOR, ".alert-danger")
+    # Shown once the account is created and signed in
+    SIGNED_IN = (By.CLASS_NAME, "logout")
     
     def __init__(self, driver):
         super().__init__(driver)
@@ -84,6 +86,10 @@ class RegistrationPage(BasePage):
         from .my_account_page import MyAccountPage
         return MyAccountPage(self.driver)
     
+    def has_error(self):
+        """Check whether the registration was rejected; returns as soon as either outcome shows"""
+        return self.wait_for_any(self.ERROR_MESSAGE, self.SIGNED_IN) == self.ERROR_MESSAGE
+    
     def get_error_message(self):
         """Get error message if registration fails"""
         return self.get_text(self.ERROR_MESSAGE)
@@ -33,18 +33,15 @@ class SearchPage(BasePage):
     
     def get_search_results_count(self):
         """Get the number of search results"""
-        results = self.find_elements(self.SEARCH_RESULTS)
-        return len(results)
+        return self.count_elements(self.SEARCH_RESULTS)
     
     def get_product_names(self):
         """Get a list of product names from search results"""
-        products = self.find_elements(self.PRODUCT_NAME)
-        return [product.text for product in products]
+        return self.get_texts(self.PRODUCT_NAME)
     
     def get_product_prices(self):
         """Get a list of product prices from search results"""
-        prices = self.find_elements(self.PRODUCT_PRICE)
-        return [price.text for price in prices]
+        return self.get_texts(self.PRODUCT_PRICE)
     
     def click_on_product(self, index=0):
         """Click on a product from search results by index"""
@@ -59,7 +56,8 @@ class SearchPage(BasePage):
     
     def has_no_results(self):
         """Check if the search returned no results"""
-        return self.is_element_visible(self.NO_RESULTS_ALERT)
+        # Whichever of the two outcomes renders first answers the question, no timeout on a miss
+        return self.wait_for_any(self.NO_RESULTS_ALERT, self.SEARCH_RESULTS) == self.NO_RESULTS_ALERT
     
     def get_no_results_message(self):
         """Get the no results message"""
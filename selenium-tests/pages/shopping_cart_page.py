@@ -22,19 +22,17 @@ class ShoppingCartPage(BasePage):
     
     def get_cart_items_count(self):
         """Get the number of items in the cart"""
-        items = self.find_elements(self.PRODUCT_ROWS)
-        return len(items)
+        return self.count_elements(self.PRODUCT_ROWS)
     
     def get_product_names(self):
         """Get a list of product names in the cart"""
-        products = self.find_elements(self.PRODUCT_NAME)
-        return [product.text for product in products]
+        return self.get_texts(self.PRODUCT_NAME)
     
     def get_product_prices(self):
         """Get a list of product prices in the cart"""
-        prices = self.find_elements(self.PRODUCT_PRICE)
+        prices = self.get_texts(self.PRODUCT_PRICE)
         # Skip the first element as it's the header
-        return [price.text for price in prices[1:]]
+        return prices[1:]
     
     def get_total_price(self):
         """Get the total price of the cart"""
@@ -71,7 +69,8 @@ class ShoppingCartPage(BasePage):
     
     def is_cart_empty(self):
         """Check if the cart is empty"""
-        return self.is_element_visible(self.EMPTY_CART_MESSAGE)
+        # The page shows either the empty-cart warning or product rows, whichever comes first decides
+        return self.wait_for_any(self.EMPTY_CART_MESSAGE, self.PRODUCT_ROWS) == self.EMPTY_CART_MESSAGE
     
     def get_empty_cart_message(self):
         """Get the empty cart message"""
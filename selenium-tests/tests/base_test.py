@@ -1,8 +1,4 @@
-import os
 import pytest
-import allure
-from datetime import datetime
-from ..utils.driver_factory import DriverFactory
 from ..utils.config import Config
 
 
@@ -10,48 +6,42 @@ class BaseTest:
     """Base class for all test classes"""
     
     @pytest.fixture(autouse=True)
-    def setup_teardown(self, request):
+    def setup_teardown(self, driver, state_seeder, session_cache, screenshot_store):
         """Setup and teardown for each test"""
-        # Create the driver
-        self.driver = DriverFactory.get_driver(Config.BROWSER, Config.HEADLESS)
-        self.driver.maximize_window()
-        self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
+        # Borrow a clean browser from the session pool (see conftest.driver)
+        self.driver = driver
+        self.state_seeder = state_seeder
+        self.session_cache = session_cache
+        self.screenshot_store = screenshot_store
         
         # Make driver available to the test
+        # Failure screenshots are captured by conftest.pytest_runtest_makereport
         yield self.driver
+    
+    def login_via_api(self, email=None, password=None, cached=True):
+        """
+        Log the browser in without going through the login page
+        Use this for tests whose subject is not the login screen itself
         
-        # Teardown
-        if request.node.rep_call.failed:
-            self.take_screenshot(request.node.name)
-        
-        self.driver.quit()
+        Args:
+            email (str): Login email, defaults to Config.DEFAULT_USERNAME
+            password (str): Login password, defaults to Config.DEFAULT_PASSWORD
+            cached (bool): Reuse the session shared with other tests; pass False
+                for tests that end the session, such as logout
+        """
+        email = email or Config.DEFAULT_USERNAME
+        password = password or Config.DEFAULT_PASSWORD
+        if cached:
+            cookies = self.session_cache.get_cookies(self.state_seeder, email, password)
+        else:
+            cookies = self.state_seeder.login(email, password)
+        self.state_seeder.inject_cookies(self.driver, cookies)
     
     def take_screenshot(self, test_name):
-        """Take a screenshot on test failure"""
-        # Create screenshots directory if it doesn't exist
-        os.makedirs(Config.SCREENSHOT_DIR, exist_ok=True)
-        
-        # Generate a unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{test_name}_{timestamp}.png"
-        filepath = os.path.join(Config.SCREENSHOT_DIR, filename)
-        
-        # Take the screenshot
-        self.driver.save_screenshot(filepath)
+        """
+        Capture the browser, attach it to the Allure report and store it
         
-        # Attach the screenshot to the Allure report
-        allure.attach(
-            self.driver.get_screenshot_as_png(),
-            name=test_name,
-            attachment_type=allure.attachment_type.PNG
-        )
-        
-        return filepath
-
-
-# This plugin helps to detect test failures
-@pytest.hookimpl(tryfirst=True, hookwrapper=True)
-def pytest_runtest_makereport(item, call):
-    outcome = yield
-    rep = outcome.get_result()
-    setattr(item, f"rep_{rep.when}", rep)
+        Returns:
+            str: Path of the stored screenshot
+        """
+        return self.screenshot_store.capture(self.driver, test_name)
@@ -1,6 +1,7 @@
 import pytest
 import allure
 from ..pages.login_page import LoginPage
+from ..pages.my_account_page import MyAccountPage
 from ..utils.test_data import TestData
 from .base_test import BaseTest
 
@@ -45,7 +46,7 @@ class TestLogin(BaseTest):
         login_page.attempt_login(email, password)
         
         # Verify error message is displayed
-        assert login_page.is_element_visible(login_page.ERROR_MESSAGE), "Error message not displayed"
+        assert login_page.has_error(), "Error message not displayed"
         
         # Verify we're still on the login page
         assert "authentication" in login_page.get_current_url(), "Not on login page after failed login"
@@ -58,11 +59,10 @@ class TestLogin(BaseTest):
         email = "test.user@example.com"  # Replace with a valid email
         password = "Password123"  # Replace with a valid password
         
-        login_page = LoginPage(self.driver)
-        login_page.open()
-        
-        # Perform login
-        my_account_page = login_page.login(email, password)
+        # Log in over HTTP; the login screen itself is covered by test_successful_login.
+        # Signing out ends the session, so use a private one rather than the shared cache
+        self.login_via_api(email, password, cached=False)
+        my_account_page = MyAccountPage(self.driver).open()
         
         # Verify successful login
         assert my_account_page.is_user_logged_in(), "Login failed"
@@ -72,3 +72,4 @@ class TestLogin(BaseTest):
         
         # Verify we're back on the login page
         assert "authentication" in login_page.get_current_url(), "Not redirected to login page after logout"
+        assert login_page.is_signed_out(), "Sign-out link still shown after logout"
@@ -18,9 +18,10 @@ class TestProduct(BaseTest):
         # Create product page object
         product_page = ProductPage(self.driver)
         
-        # Get product name and price for later verification
-        product_name = product_page.get_product_name()
-        product_price = product_page.get_product_price()
+        # Get product name and price for later verification (one DOM read for both)
+        with product_page.snapshot():
+            product_name = product_page.get_product_name()
+            product_price = product_page.get_product_price()
         
         # Set quantity, size, and color
         product_page.set_quantity(2)
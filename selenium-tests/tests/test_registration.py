@@ -74,7 +74,7 @@ class TestRegistration(BaseTest):
         registration_page.click_element(registration_page.REGISTER_BUTTON)
         
         # Verify error message is displayed
-        assert registration_page.is_element_visible(registration_page.ERROR_MESSAGE), "Error message not displayed"
+        assert registration_page.has_error(), "Error message not displayed"
         
         # Get error message text
         error_message = registration_page.get_error_message()
@@ -94,7 +94,7 @@ class TestRegistration(BaseTest):
         login_page.click_element(login_page.CREATE_ACCOUNT_BUTTON)
         
         # Wait for error message
-        assert login_page.is_element_visible(login_page.ERROR_MESSAGE), "Error message not displayed"
+        assert login_page.has_create_account_error(), "Error message not displayed"
         
         # Get error message text
         error_message = login_page.get_error_message()
@@ -25,12 +25,15 @@ class TestSearch(BaseTest):
         # Perform search
         search_page.search_for_product(search_term)
         
+        # Read results count and names from a single DOM snapshot
+        with search_page.snapshot():
+            results_count = search_page.get_search_results_count()
+            product_names = search_page.get_product_names()
+        
         # Verify search results
-        results_count = search_page.get_search_results_count()
         assert results_count > 0, f"No search results found for '{search_term}'"
         
         # Verify product names contain the search term
-        product_names = search_page.get_product_names()
         for name in product_names:
             assert search_term.lower() in name.lower(), f"Product name '{name}' does not contain search term '{search_term}'"
     
@@ -0,0 +1,152 @@
+import os
+import json
+import pytest
+import allure
+from datetime import datetime
+
+from . import instrumentation
+
+
+class ActionTimings:
+    """
+    pytest plugin breaking each test down into page actions
+
+    For every page-object action it sums wall time, time spent in explicit waits,
+    wait retries and WebDriver commands. Each test gets a "page actions" JSON
+    attachment in Allure; the controller (or a plain run) collects all tests into
+    one summary file and prints the slowest actions of the suite.
+
+    Nested actions (LoginPage.login calling input_text) are listed on their own
+    and inside their caller; test totals only count the outermost ones.
+    """
+
+    def __init__(self, path, slowest=10, collect_suite=True):
+        """
+        Args:
+            path (str): JSON summary to write at the end of the session
+            slowest (int): Actions listed in the terminal summary (0 = none)
+            collect_suite (bool): Build the suite summary; off on xdist workers,
+                whose per-test results reach the controller through the reports
+        """
+        self.path = path
+        self.slowest = slowest
+        self.collect_suite = collect_suite
+        self._actions = {}
+        self._totals = [0, 0.0, 0.0, 0, 0]
+        self._tests = {}
+        self._suite = {}
+
+    def observe(self, event, seconds, fields):
+        """Observer for utils.instrumentation events"""
+        if event != "page_action":
+            return
+        key = (fields["page"], fields["action"])
+        stats = self._actions.get(key)
+        if stats is None:
+            # calls, wall, wait, commands, retries, slowest call
+            stats = self._actions[key] = [0, 0.0, 0.0, 0, 0, 0.0]
+        stats[0] += 1
+        stats[1] += seconds
+        stats[2] += fields["wait"]
+        stats[3] += fields["commands"]
+        stats[4] += fields["retries"]
+        stats[5] = max(stats[5], seconds)
+        if fields["depth"] == 0:
+            totals = self._totals
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += fields["wait"]
+            totals[3] += fields["commands"]
+            totals[4] += fields["retries"]
+
+    def test_summary(self):
+        """Actions of the current test so far, None when it ran none"""
+        if not self._actions:
+            return None
+        actions, wall, wait, commands, retries = self._totals
+        breakdown = [
+            {"page": page, "action": action, "calls": calls, "wall": round(total, 4), "wait": round(waited, 4),
+             "commands": sent, "retries": retried, "max": round(slowest, 4)}
+            for (page, action), (calls, total, waited, sent, retried, slowest) in self._actions.items()
+        ]
+        breakdown.sort(key=lambda row: row["wall"], reverse=True)
+        return {"actions": actions, "wall": round(wall, 4), "wait": round(wait, 4), "commands": commands,
+                "retries": retries, "breakdown": breakdown}
+
+    def pytest_configure(self, config):
+        instrumentation.add_observer(self.observe)
+
+    def pytest_unconfigure(self, config):
+        instrumentation.remove_observer(self.observe)
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        self._actions = {}
+        self._totals = [0, 0.0, 0.0, 0, 0]
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        # Runs before the report is built, so user_properties still reach it
+        if call.when in ("call", "teardown"):
+            summary = self.test_summary()
+            if summary and call.when == "call":
+                allure.attach(json.dumps(summary, indent=2), name="page actions",
+                              attachment_type=allure.attachment_type.JSON)
+            if summary and call.when == "teardown":
+                # Teardown reports travel from xdist workers to the controller with their user_properties
+                item.user_properties.append(("actions", summary))
+        yield
+
+    def pytest_runtest_logreport(self, report):
+        if not self.collect_suite or report.when != "teardown":
+            return
+        for name, summary in report.user_properties:
+            if name == "actions":
+                self._add_test(report.nodeid, summary)
+
+    def _add_test(self, nodeid, summary):
+        self._tests[nodeid] = summary
+        for row in summary["breakdown"]:
+            key = (row["page"], row["action"])
+            stats = self._suite.get(key)
+            if stats is None:
+                stats = self._suite[key] = {"page": row["page"], "action": row["action"], "calls": 0, "wall": 0.0,
+                                            "wait": 0.0, "commands": 0, "retries": 0, "max": 0.0,
+                                            "slowest_test": None}
+            for field in ("calls", "wall", "wait", "commands", "retries"):
+                stats[field] += row[field]
+            if row["max"] > stats["max"]:
+                stats["max"] = row["max"]
+                stats["slowest_test"] = nodeid
+
+    def suite_summary(self):
+        """Actions of every test collected so far, slowest (by total wall time) first"""
+        actions = []
+        for stats in self._suite.values():
+            actions.append({**stats, "wall": round(stats["wall"], 4), "wait": round(stats["wait"], 4),
+                            "mean": round(stats["wall"] / stats["calls"], 4)})
+        actions.sort(key=lambda row: row["wall"], reverse=True)
+        return {"generated": datetime.now().isoformat(timespec="seconds"), "tests": self._tests, "actions": actions}
+
+    def pytest_sessionfinish(self, session):
+        if not self.collect_suite or not self._tests:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(self.suite_summary(), f, indent=2)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.collect_suite or not self._suite or not self.slowest:
+            return
+        terminalreporter.write_sep("-", f"slowest {self.slowest} page actions")
+        terminalreporter.write_line(
+            f"{'action':<45} {'calls':>6} {'total s':>9} {'mean s':>8} {'max s':>8} {'wait %':>7} "
+            f"{'cmd/call':>9} {'retries':>8}"
+        )
+        for row in self.suite_summary()["actions"][:self.slowest]:
+            wait_share = 100 * row["wait"] / row["wall"] if row["wall"] else 0
+            terminalreporter.write_line(
+                f"{row['page'] + '.' + row['action']:<45} {row['calls']:>6} {row['wall']:>9.2f} "
+                f"{row['mean']:>8.3f} {row['max']:>8.3f} {wait_share:>6.0f}% "
+                f"{row['commands'] / row['calls']:>9.1f} {row['retries']:>8}"
+            )
+        terminalreporter.write_line(f"per-test breakdown: {self.path}")
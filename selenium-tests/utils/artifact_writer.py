@@ -0,0 +1,142 @@
+import os
+import queue
+import logging
+import threading
+from uuid import uuid4
+
+import allure
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ArtifactWriter:
+    """
+    Writes test artifacts (screenshots, page sources, logs) from a background thread
+
+    Tests hand over bytes and carry on; the writer thread does the disk I/O, so a
+    slow or network-mounted reports volume no longer holds the test (and its
+    browser). The queue is bounded: when the disk falls that far behind, handing
+    over blocks until there is room again instead of piling up memory. Artifacts
+    beyond max_bytes are dropped with a warning. drain() (called at the end of
+    the session) waits until everything queued is on disk.
+    """
+
+    def __init__(self, max_queue=32, max_bytes=None, allure_listener=None, allure_dir=None):
+        """
+        Args:
+            max_queue (int): Artifacts waiting to be written before write() blocks
+            max_bytes (int): Total bytes this writer accepts (None for no limit)
+            allure_listener: allure-pytest's listener ("allure_listener" plugin), None when
+                Allure is off
+            allure_dir (str): allure-results directory the listener reports to
+        """
+        self.max_bytes = max_bytes
+        self.accepted_bytes = 0
+        self.written = 0
+        self.dropped = 0
+        self._allure_listener = allure_listener
+        self._allure_dir = allure_dir
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def _accept(self, size, name):
+        with self._lock:
+            if self.max_bytes is not None and self.accepted_bytes + size > self.max_bytes:
+                if not self.dropped:
+                    logger.warning("Artifact limit of %.0f MiB reached, dropping %s and later artifacts",
+                                   self.max_bytes / 1024 / 1024, name)
+                self.dropped += 1
+                return False
+            self.accepted_bytes += size
+            return True
+
+    def write(self, path, data, encode=None):
+        """
+        Queue a file to be written
+
+        Args:
+            path (str): Destination; left alone if it already exists
+            data (bytes or str): Content
+            encode (callable): Applied to data on the writer thread before writing
+                (e.g. compression)
+
+        Returns:
+            bool: False when the artifact was dropped because of max_bytes
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if not self._accept(len(data), path):
+            return False
+        self._queue.put((path, data, encode))
+        return True
+
+    def attach(self, data, name, attachment_type):
+        """
+        Attach data to the running test in Allure, writing the file in the background
+
+        The attachment is registered with the test immediately (so it lands in the
+        right test and step) while its file is written by the writer thread. Without
+        Allure this does nothing.
+
+        Returns:
+            bool: False when the attachment was dropped because of max_bytes
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if self._allure_listener is None:
+            return True
+        if not self._accept(len(data), name):
+            allure.attach(f"{name} not kept: artifact limit reached", name=name,
+                          attachment_type=allure.attachment_type.TEXT)
+            return False
+        try:
+            # Registers the attachment without writing it (allure-python-commons 2.13)
+            file_name = self._allure_listener.allure_logger._attach(uuid4(), name=name,
+                                                                    attachment_type=attachment_type)
+        except (AttributeError, KeyError, TypeError):
+            # Unknown adapter internals or no test running: let Allure write it itself
+            allure.attach(data, name=name, attachment_type=attachment_type)
+            return True
+        self._queue.put((os.path.join(self._allure_dir, file_name), data, None))
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                path, data, encode = item
+                self._write(path, data, encode)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path, data, encode):
+        if os.path.exists(path):
+            return
+        try:
+            if encode:
+                data = encode(data)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            # Another worker may write the same content-addressed file; both copies are identical
+            os.replace(tmp_path, path)
+            self.written += 1
+        except Exception as e:
+            logger.warning("Failed to write artifact %s: %s", path, e)
+
+    def drain(self):
+        """Wait until every queued artifact is written"""
+        self._queue.join()
+
+    def close(self):
+        """Drain the queue and stop the writer thread"""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
@@ -12,17 +12,80 @@ class Config:
     # Browser configuration
     BROWSER = os.getenv("BROWSER", "chrome")
     HEADLESS = os.getenv("HEADLESS", "False").lower() == "true"
-    IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", "10"))
+    # Waits: implicit wait stays off so BasePage's explicit waits (and negative checks) are not
+    # stretched by a hidden timeout on every failed lookup
+    IMPLICIT_WAIT = int(os.getenv("IMPLICIT_WAIT", "0"))
+    EXPLICIT_WAIT = float(os.getenv("EXPLICIT_WAIT", "10"))
+    POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "0.05"))
+    POLL_BACKOFF = float(os.getenv("POLL_BACKOFF", "1.5"))
+    MAX_POLL_INTERVAL = float(os.getenv("MAX_POLL_INTERVAL", "0.5"))
+    
+    # Page load strategy: "normal" waits for every resource, "eager" returns at DOMContentLoaded,
+    # "none" returns immediately and leaves all waiting to the page objects
+    PAGE_LOAD_STRATEGY = os.getenv("PAGE_LOAD_STRATEGY", "normal")
+    # Resource blocking: "none", "lean" (images, fonts, media) or "strict" (lean + third-party hosts)
+    BLOCK_PROFILE = os.getenv("BLOCK_PROFILE", "none")
+    # Extra comma-separated domains to block, e.g. "ads.example.com,cdn.example.net"
+    BLOCKED_DOMAINS = [domain.strip() for domain in os.getenv("BLOCKED_DOMAINS", "").split(",") if domain.strip()]
+    
+    # Browser reuse: "pooled" keeps warm browsers per worker, "fresh" launches one per test
+    ISOLATION = os.getenv("ISOLATION", "pooled")
+    DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", "25"))
+    
+    # Driver backend: "local" browsers or "remote" sessions on a Selenium Grid hub
+    DRIVER_BACKEND = os.getenv("DRIVER_BACKEND", "local")
+    GRID_URL = os.getenv("GRID_URL", "http://localhost:4444")
+    GRID_SLOT_TIMEOUT = float(os.getenv("GRID_SLOT_TIMEOUT", "300"))
+    GRID_POLL_INTERVAL = float(os.getenv("GRID_POLL_INTERVAL", "0.5"))
+    
+    # Resolved driver binaries are cached here, shared by all workers on the machine
+    DRIVER_CACHE_DIR = os.getenv(
+        "DRIVER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "automation-mastery-lab")
+    )
     
     # Application URLs
     BASE_URL = os.getenv("BASE_URL", "http://automationpractice.com")
     
+    # Storefront targeted by the page objects, used to seed users and sessions over HTTP
+    SHOP_URL = os.getenv("SHOP_URL", "http://automationpractice.com")
+    API_TIMEOUT = float(os.getenv("API_TIMEOUT", "15"))
+    # Logged-in sessions are cached here and shared by all workers on the machine
+    SESSION_CACHE_FILE = os.getenv("SESSION_CACHE_FILE", os.path.join(DRIVER_CACHE_DIR, "sessions.json"))
+    # Lifetime in seconds of cached sessions whose cookies carry no expiry
+    SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "1800"))
+    # Seconds a worker trusts a cached session before checking it against the shop again
+    SESSION_VERIFY_INTERVAL = float(os.getenv("SESSION_VERIFY_INTERVAL", "60"))
+    
     # Test data
     DEFAULT_USERNAME = os.getenv("DEFAULT_USERNAME", "test.user@example.com")
     DEFAULT_PASSWORD = os.getenv("DEFAULT_PASSWORD", "Password123")
     
     # Reporting
-    SCREENSHOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "reports", "screenshots")
+    REPORTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "reports")
+    SCREENSHOT_DIR = os.path.join(REPORTS_DIR, "screenshots")
+    # Stored failure screenshots: "png" (recompressed), "webp" (lossless, needs Pillow) or "raw"
+    SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "png")
+    # Failure artifacts are written by a background thread: queue length before tests wait,
+    # and total MiB per run (0 = no limit)
+    ARTIFACT_QUEUE_SIZE = int(os.getenv("ARTIFACT_QUEUE_SIZE", "32"))
+    ARTIFACT_MAX_MB = int(os.getenv("ARTIFACT_MAX_MB", "500"))
+    
+    # Parallel execution: worker count used by "-n auto" (empty = one per CPU)
+    PARALLEL_WORKERS = os.getenv("PARALLEL_WORKERS", "")
+    # Duration and outcome of recent runs per test, browser and base URL (SQLite)
+    DURATIONS_DB = os.getenv("DURATIONS_DB", os.path.join(REPORTS_DIR, "test-history.sqlite"))
+    # Test order ("auto", "longest-first", "fail-fast", "none") and sharding across CI agents
+    TEST_ORDER = os.getenv("TEST_ORDER", "auto")
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+    SHARD_INDEX = int(os.getenv("SHARD_INDEX", "0"))
+    # History file every CI agent shares (e.g. restored from one CI cache); shards are balanced
+    # by duration only when it is set, otherwise they are split by node id
+    SHARD_HISTORY = os.getenv("SHARD_HISTORY", "")
+    # Per-test page action timings (wall time, waits, WebDriver commands) of the last run
+    ACTION_TIMINGS_FILE = os.getenv("ACTION_TIMINGS_FILE", os.path.join(REPORTS_DIR, "action-timings.json"))
+    
+    # Live Prometheus metrics endpoint for test sessions (0 = off)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
     
     @staticmethod
     def get_browser_options():
@@ -2,28 +2,72 @@ from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.service import Service as FirefoxService
 from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+from .config import Config
+from .driver_resolver import DriverResolver
+from .grid_client import GridClient
+from .network_profile import NetworkProfile
 
 
 class DriverFactory:
     """Factory class for creating WebDriver instances"""
-    
+
     @staticmethod
-    def get_driver(browser_name, headless=False):
+    def get_driver(browser_name, headless=False, backend=None, grid_url=None,
+                   network_profile=None, page_load_strategy=None):
         """
         Get a WebDriver instance based on the browser name
-        
+
         Args:
             browser_name (str): Name of the browser (chrome, firefox, edge)
             headless (bool): Whether to run in headless mode
-            
+            backend (str): "local" to start the browser here, "remote" to use a Selenium Grid
+                (defaults to Config.DRIVER_BACKEND)
+            grid_url (str): Grid hub URL for the remote backend (defaults to Config.GRID_URL)
+            network_profile (NetworkProfile): Resources to block (defaults to Config.BLOCK_PROFILE)
+            page_load_strategy (str): "normal", "eager" or "none" (defaults to Config.PAGE_LOAD_STRATEGY)
+
         Returns:
             WebDriver: A WebDriver instance
         """
         browser_name = browser_name.lower()
-        
+        backend = (backend or Config.DRIVER_BACKEND).lower()
+        network_profile = network_profile or NetworkProfile()
+        options = DriverFactory.get_options(browser_name, headless, page_load_strategy)
+        # Only local Chromium sessions expose CDP; everything else blocks through preferences
+        network_profile.apply_options(browser_name, options, use_cdp=backend == "local")
+
+        if backend == "remote":
+            return DriverFactory.get_remote_driver(browser_name, options, grid_url or Config.GRID_URL)
+
+        elif backend != "local":
+            raise ValueError(f"Driver backend '{backend}' not supported. Use 'local' or 'remote'.")
+
+        if browser_name == "chrome":
+            driver = webdriver.Chrome(service=ChromeService(DriverResolver.resolve("chrome")), options=options)
+
+        elif browser_name == "firefox":
+            driver = webdriver.Firefox(service=FirefoxService(DriverResolver.resolve("firefox")), options=options)
+
+        else:
+            driver = webdriver.Edge(service=EdgeService(DriverResolver.resolve("edge")), options=options)
+
+        network_profile.apply_driver(driver)
+        return driver
+
+    @staticmethod
+    def get_options(browser_name, headless=False, page_load_strategy=None):
+        """
+        Get browser options shared by the local and remote backends
+
+        Args:
+            browser_name (str): Name of the browser (chrome, firefox, edge)
+            headless (bool): Whether to run in headless mode
+            page_load_strategy (str): "normal", "eager" or "none" (defaults to Config.PAGE_LOAD_STRATEGY)
+
+        Returns:
+            ArgOptions: Browser-specific options
+        """
         if browser_name == "chrome":
             options = webdriver.ChromeOptions()
             if headless:
@@ -31,19 +75,29 @@ class DriverFactory:
             options.add_argument("--window-size=1920,1080")
             options.add_argument("--disable-gpu")
             options.add_argument("--no-sandbox")
-            return webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=options)
-        
+            options.add_argument("--disable-dev-shm-usage")
+
         elif browser_name == "firefox":
             options = webdriver.FirefoxOptions()
             if headless:
                 options.add_argument("--headless")
-            return webdriver.Firefox(service=FirefoxService(GeckoDriverManager().install()), options=options)
-        
+
         elif browser_name == "edge":
             options = webdriver.EdgeOptions()
             if headless:
                 options.add_argument("--headless")
-            return webdriver.Edge(service=EdgeService(EdgeChromiumDriverManager().install()), options=options)
-        
+
         else:
             raise ValueError(f"Browser '{browser_name}' not supported. Use 'chrome', 'firefox', or 'edge'.")
+
+        options.page_load_strategy = page_load_strategy or Config.PAGE_LOAD_STRATEGY
+        return options
+
+    @staticmethod
+    def get_remote_driver(browser_name, options, grid_url):
+        """
+        Start a session on a Selenium Grid once it has a free slot for the browser
+
+        All sessions in this process share one keep-alive connection to the hub.
+        """
+        return GridClient.for_url(grid_url).start_session(browser_name, options)
@@ -0,0 +1,147 @@
+import time
+import logging
+from selenium.common.exceptions import WebDriverException
+
+from .config import Config
+from .driver_factory import DriverFactory
+from .instrumentation import observe, count_commands
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    """Keeps warm WebDriver instances per worker and hands them out one test at a time"""
+
+    def __init__(self, browser_name, headless=False, max_uses=None, backend=None, grid_url=None,
+                 network_profile=None, page_load_strategy=None):
+        """
+        Create an empty pool; browsers are launched lazily on first acquire
+
+        Args:
+            browser_name (str): Name of the browser (chrome, firefox, edge)
+            headless (bool): Whether to run in headless mode
+            max_uses (int): Number of tests a browser serves before it is recycled
+            backend (str): Driver backend passed to DriverFactory ("local" or "remote")
+            grid_url (str): Grid hub URL for the remote backend
+            network_profile (NetworkProfile): Resources every browser blocks
+            page_load_strategy (str): "normal", "eager" or "none"
+        """
+        self.browser_name = browser_name.lower()
+        self.headless = headless
+        self.max_uses = max_uses or Config.DRIVER_MAX_USES
+        self.backend = backend
+        self.grid_url = grid_url
+        self.network_profile = network_profile
+        self.page_load_strategy = page_load_strategy
+        self._idle = []
+        self._uses = {}
+        self._single_use = set()
+
+    def acquire(self, fresh=False):
+        """
+        Get a clean WebDriver instance
+
+        Args:
+            fresh (bool): Launch a dedicated browser that is quit on release
+
+        Returns:
+            WebDriver: A WebDriver instance with no cookies, storage or extra tabs
+        """
+        if fresh:
+            driver = self._launch()
+            self._single_use.add(driver)
+            return driver
+
+        while self._idle:
+            driver = self._idle.pop()
+            if self._is_alive(driver):
+                return driver
+            logger.warning("Pooled %s browser is no longer responding, replacing it", self.browser_name)
+            self._discard(driver)
+
+        return self._launch()
+
+    def release(self, driver):
+        """Return a WebDriver instance to the pool, recycling it when worn out or broken"""
+        if driver in self._single_use:
+            self._single_use.discard(driver)
+            self._discard(driver)
+            return
+
+        self._uses[driver] = self._uses.get(driver, 0) + 1
+        if self._uses[driver] >= self.max_uses:
+            logger.info("Recycling %s browser after %d tests", self.browser_name, self._uses[driver])
+            self._discard(driver)
+            return
+
+        try:
+            self.reset(driver)
+        except WebDriverException as e:
+            logger.warning("Failed to reset %s browser, discarding it: %s", self.browser_name, e.msg)
+            self._discard(driver)
+            return
+
+        self._idle.append(driver)
+
+    def close(self):
+        """Quit every browser owned by the pool"""
+        for driver in list(self._idle) + list(self._single_use):
+            self._discard(driver)
+        self._idle = []
+        self._single_use = set()
+
+    @staticmethod
+    def reset(driver):
+        """Clear cookies, storage and extra tabs so the next test starts from a blank browser"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        # Web storage is scoped to the current origin, so clear it before leaving the page
+        driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+        )
+
+        # delete_all_cookies only reaches the current domain; Chromium can drop every cookie at once
+        if hasattr(driver, "execute_cdp_cmd"):
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        else:
+            driver.delete_all_cookies()
+
+        driver.get("about:blank")
+
+    def _launch(self):
+        """Start a new browser configured the same way as the original per-test fixture"""
+        started = time.perf_counter()
+        driver = DriverFactory.get_driver(
+            self.browser_name, self.headless, backend=self.backend, grid_url=self.grid_url,
+            network_profile=self.network_profile, page_load_strategy=self.page_load_strategy
+        )
+        # Page actions report how many commands they sent
+        count_commands(driver)
+        driver.implicitly_wait(Config.IMPLICIT_WAIT)
+        driver.maximize_window()
+        observe("browser_launch", time.perf_counter() - started, browser=self.browser_name,
+                backend=self.backend or Config.DRIVER_BACKEND)
+        self._uses[driver] = 0
+        return driver
+
+    def _discard(self, driver):
+        """Quit a browser and forget about it"""
+        self._uses.pop(driver, None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            # The browser already crashed, there is nothing left to clean up
+            pass
+
+    @staticmethod
+    def _is_alive(driver):
+        """Check that the browser session still answers commands"""
+        try:
+            driver.current_window_handle
+            return True
+        except WebDriverException:
+            return False
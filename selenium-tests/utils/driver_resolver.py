@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import shutil
+import logging
+import subprocess
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.firefox import GeckoDriverManager
+from webdriver_manager.microsoft import EdgeChromiumDriverManager
+
+from .config import Config
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+VERSION_PATTERN = re.compile(r"(\d+)\.\d+")
+
+
+class DriverResolver:
+    """Resolve browser driver binaries once per machine instead of on every browser launch"""
+
+    # How to find each browser, its driver and the webdriver-manager fallback
+    BROWSERS = {
+        "chrome": {
+            "driver": "chromedriver",
+            "env": "CHROMEDRIVER_PATH",
+            "binaries": [
+                "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+                "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+            ],
+            "match_version": True,
+            "manager": ChromeDriverManager,
+        },
+        "firefox": {
+            "driver": "geckodriver",
+            "env": "GECKODRIVER_PATH",
+            "binaries": ["firefox", "/Applications/Firefox.app/Contents/MacOS/firefox"],
+            # geckodriver releases are not tied to Firefox versions
+            "match_version": False,
+            "manager": GeckoDriverManager,
+        },
+        "edge": {
+            "driver": "msedgedriver",
+            "env": "EDGEDRIVER_PATH",
+            "binaries": [
+                "microsoft-edge", "microsoft-edge-stable",
+                "/Applications/Microsoft Edge.app/Contents/MacOS/Microsoft Edge",
+            ],
+            "match_version": True,
+            "manager": EdgeChromiumDriverManager,
+        },
+    }
+
+    # Paths already resolved by this process
+    _resolved = {}
+
+    @classmethod
+    def resolve(cls, browser_name):
+        """
+        Get the path of the driver binary for a browser
+
+        Lookup order: this process, an explicit environment override, the on-disk
+        cache (keyed by browser and browser major version), a matching driver on
+        PATH, and finally a webdriver-manager download. The on-disk cache is
+        guarded by a lock file so parallel xdist workers resolve it only once.
+
+        Args:
+            browser_name (str): Name of the browser (chrome, firefox, edge)
+
+        Returns:
+            str: Absolute path of the driver executable
+        """
+        browser_name = browser_name.lower()
+        if browser_name in cls._resolved:
+            return cls._resolved[browser_name]
+
+        if browser_name not in cls.BROWSERS:
+            raise ValueError(f"Browser '{browser_name}' not supported. Use 'chrome', 'firefox', or 'edge'.")
+        spec = cls.BROWSERS[browser_name]
+
+        override = os.getenv(spec["env"])
+        if override:
+            cls._resolved[browser_name] = override
+            return override
+
+        version = cls.browser_version(browser_name)
+        key = f"{browser_name}:{version or 'unknown'}"
+
+        with FileLock(cls._cache_file() + ".lock"):
+            cache = cls._read_cache()
+            path = cache.get(key)
+            if not cls._is_executable(path):
+                path, matches = cls._locate(browser_name, version, cache)
+                # A fallback for another browser version is used for this process only,
+                # so the next run retries the download
+                if matches:
+                    cache[key] = path
+                    cls._write_cache(cache)
+                logger.info("Resolved %s for %s: %s", spec["driver"], key, path)
+
+        cls._resolved[browser_name] = path
+        return path
+
+    @classmethod
+    def browser_version(cls, browser_name):
+        """Get the installed browser's major version without touching the network"""
+        for binary in cls.BROWSERS[browser_name]["binaries"]:
+            version = cls._binary_version(binary)
+            if version:
+                return version
+        return None
+
+    @classmethod
+    def _locate(cls, browser_name, version, cache):
+        """
+        Find a driver on PATH or download one, preferring whatever works offline
+
+        Returns:
+            tuple: (driver path, whether it is known to match the browser version)
+        """
+        spec = cls.BROWSERS[browser_name]
+        system_driver = shutil.which(spec["driver"])
+        if system_driver and (not spec["match_version"] or version is None
+                              or cls._binary_version(system_driver) == version):
+            return system_driver, True
+
+        try:
+            return spec["manager"]().install(), True
+        except Exception as e:
+            # Offline or rate limited: fall back to any driver we already know about
+            fallbacks = [system_driver] + [
+                path for key, path in cache.items() if key.startswith(f"{browser_name}:")
+            ]
+            for path in fallbacks:
+                if cls._is_executable(path):
+                    logger.warning("Could not download %s (%s), using %s", spec["driver"], e, path)
+                    return path, False
+            raise
+
+    @staticmethod
+    def _binary_version(binary):
+        """Run '<binary> --version' and return the major version, or None"""
+        executable = binary if os.path.isabs(binary) else shutil.which(binary)
+        if not executable or not os.path.exists(executable):
+            return None
+        try:
+            output = subprocess.run(
+                [executable, "--version"], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None
+        match = VERSION_PATTERN.search(output)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _is_executable(path):
+        return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+    @staticmethod
+    def _cache_file():
+        return os.path.join(Config.DRIVER_CACHE_DIR, "drivers.json")
+
+    @classmethod
+    def _read_cache(cls):
+        try:
+            with open(cls._cache_file(), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def _write_cache(cls, cache):
+        # Write to a temporary file first so readers never see a partial cache
+        tmp_path = cls._cache_file() + f".{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, cls._cache_file())
@@ -0,0 +1,241 @@
+import os
+import time
+import sqlite3
+import hashlib
+from statistics import median
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS test_runs (
+    nodeid TEXT NOT NULL,
+    browser TEXT NOT NULL,
+    base_url TEXT NOT NULL,
+    finished REAL NOT NULL,
+    duration REAL NOT NULL,
+    failed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_runs_key ON test_runs (browser, base_url, nodeid, finished);
+"""
+
+
+class DurationStore:
+    """
+    Per-test history (duration and outcome of recent runs) for scheduling and sharding
+
+    Results are appended to a SQLite file after every run, keyed by node id,
+    browser and base URL, so a Firefox run against staging is planned from
+    Firefox runs against staging. Only the latest runs of each test are kept.
+
+    The history drives three orderings of a session's tests:
+    - longest first, so parallel workers finish together
+    - fail fast, so a broken build shows its first failure as early as possible
+    - balanced shards, so N CI agents get equal shares of the suite (only from a
+      history file every agent shares; otherwise shards are split by node id)
+    """
+
+    # Runs kept per test
+    KEEP = 20
+    # Recent runs the duration estimate and flaky detection look at
+    WINDOW = 10
+    # Weight of each older run in the failure estimate
+    DECAY = 0.7
+    # Failure probability assumed for a test without history
+    NEW_TEST_FAILURE = 0.2
+
+    def __init__(self, path, browser="", base_url=""):
+        """
+        Args:
+            path (str): SQLite file, created on first save
+            browser (str): Browser of this session
+            base_url (str): Application URL of this session
+        """
+        self.path = path
+        self.browser = browser
+        self.base_url = base_url
+        self.history = self._load()
+        self._current = {}
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = sqlite3.connect(self.path, timeout=30)
+        db.executescript(SCHEMA)
+        return db
+
+    def _load(self):
+        """Recent (duration, failed) runs of every test, oldest first"""
+        if not os.path.exists(self.path):
+            return {}
+        history = {}
+        db = self._connect()
+        try:
+            for nodeid, duration, failed in db.execute(
+                "SELECT nodeid, duration, failed FROM test_runs WHERE browser = ? AND base_url = ? "
+                "ORDER BY finished", (self.browser, self.base_url)
+            ):
+                history.setdefault(nodeid, []).append((duration, bool(failed)))
+        finally:
+            db.close()
+        return history
+
+    def get(self, nodeid, default=None):
+        """Expected duration of a test in seconds: the median of its recent runs"""
+        runs = self.history.get(nodeid)
+        if not runs:
+            return default
+        return median(duration for duration, _ in runs[-self.WINDOW:])
+
+    def failure_probability(self, nodeid):
+        """Chance the test fails next, weighting recent runs most"""
+        runs = self.history.get(nodeid)
+        if not runs:
+            return self.NEW_TEST_FAILURE
+        weight, failures, total = 1.0, 0.0, 0.0
+        for _, failed in reversed(runs[-self.WINDOW:]):
+            failures += weight * failed
+            total += weight
+            weight *= self.DECAY
+        # A small prior keeps tests that never failed from being ruled out completely
+        return (failures + 0.01) / (total + 0.1)
+
+    def is_flaky(self, nodeid):
+        """Whether the test both passed and failed among its recent runs"""
+        outcomes = {failed for _, failed in self.history.get(nodeid, [])[-self.WINDOW:]}
+        return len(outcomes) == 2
+
+    def _average(self):
+        estimates = [self.get(nodeid) for nodeid in self.history]
+        return sum(estimates) / len(estimates) if estimates else 1.0
+
+    def add(self, nodeid, seconds, failed=False):
+        """Add one test phase (setup, call or teardown) of the current run"""
+        current = self._current.setdefault(nodeid, [0.0, False])
+        current[0] += seconds
+        current[1] = current[1] or failed
+
+    def discard(self, nodeid):
+        """Leave a test of the current run out of the history (e.g. it was skipped)"""
+        self._current.pop(nodeid, None)
+
+    def sort_longest_first(self, items):
+        """
+        Order pytest items by expected duration, slowest first
+
+        Tests without history are treated as average so new tests neither
+        block the start of the run nor end up alone at its tail.
+        """
+        if not self.history:
+            return
+        average = self._average()
+        items.sort(key=lambda item: self.get(item.nodeid, average), reverse=True)
+
+    def sort_fail_fast(self, items):
+        """
+        Order pytest items to reach the first failure as early as possible
+
+        Tests that failed in their last run come first, then flaky ones, then the
+        rest. Within each group, tests are sorted by expected duration divided by
+        failure probability, which minimizes the expected time to the first failure.
+        """
+        average = self._average()
+
+        def key(item):
+            runs = self.history.get(item.nodeid)
+            group = 0 if runs and runs[-1][1] else 1 if self.is_flaky(item.nodeid) else 2
+            return group, self.get(item.nodeid, average) / self.failure_probability(item.nodeid)
+
+        items.sort(key=key)
+
+    def fingerprint(self):
+        """Short hash of the loaded history; agents with equal fingerprints compute the same balanced shards"""
+        sha = hashlib.sha256()
+        for nodeid in sorted(self.history):
+            sha.update(f"{nodeid}:{self.history[nodeid]!r}\n".encode())
+        return sha.hexdigest()[:12]
+
+    def shard(self, items, count, index, balanced=True):
+        """
+        Split pytest items into shards and keep one of them
+
+        Balanced: tests are handed out slowest first, each to the shard with the
+        least expected time so far. Every agent computes the same split only if
+        it reads the same history, so this needs a history file shared by all
+        agents. Otherwise each test goes to the shard given by a hash of its node
+        id, which every agent computes alike whatever it has recorded.
+
+        Args:
+            items (list): Collected items, in collection order
+            count (int): Number of shards
+            index (int): Shard to keep, from 0 to count - 1
+            balanced (bool): Split by recorded duration instead of by node id
+
+        Returns:
+            tuple: (items of the shard in collection order, the other items, expected seconds of the shard)
+        """
+        if not 0 <= index < count:
+            raise ValueError(f"Shard index {index} is out of range for {count} shards")
+        average = self._average()
+        loads = [0.0] * count
+        assigned = {}
+        if balanced:
+            for item in sorted(items, key=lambda item: (-self.get(item.nodeid, average), item.nodeid)):
+                target = min(range(count), key=lambda shard: (loads[shard], shard))
+                loads[target] += self.get(item.nodeid, average)
+                assigned[item.nodeid] = target
+        else:
+            for item in items:
+                # Stable across processes, unlike hash()
+                target = int(hashlib.sha256(item.nodeid.encode()).hexdigest()[:8], 16) % count
+                loads[target] += self.get(item.nodeid, average)
+                assigned[item.nodeid] = target
+        selected = [item for item in items if assigned[item.nodeid] == index]
+        deselected = [item for item in items if assigned[item.nodeid] != index]
+        return selected, deselected, loads[index]
+
+    def save(self):
+        """Append the current run and drop runs beyond KEEP per test"""
+        if not self._current:
+            return
+        finished = time.time()
+        db = self._connect()
+        try:
+            with db:
+                db.executemany(
+                    "INSERT INTO test_runs (nodeid, browser, base_url, finished, duration, failed) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(nodeid, self.browser, self.base_url, finished, round(seconds, 3), int(failed))
+                     for nodeid, (seconds, failed) in self._current.items()]
+                )
+                db.execute(
+                    """
+                    DELETE FROM test_runs WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY finished DESC) AS position
+                            FROM test_runs WHERE browser = ? AND base_url = ?
+                        ) WHERE position > ?
+                    )
+                    """,
+                    (self.browser, self.base_url, self.KEEP)
+                )
+        finally:
+            db.close()
+        self.history = self._load()
+        self._current = {}
+
+
+class DurationRecorder:
+    """pytest plugin feeding a DurationStore; registered on the controller only"""
+
+    def __init__(self, store):
+        self.store = store
+        self._skipped = set()
+
+    def pytest_runtest_logreport(self, report):
+        # Called on the xdist controller for every worker's report as well
+        self.store.add(report.nodeid, report.duration, report.failed)
+        if report.skipped:
+            self._skipped.add(report.nodeid)
+
+    def pytest_sessionfinish(self, session):
+        # A skipped test says nothing about its duration or stability
+        for nodeid in self._skipped:
+            self.store.discard(nodeid)
+        self.store.save()
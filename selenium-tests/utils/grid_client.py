@@ -0,0 +1,154 @@
+import os
+import time
+import hashlib
+import logging
+import requests
+from selenium import webdriver
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from .config import Config
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class GridClient:
+    """Client for a Selenium Grid hub: free-slot checks and a shared keep-alive connection"""
+
+    # Browser names as advertised in the Grid slot stereotypes
+    GRID_BROWSER_NAMES = {
+        "chrome": "chrome",
+        "firefox": "firefox",
+        "edge": "MicrosoftEdge",
+    }
+
+    # One client per hub URL and process, so every session reuses the same connection pool
+    _clients = {}
+
+    def __init__(self, hub_url, slot_timeout=None, poll_interval=None):
+        """
+        Args:
+            hub_url (str): Grid hub URL, e.g. http://localhost:4444
+            slot_timeout (float): Seconds to wait for a free slot before giving up
+            poll_interval (float): Initial seconds between slot checks (backs off up to 5s)
+        """
+        self.hub_url = hub_url.rstrip("/")
+        self.slot_timeout = slot_timeout or Config.GRID_SLOT_TIMEOUT
+        self.poll_interval = poll_interval or Config.GRID_POLL_INTERVAL
+        self.http = requests.Session()
+        self._connection = None
+        # Shared by every worker on this machine that starts sessions on the same hub
+        digest = hashlib.sha1(self.hub_url.encode()).hexdigest()[:12]
+        self.lock_path = os.path.join(Config.DRIVER_CACHE_DIR, f"grid-{digest}.lock")
+
+    @classmethod
+    def for_url(cls, hub_url):
+        """Get the shared client for a hub URL"""
+        key = hub_url.rstrip("/")
+        if key not in cls._clients:
+            cls._clients[key] = cls(key)
+        return cls._clients[key]
+
+    @property
+    def connection(self):
+        """WebDriver command executor shared by all sessions on this hub (HTTP keep-alive)"""
+        if self._connection is None:
+            self._connection = RemoteConnection(self.hub_url, keep_alive=True)
+        return self._connection
+
+    def status(self):
+        """Get the hub's /status payload"""
+        response = self.http.get(f"{self.hub_url}/status", timeout=10)
+        response.raise_for_status()
+        return response.json()["value"]
+
+    def wait_until_ready(self, timeout=30):
+        """
+        Poll /status until the hub reports ready (at least one node registered)
+
+        Returns:
+            bool: False when the hub was unreachable or not ready within the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.status().get("ready"):
+                    return True
+            except (requests.RequestException, ValueError, KeyError) as e:
+                logger.debug("Grid at %s not reachable yet: %s", self.hub_url, e)
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+
+    def slots(self, browser_name):
+        """
+        Count the Grid slots for a browser
+
+        Returns:
+            tuple: (free, total) slots across all nodes that are up
+        """
+        grid_name = self.GRID_BROWSER_NAMES.get(browser_name.lower(), browser_name)
+        free = total = 0
+        for node in self.status().get("nodes", []):
+            if node.get("availability", "UP") != "UP":
+                continue
+            slots = node.get("slots", [])
+            matching = [slot for slot in slots if slot.get("stereotype", {}).get("browserName") == grid_name]
+            busy = sum(1 for slot in slots if slot.get("session"))
+            capacity = min(len(matching), node.get("maxSessions", len(matching)))
+            # A node caps concurrent sessions across all of its browsers
+            node_free = min(
+                sum(1 for slot in matching if not slot.get("session")),
+                node.get("maxSessions", len(slots)) - busy
+            )
+            free += max(node_free, 0)
+            total += capacity
+        return free, total
+
+    def wait_for_slot(self, browser_name):
+        """
+        Block until the Grid has a free slot for the browser
+
+        Requesting a session on a saturated Grid puts it in the hub's queue, where it
+        times out under load; polling /status first makes workers wait instead.
+        """
+        deadline = time.monotonic() + self.slot_timeout
+        interval = self.poll_interval
+        while True:
+            try:
+                free, total = self.slots(browser_name)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                # Hub without a usable /status: let the session request decide
+                logger.warning("Could not read Grid status from %s: %s", self.hub_url, e)
+                return
+            if free > 0:
+                return
+            if total == 0:
+                raise RuntimeError(f"Selenium Grid at {self.hub_url} has no '{browser_name}' nodes")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(
+                    f"No free '{browser_name}' slot on {self.hub_url} after {self.slot_timeout}s ({total} slots busy)"
+                )
+            logger.info("All %d '%s' Grid slots busy, waiting %.1fs", total, browser_name, interval)
+            time.sleep(interval)
+            interval = min(interval * 2, 5)
+
+    def start_session(self, browser_name, options):
+        """
+        Start a session once the Grid has a free slot for the browser
+
+        The slot check and the session request happen under a lock shared by the
+        workers on this machine, so two of them cannot both see the last free slot
+        and send one request too many into the hub's queue.
+
+        Args:
+            browser_name (str): Name of the browser (chrome, firefox, edge)
+            options: Browser options for the session
+
+        Returns:
+            WebDriver: Remote WebDriver on this hub's shared connection
+        """
+        # Workers queue on the lock while the holder waits for a slot
+        with FileLock(self.lock_path, timeout=self.slot_timeout * 2):
+            self.wait_for_slot(browser_name)
+            return webdriver.Remote(command_executor=self.connection, options=options)
@@ -0,0 +1,104 @@
+import time
+import functools
+import threading
+
+# Callables taking (event, seconds, fields); see add_observer
+_observers = []
+
+# Per thread, the page actions in progress: [wait seconds, WebDriver commands, wait retries] each
+_local = threading.local()
+
+
+def add_observer(observer):
+    """
+    Subscribe to timing events
+
+    Events:
+        page_action: a page-object action finished (fields: page, action, wait, commands,
+            retries, depth). wait, commands and retries include nested actions; depth is 0
+            for an action called by the test itself, 1 for one called by another action, ...
+        browser_launch: a browser was started (fields: browser, backend)
+
+    Args:
+        observer (callable): Called with (event, seconds, fields dict) on the thread that did the work
+    """
+    _observers.append(observer)
+
+
+def remove_observer(observer):
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def observe(event, seconds, **fields):
+    """Report a timing to every observer"""
+    for observer in _observers:
+        observer(event, seconds, fields)
+
+
+def _frames():
+    frames = getattr(_local, "frames", None)
+    if frames is None:
+        frames = _local.frames = []
+    return frames
+
+
+def record_wait(seconds, retries):
+    """Charge an explicit wait to the page action in progress on this thread"""
+    frames = getattr(_local, "frames", None)
+    if frames:
+        frame = frames[-1]
+        frame[0] += seconds
+        frame[2] += retries
+
+
+def count_commands(driver):
+    """
+    Charge every WebDriver command sent by driver to the page action in progress
+
+    WebElement calls go through driver.execute as well, so they are counted too.
+    """
+    execute = driver.execute
+
+    @functools.wraps(execute)
+    def counted(driver_command, params=None):
+        frames = getattr(_local, "frames", None)
+        if frames:
+            frames[-1][1] += 1
+        return execute(driver_command, params)
+
+    driver.execute = counted
+    return driver
+
+
+def timed_action(method):
+    """
+    Report how long a page-object method takes as a page_action event
+
+    With no observer subscribed the call goes straight through.
+    """
+    action = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not _observers:
+            return method(self, *args, **kwargs)
+        frames = _frames()
+        frame = [0.0, 0, 0]
+        frames.append(frame)
+        started = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            frames.pop()
+            if frames:
+                parent = frames[-1]
+                parent[0] += frame[0]
+                parent[1] += frame[1]
+                parent[2] += frame[2]
+            observe("page_action", elapsed, page=type(self).__name__, action=action,
+                    wait=frame[0], commands=frame[1], retries=frame[2], depth=len(frames))
+
+    wrapper.timed = True
+    return wrapper
@@ -0,0 +1,74 @@
+from metrics_exporter import MetricsRegistry, MetricsServer
+
+from . import instrumentation
+
+# Page actions range from a cached lookup (~1 ms) to a full explicit wait
+ACTION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class SessionMetrics:
+    """
+    pytest plugin serving live test-session metrics in the Prometheus text format
+
+    Every process serves its own endpoint: the xdist controller (or a plain run)
+    counts test outcomes for the whole session, and each process reports the
+    browser launches and page actions it performs itself.
+    """
+
+    def __init__(self, port, count_tests=True):
+        """
+        Args:
+            port (int): Port of the /metrics endpoint
+            count_tests (bool): Export test outcomes; off on xdist workers, whose reports reach the controller
+        """
+        self.registry = MetricsRegistry()
+        self.server = MetricsServer(self.registry, port)
+        self.count_tests = count_tests
+        self.tests = self.registry.counter("ui_tests_total", "Finished tests by outcome", ["outcome"])
+        self.running = self.registry.gauge("ui_tests_running", "Tests currently running")
+        self.launches = self.registry.histogram(
+            "ui_browser_launch_seconds", "Time to start a browser", ["browser", "backend"]
+        )
+        self.actions = self.registry.histogram(
+            "ui_page_action_seconds", "Duration of page-object actions", ["page", "action"], buckets=ACTION_BUCKETS
+        )
+        self._action_values = {}
+
+    def observe(self, event, seconds, fields):
+        """Observer for utils.instrumentation events"""
+        if event == "page_action":
+            key = (fields["page"], fields["action"])
+            value = self._action_values.get(key)
+            if value is None:
+                value = self._action_values[key] = self.actions.labels(*key)
+            value.observe(seconds)
+        elif event == "browser_launch":
+            self.launches.labels(fields["browser"], fields["backend"]).observe(seconds)
+
+    def pytest_configure(self, config):
+        self.server.start()
+        instrumentation.add_observer(self.observe)
+
+    def pytest_unconfigure(self, config):
+        instrumentation.remove_observer(self.observe)
+        self.server.stop()
+
+    def pytest_report_header(self, config):
+        return f"live metrics: {self.server.url}"
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        if self.count_tests:
+            self.running.inc()
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        if self.count_tests:
+            self.running.dec()
+
+    def pytest_runtest_logreport(self, report):
+        if not self.count_tests:
+            return
+        # One outcome per test: the call result, or the setup result when the test never ran
+        if report.when == "call":
+            self.tests.labels(report.outcome).inc()
+        elif report.when == "setup" and not report.passed:
+            self.tests.labels("error" if report.failed else report.outcome).inc()
@@ -0,0 +1,153 @@
+import json
+import logging
+from selenium.common.exceptions import WebDriverException
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ["png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "bmp"]
+FONT_EXTENSIONS = ["woff", "woff2", "ttf", "otf", "eot"]
+MEDIA_EXTENSIONS = ["mp4", "webm", "mp3", "ogg", "wav", "m4a"]
+
+# Analytics, ads and web font hosts that no assertion depends on
+THIRD_PARTY_DOMAINS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "googlesyndication.com",
+    "connect.facebook.net",
+    "hotjar.com",
+    "fonts.googleapis.com",
+    "fonts.gstatic.com",
+]
+
+CHROMIUM_BROWSERS = {"chrome", "edge"}
+
+
+class NetworkProfile:
+    """
+    Blocks resources the tests never look at, so page loads transfer less
+
+    Profiles:
+        none: load everything (default)
+        lean: block images, fonts and media
+        strict: lean, plus analytics, ads and web font hosts
+
+    Chromium blocks URL patterns through CDP Network.setBlockedURLs; Firefox and
+    remote Chromium sessions (no CDP) fall back to browser preferences, which
+    cover images, fonts and media but not domains.
+    """
+
+    PROFILES = {
+        "none": {"resources": [], "domains": []},
+        "lean": {"resources": ["images", "fonts", "media"], "domains": []},
+        "strict": {"resources": ["images", "fonts", "media"], "domains": THIRD_PARTY_DOMAINS},
+    }
+
+    RESOURCE_EXTENSIONS = {
+        "images": IMAGE_EXTENSIONS,
+        "fonts": FONT_EXTENSIONS,
+        "media": MEDIA_EXTENSIONS,
+    }
+
+    def __init__(self, name=None, blocked_domains=None):
+        """
+        Args:
+            name (str): Profile name (none, lean, strict), defaults to Config.BLOCK_PROFILE
+            blocked_domains (list): Extra domains to block on top of the profile
+                (defaults to Config.BLOCKED_DOMAINS)
+        """
+        self.name = (name or Config.BLOCK_PROFILE).lower()
+        if self.name not in self.PROFILES:
+            raise ValueError(f"Block profile '{self.name}' not supported. Use one of: {', '.join(self.PROFILES)}.")
+        profile = self.PROFILES[self.name]
+        self.resources = profile["resources"]
+        extra = Config.BLOCKED_DOMAINS if blocked_domains is None else blocked_domains
+        self.domains = profile["domains"] + [domain for domain in extra if domain not in profile["domains"]]
+
+    @property
+    def enabled(self):
+        """Whether the profile blocks anything at all"""
+        return bool(self.resources or self.domains)
+
+    def url_patterns(self):
+        """URL patterns in Network.setBlockedURLs syntax ("*" matches any characters)"""
+        patterns = []
+        for resource in self.resources:
+            for extension in self.RESOURCE_EXTENSIONS[resource]:
+                patterns += [f"*.{extension}", f"*.{extension}?*"]
+        for domain in self.domains:
+            patterns += [f"*://{domain}/*", f"*://*.{domain}/*"]
+        return patterns
+
+    def apply_options(self, browser_name, options, use_cdp):
+        """
+        Add the profile's preferences to browser options before the session starts
+
+        Args:
+            browser_name (str): Name of the browser (chrome, firefox, edge)
+            options (ArgOptions): Options returned by DriverFactory.get_options
+            use_cdp (bool): Whether blocking will be applied through CDP after launch
+        """
+        if not self.enabled:
+            return
+
+        if browser_name in CHROMIUM_BROWSERS:
+            # The performance log is where blocked requests and transferred bytes are counted
+            options.set_capability(
+                "ms:loggingPrefs" if browser_name == "edge" else "goog:loggingPrefs", {"performance": "ALL"}
+            )
+            options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+            if not use_cdp and "images" in self.resources:
+                options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+        elif browser_name == "firefox":
+            if "images" in self.resources:
+                options.set_preference("permissions.default.image", 2)
+            if "fonts" in self.resources:
+                options.set_preference("gfx.downloadable_fonts.enabled", False)
+            if "media" in self.resources:
+                options.set_preference("media.autoplay.default", 5)
+                options.set_preference("media.mediasource.enabled", False)
+
+        if self.domains and not (use_cdp and browser_name in CHROMIUM_BROWSERS):
+            logger.warning("Domain blocking needs CDP; %s will load %s", browser_name, ", ".join(self.domains))
+
+    def apply_driver(self, driver):
+        """Install the URL blocklist on a running Chromium session"""
+        if not self.enabled or not hasattr(driver, "execute_cdp_cmd"):
+            return
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.url_patterns()})
+
+    def collect(self, driver):
+        """
+        Count the network traffic since the previous call
+
+        Reading the performance log drains it, so call this once before a test
+        to discard earlier traffic and once after it.
+
+        Returns:
+            dict: requests, blocked and bytes (bytes received over the wire),
+                or None when the browser does not expose a performance log
+        """
+        if not self.enabled or driver.capabilities.get("browserName") not in ("chrome", "msedge", "MicrosoftEdge"):
+            return None
+        try:
+            entries = driver.get_log("performance")
+        except WebDriverException:
+            return None
+
+        stats = {"requests": 0, "blocked": 0, "bytes": 0}
+        for entry in entries:
+            message = json.loads(entry["message"])["message"]
+            method, params = message["method"], message.get("params", {})
+            if method == "Network.requestWillBeSent":
+                stats["requests"] += 1
+            elif method == "Network.loadingFinished":
+                stats["bytes"] += int(params.get("encodedDataLength", 0))
+            elif method == "Network.loadingFailed" and (
+                    params.get("blockedReason") or params.get("errorText") == "net::ERR_BLOCKED_BY_CLIENT"):
+                stats["blocked"] += 1
+        return stats
@@ -0,0 +1,132 @@
+import os
+import zlib
+import struct
+import hashlib
+import logging
+import pathlib
+from io import BytesIO
+
+import allure
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def recompress_png(data, level=9):
+    """
+    Losslessly shrink a PNG by recompressing its image data at a higher zlib level
+
+    Browsers encode screenshots for speed; the pixels and every other chunk stay
+    as they are. Returns the input unchanged if it is not a PNG or does not shrink.
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    before, idat, after = [], [], []
+    position = len(PNG_SIGNATURE)
+    while position + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        body = data[position + 8:position + 8 + length]
+        position += 12 + length
+        if kind == b"IDAT":
+            idat.append(body)
+        else:
+            (after if idat else before).append((kind, body))
+    if not idat:
+        return data
+    original = b"".join(idat)
+    try:
+        packed = zlib.compress(zlib.decompress(original), level)
+    except zlib.error:
+        return data
+    if len(packed) >= len(original):
+        return data
+    out = [PNG_SIGNATURE]
+    for kind, body in before + [(b"IDAT", packed)] + after:
+        out.append(struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body)))
+    return b"".join(out)
+
+
+class ScreenshotStore:
+    """
+    Failure screenshots captured once and stored once per content
+
+    A screenshot is taken with a single WebDriver call and handed to an
+    ArtifactWriter, which writes the Allure attachment and the archived copy at
+    <root>/<hash[:2]>/<hash>.<ext> in the background, compressing the copy on the
+    way. A screenshot identical to one already stored (the same error page on
+    every retry of a flaky test) is not written again, and within a session Allure
+    gets a reference to the first attachment instead of the image a second time.
+
+    Formats:
+        png: lossless, recompressed at zlib level 9
+        webp: lossless WebP, usually much smaller (needs Pillow, falls back to png)
+        raw: the PNG as the browser produced it
+    """
+
+    FORMATS = ("png", "webp", "raw")
+
+    def __init__(self, root, writer, image_format="png"):
+        """
+        Args:
+            root (str): Directory of the store
+            writer (ArtifactWriter): Writes attachments and stored files
+            image_format (str): "png", "webp" or "raw"
+        """
+        if image_format not in self.FORMATS:
+            raise ValueError(f"Screenshot format '{image_format}' not supported. Use one of {self.FORMATS}.")
+        if image_format == "webp" and Image is None:
+            logger.warning("Pillow is not installed, storing screenshots as PNG instead of WebP")
+            image_format = "png"
+        self.root = root
+        self.format = image_format
+        self.writer = writer
+        self._attached = set()
+
+    def path_for(self, digest):
+        """Where the screenshot with this content hash is stored"""
+        extension = "webp" if self.format == "webp" else "png"
+        return os.path.join(self.root, digest[:2], f"{digest}.{extension}")
+
+    def capture(self, driver, name):
+        """
+        Take a screenshot, attach it to Allure and queue it for storage
+
+        Args:
+            driver (WebDriver): Browser to capture
+            name (str): Attachment name, usually the test name
+
+        Returns:
+            str: Path the screenshot is stored at (written in the background)
+        """
+        return self.add(driver.get_screenshot_as_png(), name)
+
+    def add(self, png, name):
+        """Attach and store an already captured PNG; see capture"""
+        digest = hashlib.sha256(png).hexdigest()
+        path = self.path_for(digest)
+        if digest in self._attached:
+            allure.attach(pathlib.Path(path).as_uri() + "\n", name=f"{name} (same as screenshot {digest[:12]})",
+                          attachment_type=allure.attachment_type.URI_LIST)
+            return path
+        self._attached.add(digest)
+        self.writer.attach(png, name, allure.attachment_type.PNG)
+        if not os.path.exists(path):
+            self.writer.write(path, png, encode=self._encode)
+        logger.info("Screenshot of %s: %s", name, path)
+        return path
+
+    def _encode(self, png):
+        """Runs on the writer thread"""
+        if self.format == "webp":
+            buffer = BytesIO()
+            Image.open(BytesIO(png)).save(buffer, "WEBP", lossless=True)
+            return buffer.getvalue()
+        if self.format == "png":
+            return recompress_png(png)
+        return png
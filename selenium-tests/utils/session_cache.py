@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import logging
+
+from .config import Config
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class SessionCache:
+    """
+    Login cookies shared by tests and xdist workers, keyed by (shop URL, user)
+
+    Entries live in a JSON file guarded by a lock file. A worker that finds no
+    usable entry logs in and writes its cookies back; the others reuse them until
+    they expire or the shop rejects them. Each process re-checks a session with the shop once
+    verify_interval has passed, so one the shop ends mid-run is replaced.
+    """
+
+    # Treat entries that expire within this many seconds as already expired
+    EXPIRY_MARGIN = 60
+
+    def __init__(self, path=None, ttl=None, verify_interval=None):
+        """
+        Args:
+            path (str): JSON file holding the cached sessions
+            ttl (float): Lifetime in seconds for sessions whose cookies carry no expiry
+            verify_interval (float): Seconds a successful check against the shop is trusted;
+                the shop may end a session before its cookies expire
+        """
+        self.path = path or Config.SESSION_CACHE_FILE
+        self.ttl = ttl or Config.SESSION_CACHE_TTL
+        self.verify_interval = Config.SESSION_VERIFY_INTERVAL if verify_interval is None else verify_interval
+        # When this process last checked each entry against the shop
+        self._verified_at = {}
+
+    def get_cookies(self, seeder, user, password):
+        """
+        Get session cookies for a user, logging in over HTTP only when needed
+
+        Args:
+            seeder (StateSeeder): Used to log in and to verify cached cookies
+            user (str): Login email
+            password (str): Login password
+
+        Returns:
+            list: WebDriver cookie dicts for a logged-in session
+        """
+        key = self._key(seeder.shop_url, user)
+        # Hold the lock only around file access: the HTTP checks below can be slow
+        with FileLock(self.path + ".lock"):
+            entry = self._load().get(key)
+
+        if entry and entry["expires_at"] - self.EXPIRY_MARGIN > time.time():
+            checked = self._verified_at.get(key)
+            if checked is not None and time.monotonic() - checked < self.verify_interval:
+                return entry["cookies"]
+            if seeder.is_authenticated(entry["cookies"]):
+                self._verified_at[key] = time.monotonic()
+                return entry["cookies"]
+            logger.info("Cached session for %s was rejected, logging in again", user)
+
+        cookies = seeder.login(user, password)
+        with FileLock(self.path + ".lock"):
+            entries = self._load()
+            entries[key] = {"cookies": cookies, "expires_at": self._expires_at(cookies)}
+            self._save(entries)
+        self._verified_at[key] = time.monotonic()
+        return cookies
+
+    def invalidate(self, shop_url, user):
+        """Forget a user's session, e.g. after a browser using it turned out to be logged out"""
+        key = self._key(shop_url, user)
+        with FileLock(self.path + ".lock"):
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._save(entries)
+        self._verified_at.pop(key, None)
+
+    def _expires_at(self, cookies):
+        """A session lasts as long as its shortest-lived cookie"""
+        expiries = [cookie["expiry"] for cookie in cookies if cookie.get("expiry")]
+        return min(expiries) if expiries else time.time() + self.ttl
+
+    @staticmethod
+    def _key(shop_url, user):
+        return f"{shop_url.rstrip('/')}|{user}"
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        # Session cookies are credentials: keep the file private to the current user
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,182 @@
+import logging
+import requests
+from selenium.webdriver.common.by import By
+
+from .config import Config
+from .test_data import TestData
+
+logger = logging.getLogger(__name__)
+
+
+class StateSeeder:
+    """Create users and logged-in sessions over HTTP so tests can skip the login/registration UI"""
+
+    AUTH_PATH = "/index.php?controller=authentication"
+    ACCOUNT_PATH = "/index.php?controller=my-account"
+    # Cheap page on the shop's domain, used when cookies have to be set through WebDriver
+    COOKIE_LANDING_PATH = "/robots.txt"
+
+    def __init__(self, shop_url=None, timeout=None):
+        """
+        Args:
+            shop_url (str): Storefront URL the page objects target (defaults to Config.SHOP_URL)
+            timeout (float): HTTP timeout in seconds for each request
+        """
+        self.shop_url = (shop_url or Config.SHOP_URL).rstrip("/")
+        self.timeout = timeout or Config.API_TIMEOUT
+
+    def login(self, email, password):
+        """
+        Log in through the authentication form endpoint
+
+        Returns:
+            list: Session cookies as WebDriver cookie dicts
+
+        Raises:
+            RuntimeError: If the shop does not accept the credentials
+        """
+        session = self._new_session()
+        response = session.post(
+            self.shop_url + self.AUTH_PATH,
+            data={"email": email, "passwd": password, "back": "my-account", "SubmitLogin": ""},
+            timeout=self.timeout
+        )
+        if not self._is_account_page(response):
+            raise RuntimeError(f"API login failed for '{email}' (HTTP {response.status_code})")
+        return self._cookies(session)
+
+    def is_authenticated(self, cookies):
+        """
+        Check that session cookies are still accepted by the shop
+
+        Guests asking for My Account are redirected to the login form, so a
+        single request without following redirects is enough.
+        """
+        session = self._new_session()
+        for cookie in cookies:
+            session.cookies.set(cookie["name"], cookie["value"], domain=cookie["domain"], path=cookie.get("path", "/"))
+        try:
+            response = session.get(self.shop_url + self.ACCOUNT_PATH, allow_redirects=False, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.warning("Could not verify session cookies: %s", e)
+            return False
+        return response.status_code == 200 and 'class="logout"' in response.text
+
+    def create_user(self, email=None, password=None, first_name=None, last_name=None):
+        """
+        Register a new customer through the account creation endpoint
+
+        Missing fields are generated with TestData.
+
+        Returns:
+            dict: The user's email, password, first_name, last_name and session cookies
+        """
+        email = email or TestData.random_email()
+        password = password or TestData.random_password()
+        if not (first_name and last_name):
+            first_name, last_name = TestData.random_name()
+        dob = TestData.random_date_of_birth()
+        address = TestData.random_address()
+
+        session = self._new_session()
+        response = session.post(
+            self.shop_url + self.AUTH_PATH,
+            data={
+                "id_gender": "1",
+                "customer_firstname": first_name,
+                "customer_lastname": last_name,
+                "email": email,
+                "passwd": password,
+                "days": dob["day"],
+                "months": dob["month"],
+                "years": dob["year"],
+                "firstname": first_name,
+                "lastname": last_name,
+                "address1": address["address1"],
+                "city": address["city"],
+                "id_state": "1",  # Alabama, matching TestData.random_address
+                "postcode": address["postcode"],
+                "id_country": "21",  # United States
+                "phone_mobile": address["mobile_phone"],
+                "alias": address["alias"],
+                "email_create": "1",
+                "is_new_customer": "1",
+                "back": "my-account",
+                "submitAccount": "",
+            },
+            timeout=self.timeout
+        )
+        if not self._is_account_page(response):
+            raise RuntimeError(f"API registration failed for '{email}' (HTTP {response.status_code})")
+
+        logger.info("Created user %s over HTTP", email)
+        return {
+            "email": email,
+            "password": password,
+            "first_name": first_name,
+            "last_name": last_name,
+            "cookies": self._cookies(session),
+        }
+
+    def inject_cookies(self, driver, cookies):
+        """
+        Put session cookies into the browser
+
+        Chromium accepts cookies for any domain through CDP; other browsers need
+        to be on the shop's domain first, so a lightweight page is loaded.
+        """
+        if hasattr(driver, "execute_cdp_cmd"):
+            for cookie in cookies:
+                params = {
+                    "name": cookie["name"],
+                    "value": cookie["value"],
+                    "domain": cookie["domain"],
+                    "path": cookie.get("path", "/"),
+                    "secure": cookie.get("secure", False),
+                    "httpOnly": cookie.get("httpOnly", False),
+                }
+                if cookie.get("expiry"):
+                    params["expires"] = cookie["expiry"]
+                driver.execute_cdp_cmd("Network.setCookie", params)
+            return
+
+        driver.get(self.shop_url + self.COOKIE_LANDING_PATH)
+        for cookie in cookies:
+            driver.add_cookie(cookie)
+
+    def is_logged_in(self, driver):
+        """
+        Check that the browser is logged in to the shop
+
+        Opens My Account, which shows the sign-out link only to a logged-in user.
+        """
+        driver.get(self.shop_url + self.ACCOUNT_PATH)
+        return bool(driver.find_elements(By.CLASS_NAME, "logout"))
+
+    def _new_session(self):
+        session = requests.Session()
+        session.headers["User-Agent"] = "Mozilla/5.0 (AutomationMasteryLab state seeder)"
+        return session
+
+    @staticmethod
+    def _is_account_page(response):
+        """The shop redirects to My Account after a successful login or registration"""
+        return response.ok and ("controller=my-account" in response.url or 'class="logout"' in response.text)
+
+    @staticmethod
+    def _cookies(session):
+        """Convert the session's cookie jar into WebDriver cookie dicts"""
+        cookies = []
+        for cookie in session.cookies:
+            entry = {
+                "name": cookie.name,
+                "value": cookie.value,
+                "domain": cookie.domain,
+                "path": cookie.path or "/",
+                "secure": bool(cookie.secure),
+                "httpOnly": cookie.has_nonstandard_attr("HttpOnly"),
+            }
+            if cookie.expires:
+                entry["expiry"] = int(cookie.expires)
+            cookies.append(entry)
+        return cookies
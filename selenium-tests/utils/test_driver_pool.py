@@ -0,0 +1,143 @@
+"""
+Tests for the per-worker browser pool, with fake drivers instead of browsers
+
+Run from selenium-tests:
+    python -m pytest utils/test_driver_pool.py
+"""
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from utils import driver_pool
+from utils.driver_pool import DriverPool
+
+
+class FakeDriver:
+    """Records the commands the pool sends; fails them once `broken` is set"""
+
+    def __init__(self, number):
+        self.number = number
+        self.broken = False
+        self.quit_calls = 0
+        self.window_handles = ["main"]
+        self.commands = []
+        self.switch_to = self
+
+    def _send(self, command):
+        if self.broken:
+            raise WebDriverException("browser gone")
+        self.commands.append(command)
+
+    @property
+    def current_window_handle(self):
+        self._send("current_window_handle")
+        return self.window_handles[0]
+
+    def window(self, handle):
+        self._send(f"switch:{handle}")
+
+    def close(self):
+        self._send("close")
+        self.window_handles.pop()
+
+    def execute(self, command, params=None):
+        self._send(command)
+
+    def execute_script(self, script):
+        self._send("clear_storage")
+
+    def delete_all_cookies(self):
+        self._send("delete_cookies")
+
+    def get(self, url):
+        self._send(f"get:{url}")
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def maximize_window(self):
+        pass
+
+    def quit(self):
+        self.quit_calls += 1
+        if self.broken:
+            raise WebDriverException("browser gone")
+
+    def __repr__(self):
+        return f"FakeDriver({self.number})"
+
+
+@pytest.fixture
+def launched(monkeypatch):
+    drivers = []
+
+    def get_driver(*args, **kwargs):
+        drivers.append(FakeDriver(len(drivers)))
+        return drivers[-1]
+
+    monkeypatch.setattr(driver_pool.DriverFactory, "get_driver", staticmethod(get_driver))
+    return drivers
+
+
+def test_released_browser_is_reused(launched):
+    pool = DriverPool("chrome", max_uses=5)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(launched) == 1
+
+
+def test_browser_is_recycled_after_max_uses(launched):
+    pool = DriverPool("chrome", max_uses=2)
+    driver = pool.acquire()
+    pool.release(driver)
+    assert pool.acquire() is driver
+    pool.release(driver)
+
+    assert driver.quit_calls == 1
+    replacement = pool.acquire()
+    assert replacement is not driver and len(launched) == 2
+
+
+def test_browser_is_discarded_when_reset_fails(launched):
+    pool = DriverPool("chrome", max_uses=5)
+    driver = pool.acquire()
+    driver.broken = True
+    pool.release(driver)
+
+    assert driver.quit_calls == 1
+    assert pool.acquire() is not driver
+
+
+def test_unresponsive_idle_browser_is_replaced(launched):
+    pool = DriverPool("chrome", max_uses=5)
+    driver = pool.acquire()
+    pool.release(driver)
+    driver.broken = True
+
+    assert pool.acquire() is launched[1]
+    assert driver.quit_calls == 1
+
+
+def test_fresh_browser_is_quit_on_release(launched):
+    pool = DriverPool("chrome", max_uses=5)
+    driver = pool.acquire(fresh=True)
+    pool.release(driver)
+    assert driver.quit_calls == 1
+    assert pool.acquire() is not driver
+
+
+def test_reset_closes_extra_tabs_and_clears_state():
+    driver = FakeDriver(0)
+    driver.window_handles = ["main", "popup", "other"]
+    DriverPool.reset(driver)
+
+    assert driver.window_handles == ["main"]
+    assert driver.commands[-3:] == ["clear_storage", "delete_cookies", "get:about:blank"]
+
+
+def test_close_quits_idle_and_checked_out_fresh_browsers(launched):
+    pool = DriverPool("chrome", max_uses=5)
+    idle, fresh = pool.acquire(), pool.acquire(fresh=True)
+    pool.release(idle)
+    pool.close()
+    assert (idle.quit_calls, fresh.quit_calls) == (1, 1)
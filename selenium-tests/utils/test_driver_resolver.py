@@ -0,0 +1,133 @@
+"""
+Tests for the driver binary cache and the lock file guarding it
+
+Run from selenium-tests:
+    python -m pytest utils/test_driver_resolver.py
+"""
+import os
+import json
+import time
+import threading
+
+import pytest
+
+from utils import driver_resolver
+from utils.driver_resolver import DriverResolver
+from utils.file_lock import FileLock
+
+
+def executable(directory, name):
+    path = os.path.join(str(directory), name)
+    with open(path, 'w') as f:
+        f.write("#!/bin/sh\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+class FakeManager:
+    """webdriver-manager stand-in: returns `path` from install(), or raises while offline"""
+
+    path = None
+    offline = False
+    installs = 0
+
+    def install(self):
+        type(self).installs += 1
+        if self.offline:
+            raise ConnectionError("no network")
+        return self.path
+
+
+@pytest.fixture
+def resolver(tmp_path, monkeypatch):
+    """A resolver with an empty cache in tmp_path, browser version 120 and no driver on PATH"""
+    monkeypatch.setattr(driver_resolver.Config, "DRIVER_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(DriverResolver, "_resolved", {})
+    monkeypatch.setattr(DriverResolver, "browser_version", classmethod(lambda cls, browser_name: "120"))
+    monkeypatch.delenv("CHROMEDRIVER_PATH", raising=False)
+    manager = type("Manager", (FakeManager,), {"path": executable(tmp_path, "chromedriver-120")})
+    spec = dict(DriverResolver.BROWSERS["chrome"], driver="no-such-chromedriver", manager=manager)
+    monkeypatch.setitem(DriverResolver.BROWSERS, "chrome", spec)
+    return manager
+
+
+def cache_contents():
+    with open(DriverResolver._cache_file()) as f:
+        return json.load(f)
+
+
+def new_process():
+    """Forget what this process resolved, as the next test run would"""
+    DriverResolver._resolved.clear()
+
+
+def test_download_is_cached_per_browser_version(resolver):
+    assert DriverResolver.resolve("chrome") == resolver.path
+    assert cache_contents() == {"chrome:120": resolver.path}
+
+    new_process()
+    assert DriverResolver.resolve("Chrome") == resolver.path
+    assert resolver.installs == 1
+
+
+def test_cached_driver_that_disappeared_is_resolved_again(resolver):
+    DriverResolver.resolve("chrome")
+    os.remove(resolver.path)
+    resolver.path = executable(os.path.dirname(resolver.path), "chromedriver-120b")
+
+    new_process()
+    assert DriverResolver.resolve("chrome") == resolver.path
+    assert resolver.installs == 2
+
+
+def test_offline_fallback_is_not_cached(resolver, tmp_path):
+    old_driver = executable(tmp_path, "chromedriver-119")
+    os.makedirs(os.path.dirname(DriverResolver._cache_file()))
+    with open(DriverResolver._cache_file(), 'w') as f:
+        json.dump({"chrome:119": old_driver}, f)
+    resolver.offline = True
+
+    assert DriverResolver.resolve("chrome") == old_driver
+    assert cache_contents() == {"chrome:119": old_driver}
+
+    # The next run tries the download again and caches the matching driver
+    new_process()
+    resolver.offline = False
+    assert DriverResolver.resolve("chrome") == resolver.path
+    assert cache_contents()["chrome:120"] == resolver.path
+
+
+def test_offline_without_fallback_raises(resolver):
+    resolver.offline = True
+    with pytest.raises(ConnectionError):
+        DriverResolver.resolve("chrome")
+
+
+def test_environment_override_wins(resolver, monkeypatch):
+    monkeypatch.setenv("CHROMEDRIVER_PATH", "/opt/drivers/chromedriver")
+    assert DriverResolver.resolve("chrome") == "/opt/drivers/chromedriver"
+    assert resolver.installs == 0
+
+
+def test_unsupported_browser():
+    with pytest.raises(ValueError):
+        DriverResolver.resolve("safari")
+
+
+def test_file_lock_excludes_other_holders(tmp_path):
+    path = str(tmp_path / "locks" / "cache.lock")
+    with FileLock(path):
+        with pytest.raises(TimeoutError):
+            FileLock(path, timeout=0.1).acquire()
+    # Released on exit, so the next holder gets it at once
+    with FileLock(path, timeout=0.1):
+        pass
+
+
+def test_file_lock_waits_for_release(tmp_path):
+    path = str(tmp_path / "cache.lock")
+    holder = FileLock(path).acquire()
+    threading.Timer(0.2, holder.release).start()
+    started = time.monotonic()
+    with FileLock(path, timeout=5):
+        assert time.monotonic() - started >= 0.2
@@ -0,0 +1,113 @@
+"""
+Tests for the test-duration history, sharding and fail-fast ordering
+
+Run from selenium-tests:
+    python -m pytest utils/test_durations.py
+"""
+import sqlite3
+from collections import namedtuple
+
+import pytest
+
+from utils.durations import DurationStore
+
+Item = namedtuple("Item", "nodeid")
+
+ITEMS = [Item(f"tests/test_shop.py::test_{n}") for n in range(40)]
+
+
+def record(path, runs, browser="chrome", base_url="http://shop"):
+    """Save runs of {nodeid: (seconds, failed)}, one session each, and return a fresh store"""
+    for run in runs:
+        store = DurationStore(path, browser, base_url)
+        for nodeid, (seconds, failed) in run.items():
+            store.add(nodeid, seconds, failed)
+        store.save()
+    return DurationStore(path, browser, base_url)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "history.sqlite")
+
+
+@pytest.fixture
+def store(db_path):
+    return record(db_path, [{item.nodeid: (1 + n % 7, False) for n, item in enumerate(ITEMS)}])
+
+
+@pytest.mark.parametrize("balanced", [True, False])
+@pytest.mark.parametrize("count", [1, 3, 4])
+def test_shards_are_disjoint_and_complete(store, count, balanced):
+    shards = [store.shard(ITEMS, count, index, balanced) for index in range(count)]
+    nodeids = [item.nodeid for selected, _, _ in shards for item in selected]
+    assert sorted(nodeids) == sorted(item.nodeid for item in ITEMS)
+    for selected, deselected, _ in shards:
+        assert len(selected) + len(deselected) == len(ITEMS)
+        # Collection order is kept within a shard
+        assert selected == [item for item in ITEMS if item in selected]
+
+
+def test_balanced_shards_have_similar_loads(store):
+    loads = [store.shard(ITEMS, 4, index)[2] for index in range(4)]
+    assert max(loads) - min(loads) <= 7
+
+
+def test_hash_split_ignores_local_history(db_path, tmp_path):
+    # Agents that recorded different histories still agree on the split by node id
+    other = record(str(tmp_path / "other.sqlite"), [{ITEMS[0].nodeid: (90, True)}])
+    for index in range(3):
+        assert (DurationStore(db_path).shard(ITEMS, 3, index, balanced=False)[0]
+                == other.shard(ITEMS, 3, index, balanced=False)[0])
+
+
+def test_balanced_split_matches_for_equal_fingerprints(store, db_path):
+    again = DurationStore(db_path, "chrome", "http://shop")
+    assert again.fingerprint() == store.fingerprint()
+    assert again.shard(ITEMS, 3, 1)[0] == store.shard(ITEMS, 3, 1)[0]
+    assert DurationStore(db_path, "firefox", "http://shop").fingerprint() != store.fingerprint()
+
+
+def test_shard_index_out_of_range(store):
+    with pytest.raises(ValueError):
+        store.shard(ITEMS, 3, 3)
+
+
+def test_save_keeps_the_latest_runs(db_path):
+    nodeid = ITEMS[0].nodeid
+    record(db_path, [{nodeid: (1, False)}], browser="firefox")
+    store = record(db_path, [{nodeid: (n, False)} for n in range(DurationStore.KEEP + 5)])
+
+    assert [duration for duration, _ in store.history[nodeid]] == list(range(5, DurationStore.KEEP + 5))
+    db = sqlite3.connect(db_path)
+    counts = dict(db.execute("SELECT browser, COUNT(*) FROM test_runs GROUP BY browser"))
+    db.close()
+    # Pruning only touches the history of the session's browser and base URL
+    assert counts == {"chrome": DurationStore.KEEP, "firefox": 1}
+
+
+def test_phases_add_up_and_discarded_tests_are_not_saved(db_path):
+    store = DurationStore(db_path)
+    store.add("a", 0.5)
+    store.add("a", 2.0, failed=True)
+    store.add("b", 1.0)
+    store.discard("b")
+    store.save()
+    assert store.history == {"a": [(2.5, True)]}
+
+
+def test_fail_fast_order(db_path):
+    fast_stable, slow_stable, flaky, failed_last, new = (Item(name) for name in
+                                                         ("fast", "slow", "flaky", "failed", "new"))
+    runs = [
+        {"fast": (1, False), "slow": (30, False), "flaky": (5, n == 1), "failed": (10, n == 2)}
+        for n in range(3)
+    ]
+    store = record(db_path, runs)
+    items = [slow_stable, fast_stable, new, flaky, failed_last]
+    store.sort_fail_fast(items)
+
+    assert items[:2] == [failed_last, flaky]
+    # A new test's default failure chance beats a test that always passed
+    assert items[2:] == [new, fast_stable, slow_stable]
+    assert store.is_flaky("flaky") and not store.is_flaky("fast")
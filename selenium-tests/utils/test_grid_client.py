@@ -0,0 +1,125 @@
+"""
+Tests for the Grid client against a stand-in hub serving /status
+
+Run from selenium-tests:
+    python -m pytest utils/test_grid_client.py
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils import grid_client
+from utils.grid_client import GridClient
+
+
+def slot(browser, busy=False):
+    return {"stereotype": {"browserName": browser}, "session": {"sessionId": "s"} if busy else None}
+
+
+def node(*slots, max_sessions=None, availability="UP"):
+    return {"availability": availability, "maxSessions": max_sessions or len(slots), "slots": list(slots)}
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    """Serves the hub's /status from the server's `nodes` list"""
+
+    def do_GET(self):
+        body = json.dumps({"value": {"ready": bool(self.server.nodes), "nodes": self.server.nodes}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    monkeypatch.setattr(grid_client.Config, "DRIVER_CACHE_DIR", str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StatusHandler)
+    server.nodes = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_slots_count_matching_free_slots(hub):
+    hub.nodes = [
+        node(slot("chrome"), slot("chrome", busy=True), slot("firefox")),
+        node(slot("MicrosoftEdge"), slot("chrome")),
+        node(slot("chrome"), availability="DOWN"),
+    ]
+    client = GridClient(hub.url)
+    assert client.slots("chrome") == (2, 3)
+    assert client.slots("edge") == (1, 1)
+    assert client.slots("firefox") == (1, 1)
+
+
+def test_slots_respect_max_sessions(hub):
+    # Four chrome slots but the node runs at most two sessions, one of them firefox
+    hub.nodes = [node(slot("chrome"), slot("chrome"), slot("chrome"), slot("chrome"), slot("firefox", busy=True),
+                      max_sessions=2)]
+    assert GridClient(hub.url).slots("chrome") == (1, 2)
+
+
+def test_wait_for_slot_blocks_while_saturated(hub):
+    hub.nodes = [node(slot("chrome", busy=True))]
+    client = GridClient(hub.url, slot_timeout=5, poll_interval=0.05)
+
+    def free_slot():
+        time.sleep(0.3)
+        hub.nodes = [node(slot("chrome"))]
+
+    threading.Thread(target=free_slot, daemon=True).start()
+    started = time.monotonic()
+    client.wait_for_slot("chrome")
+    assert time.monotonic() - started >= 0.3
+
+
+def test_wait_for_slot_times_out_and_rejects_missing_browser(hub):
+    hub.nodes = [node(slot("chrome", busy=True))]
+    with pytest.raises(TimeoutError):
+        GridClient(hub.url, slot_timeout=0.2, poll_interval=0.05).wait_for_slot("chrome")
+    with pytest.raises(RuntimeError):
+        GridClient(hub.url, slot_timeout=0.2, poll_interval=0.05).wait_for_slot("firefox")
+
+
+def test_wait_for_slot_gives_up_on_unreachable_hub():
+    GridClient("http://127.0.0.1:9", slot_timeout=0.2).wait_for_slot("chrome")
+
+
+def test_start_session_claims_the_last_slot_once(hub, monkeypatch):
+    hub.nodes = [node(slot("chrome"))]
+
+    def remote(command_executor, options):
+        # The hub takes a moment to show the new session as busy
+        time.sleep(0.2)
+        hub.nodes = [node(slot("chrome", busy=True))]
+        return options
+
+    monkeypatch.setattr(grid_client.webdriver, "Remote", remote)
+    outcomes = []
+
+    def start(name):
+        client = GridClient(hub.url, slot_timeout=0.5, poll_interval=0.05)
+        client._connection = object()
+        try:
+            outcomes.append(client.start_session("chrome", name))
+        except TimeoutError:
+            outcomes.append("timed out")
+
+    workers = [threading.Thread(target=start, args=(f"worker {n}",)) for n in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # Without the lock both workers would see the free slot and start a session
+    assert len(outcomes) == 2 and outcomes.count("timed out") == 1